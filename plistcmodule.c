@@ -0,0 +1,356 @@
+#include <Python.h>
+#include <structmember.h>
+
+/*
+Cons cell type and list operations backing the persistent list.
+
+Cons is the base type of pyrsistent._plist.PList. It only holds the first element
+and the rest of the list, all list methods are implemented in Python on top of
+it using the functions in this module. A list ends with a node that is not a
+Cons, the empty list, which is never looked into here.
+
+The functions here must behave exactly like their Python counterparts in
+pyrsistent/_plist.py which are used when this module is not available.
+
+Naming conventions
+------------------
+plistc_* -        Functions part of the module interface
+Cons_* -          Instance methods of the Cons type
+All other functions are camel cased without prefix. All functions are static.
+*/
+
+typedef struct {
+  PyObject_HEAD
+  PyObject *first;
+  PyObject *rest;
+  PyObject *in_weakreflist;
+} Cons;
+
+static PyTypeObject ConsType;
+
+#define IS_CONS(node) PyObject_TypeCheck((node), &ConsType)
+
+/*
+ Allocate a cell of type, which must be Cons or a subtype of it that does not
+ need any further initialization. Steals the references to first and rest.
+*/
+static PyObject *newCons(PyTypeObject *type, PyObject *first, PyObject *rest) {
+  Cons *cell = (Cons *)type->tp_alloc(type, 0);
+  if(cell == NULL) {
+    Py_DECREF(first);
+    Py_DECREF(rest);
+    return NULL;
+  }
+
+  cell->first = first;
+  cell->rest = rest;
+  return (PyObject *)cell;
+}
+
+static PyObject *Cons_new(PyTypeObject *type, PyObject *args, PyObject *kwds) {
+  PyObject *first, *rest;
+  static char *kwlist[] = {"first", "rest", NULL};
+  if(!PyArg_ParseTupleAndKeywords(args, kwds, "OO", kwlist, &first, &rest)) {
+    return NULL;
+  }
+
+  Py_INCREF(first);
+  Py_INCREF(rest);
+  return newCons(type, first, rest);
+}
+
+static int Cons_traverse(Cons *self, visitproc visit, void *arg) {
+  Py_VISIT(self->first);
+  Py_VISIT(self->rest);
+  return 0;
+}
+
+static int Cons_clear(Cons *self) {
+  Py_CLEAR(self->first);
+  Py_CLEAR(self->rest);
+  return 0;
+}
+
+static void Cons_dealloc(Cons *self) {
+  PyObject_GC_UnTrack((PyObject *)self);
+
+  // Long lists are released one cell at a time through the trashcan rather than
+  // through deeply nested calls
+  Py_TRASHCAN_BEGIN(self, Cons_dealloc);
+  if(self->in_weakreflist != NULL) {
+    PyObject_ClearWeakRefs((PyObject *)self);
+  }
+
+  Py_CLEAR(self->first);
+  Py_CLEAR(self->rest);
+  Py_TYPE(self)->tp_free((PyObject *)self);
+  Py_TRASHCAN_END;
+}
+
+static PyMemberDef Cons_members[] = {
+  {"first", T_OBJECT_EX, offsetof(Cons, first), READONLY, "First element of the list"},
+  {"rest", T_OBJECT_EX, offsetof(Cons, rest), READONLY, "The list without its first element"},
+  {NULL}
+};
+
+static PyTypeObject ConsType = {
+  PyVarObject_HEAD_INIT(NULL, 0)
+  "plistc.Cons",                              /* tp_name        */
+  sizeof(Cons),                               /* tp_basicsize   */
+  0,                                          /* tp_itemsize    */
+  (destructor)Cons_dealloc,                   /* tp_dealloc     */
+  0,                                          /* tp_print       */
+  0,                                          /* tp_getattr     */
+  0,                                          /* tp_setattr     */
+  0,                                          /* tp_compare     */
+  0,                                          /* tp_repr        */
+  0,                                          /* tp_as_number   */
+  0,                                          /* tp_as_sequence */
+  0,                                          /* tp_as_mapping  */
+  0,                                          /* tp_hash        */
+  0,                                          /* tp_call        */
+  0,                                          /* tp_str         */
+  0,                                          /* tp_getattro    */
+  0,                                          /* tp_setattro    */
+  0,                                          /* tp_as_buffer   */
+  Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC, /* tp_flags */
+  "Cons cell of a persistent list",           /* tp_doc         */
+  (traverseproc)Cons_traverse,                /* tp_traverse       */
+  (inquiry)Cons_clear,                        /* tp_clear          */
+  0,                                          /* tp_richcompare    */
+  offsetof(Cons, in_weakreflist),             /* tp_weaklistoffset */
+  0,                                          /* tp_iter           */
+  0,                                          /* tp_iternext       */
+  0,                                          /* tp_methods        */
+  Cons_members,                               /* tp_members        */
+  0,                                          /* tp_getset         */
+  0,                                          /* tp_base           */
+  0,                                          /* tp_dict           */
+  0,                                          /* tp_descr_get      */
+  0,                                          /* tp_descr_set      */
+  0,                                          /* tp_dictoffset     */
+  0,                                          /* tp_init           */
+  0,                                          /* tp_alloc          */
+  Cons_new,                                   /* tp_new            */
+};
+
+/*********************** List iterator **************************/
+
+typedef struct {
+  PyObject_HEAD
+  PyObject *node; /* Set to NULL when the iterator is exhausted */
+} ConsIter;
+
+static void ConsIter_dealloc(ConsIter *it) {
+  PyObject_GC_UnTrack(it);
+  Py_XDECREF(it->node);
+  PyObject_GC_Del(it);
+}
+
+static int ConsIter_traverse(ConsIter *it, visitproc visit, void *arg) {
+  Py_VISIT(it->node);
+  return 0;
+}
+
+static PyObject *ConsIter_next(ConsIter *it) {
+  PyObject *node = it->node;
+  if(node == NULL) {
+    return NULL;
+  }
+
+  if(IS_CONS(node)) {
+    PyObject *item = ((Cons *)node)->first;
+    it->node = ((Cons *)node)->rest;
+    Py_INCREF(item);
+    Py_INCREF(it->node);
+    Py_DECREF(node);
+    return item;
+  }
+
+  Py_DECREF(node);
+  it->node = NULL;
+  return NULL;
+}
+
+static PyTypeObject ConsIterType = {
+  PyVarObject_HEAD_INIT(NULL, 0)
+  "plist_iterator",                           /* tp_name */
+  sizeof(ConsIter),                           /* tp_basicsize */
+  0,                                          /* tp_itemsize */
+  (destructor)ConsIter_dealloc,               /* tp_dealloc */
+  0,                                          /* tp_print */
+  0,                                          /* tp_getattr */
+  0,                                          /* tp_setattr */
+  0,                                          /* tp_compare */
+  0,                                          /* tp_repr */
+  0,                                          /* tp_as_number */
+  0,                                          /* tp_as_sequence */
+  0,                                          /* tp_as_mapping */
+  0,                                          /* tp_hash */
+  0,                                          /* tp_call */
+  0,                                          /* tp_str */
+  PyObject_GenericGetAttr,                    /* tp_getattro */
+  0,                                          /* tp_setattro */
+  0,                                          /* tp_as_buffer */
+  Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC,    /* tp_flags */
+  0,                                          /* tp_doc */
+  (traverseproc)ConsIter_traverse,            /* tp_traverse */
+  0,                                          /* tp_clear */
+  0,                                          /* tp_richcompare */
+  0,                                          /* tp_weaklistoffset */
+  PyObject_SelfIter,                          /* tp_iter */
+  (iternextfunc)ConsIter_next,                /* tp_iternext */
+};
+
+/*********************** Module functions **************************/
+
+static PyObject *plistc_iterate(PyObject *self, PyObject *node) {
+  ConsIter *it = PyObject_GC_New(ConsIter, &ConsIterType);
+  if(it == NULL) {
+    return NULL;
+  }
+
+  Py_INCREF(node);
+  it->node = node;
+  PyObject_GC_Track(it);
+  return (PyObject *)it;
+}
+
+static PyObject *plistc_length(PyObject *self, PyObject *node) {
+  Py_ssize_t length = 0;
+  while(IS_CONS(node)) {
+    length++;
+    node = ((Cons *)node)->rest;
+  }
+
+  return PyLong_FromSsize_t(length);
+}
+
+static PyObject *plistc_drop(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if(nargs != 2) {
+    PyErr_SetString(PyExc_TypeError, "drop() takes exactly 2 arguments");
+    return NULL;
+  }
+
+  Py_ssize_t count = PyLong_AsSsize_t(args[1]);
+  if(count == -1 && PyErr_Occurred()) {
+    return NULL;
+  }
+
+  PyObject *node = args[0];
+  while(count > 0 && IS_CONS(node)) {
+    node = ((Cons *)node)->rest;
+    count--;
+  }
+
+  Py_INCREF(node);
+  return node;
+}
+
+static PyObject *plistc_cons_all(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if(nargs != 3) {
+    PyErr_SetString(PyExc_TypeError, "cons_all() takes exactly 3 arguments");
+    return NULL;
+  }
+
+  PyObject *typeObj = args[0];
+  if(!PyType_Check(typeObj) || !PyType_IsSubtype((PyTypeObject *)typeObj, &ConsType)) {
+    PyErr_SetString(PyExc_TypeError, "cons_all() requires a Cons type");
+    return NULL;
+  }
+
+  PyTypeObject *type = (PyTypeObject *)typeObj;
+  PyObject *head = args[1];
+  PyObject *iterable = args[2];
+  Py_INCREF(head);
+
+  if(PyList_CheckExact(iterable) || PyTuple_CheckExact(iterable)) {
+    // The length of a list may change if an allocation triggers arbitrary code through
+    // the garbage collector so it is read on every iteration.
+    for(Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(iterable); i++) {
+      PyObject *item = PySequence_Fast_GET_ITEM(iterable, i);
+      Py_INCREF(item);
+      head = newCons(type, item, head);
+      if(head == NULL) {
+        return NULL;
+      }
+    }
+
+    return head;
+  }
+
+  PyObject *iterator = PyObject_GetIter(iterable);
+  if(iterator == NULL) {
+    Py_DECREF(head);
+    return NULL;
+  }
+
+  PyObject *item;
+  while((item = PyIter_Next(iterator)) != NULL) {
+    head = newCons(type, item, head);
+    if(head == NULL) {
+      Py_DECREF(iterator);
+      return NULL;
+    }
+  }
+
+  Py_DECREF(iterator);
+  if(PyErr_Occurred()) {
+    Py_DECREF(head);
+    return NULL;
+  }
+
+  return head;
+}
+
+static PyMethodDef PlistcMethods[] = {
+  {"iterate", (PyCFunction)plistc_iterate, METH_O,
+   "iterate(node)\n"
+   "Return an iterator over the elements of the list starting at node."},
+  {"length", (PyCFunction)plistc_length, METH_O,
+   "length(node)\n"
+   "Return the number of elements in the list starting at node."},
+  {"drop", (PyCFunction)(void(*)(void))plistc_drop, METH_FASTCALL,
+   "drop(node, count)\n"
+   "Return the list starting at node with the first count elements removed."},
+  {"cons_all", (PyCFunction)(void(*)(void))plistc_cons_all, METH_FASTCALL,
+   "cons_all(cls, head, iterable)\n"
+   "Return head with all elements of iterable cons:ed to it, in cells of type cls."},
+  {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef moduledef = {
+  PyModuleDef_HEAD_INIT,
+  "plistc",                         /* m_name */
+  "Persistent list cons cells",     /* m_doc */
+  -1,                               /* m_size */
+  PlistcMethods,                    /* m_methods */
+  NULL,                             /* m_reload */
+  NULL,                             /* m_traverse */
+  NULL,                             /* m_clear */
+  NULL,                             /* m_free */
+};
+
+PyMODINIT_FUNC PyInit_plistc(void) {
+  if(PyType_Ready(&ConsType) < 0) {
+    return NULL;
+  }
+
+  if(PyType_Ready(&ConsIterType) < 0) {
+    return NULL;
+  }
+
+  PyObject *m = PyModule_Create(&moduledef);
+  if(m == NULL) {
+    return NULL;
+  }
+
+  Py_INCREF(&ConsType);
+  if(PyModule_AddObject(m, "Cons", (PyObject *)&ConsType) < 0) {
+    Py_DECREF(&ConsType);
+    Py_DECREF(m);
+    return NULL;
+  }
+
+  return m;
+}
@@ -0,0 +1,1267 @@
+#include <Python.h>
+#include <stdint.h>
+
+/*
+Hash array mapped trie (HAMT) operations backing the persistent map.
+
+This module does not define any types of its own. The trie nodes are plain Python
+lists and tuples that are shared with the pure Python implementation of the same
+operations in pyrsistent/_pmap.py. See that module for a description of the node
+layout. The functions here must produce exactly the same tries as their Python
+counterparts.
+
+Naming conventions
+------------------
+pmapc_* -         Functions part of the module interface
+All other functions are camel cased without prefix. All functions are static.
+*/
+
+#define BITS 5
+#define MASK ((1 << BITS) - 1)
+
+#define DATAMAP_INDEX 0
+#define NODEMAP_INDEX 1
+#define EDIT_INDEX 2
+#define HEADER_SIZE 3
+
+// Hash values are signed. Rely on arithmetic shift to match the behaviour of
+// the Python implementation for negative hashes.
+#define FRAGMENT(hash, shift) ((uint32_t)(((hash) >> (shift)) & MASK))
+
+#define IS_COLLISION_NODE(node) PyTuple_CheckExact(node)
+#define IS_EDITABLE(node, edit) (((edit) != Py_None) && (PyList_GET_ITEM((node), EDIT_INDEX) == (edit)))
+
+#if defined(__GNUC__) || defined(__clang__)
+#define POPCOUNT(x) __builtin_popcount(x)
+#else
+static int popCount(uint32_t x) {
+  x = x - ((x >> 1) & 0x55555555);
+  x = (x & 0x33333333) + ((x >> 2) & 0x33333333);
+  x = (x + (x >> 4)) & 0x0F0F0F0F;
+  return (int)((x * 0x01010101) >> 24);
+}
+#define POPCOUNT(x) popCount(x)
+#endif
+
+#define INDEX_BELOW(bitmap, bit) POPCOUNT((bitmap) & ((bit) - 1))
+#define DATA_INDEX(datamap, bit) (HEADER_SIZE + 2 * INDEX_BELOW(datamap, bit))
+
+static int getBitmap(PyObject *node, Py_ssize_t index, uint32_t *bitmap) {
+  unsigned long value = PyLong_AsUnsignedLong(PyList_GET_ITEM(node, index));
+  if(value == (unsigned long)-1 && PyErr_Occurred()) {
+    return -1;
+  }
+
+  *bitmap = (uint32_t)value;
+  return 0;
+}
+
+static int setBitmap(PyObject *node, Py_ssize_t index, uint32_t bitmap) {
+  PyObject *value = PyLong_FromUnsignedLong(bitmap);
+  if(value == NULL) {
+    return -1;
+  }
+
+  // Steals the reference to value
+  return PyList_SetItem(node, index, value);
+}
+
+static int getCollisionHash(PyObject *node, Py_hash_t *hash) {
+  Py_ssize_t value = PyLong_AsSsize_t(PyTuple_GET_ITEM(node, 0));
+  if(value == -1 && PyErr_Occurred()) {
+    return -1;
+  }
+
+  *hash = (Py_hash_t)value;
+  return 0;
+}
+
+/*
+ Compares a key stored in the trie with the key given. Returns 1 for equal keys,
+ 0 for different and -1 on error.
+*/
+static int keysEqual(PyObject *storedKey, PyObject *key) {
+  if(storedKey == key) {
+    return 1;
+  }
+
+  // The comparison may execute arbitrary code, keep the stored key alive
+  Py_INCREF(storedKey);
+  int result = PyObject_RichCompareBool(storedKey, key, Py_EQ);
+  Py_DECREF(storedKey);
+  return result;
+}
+
+/*
+ Allocates a new node with room for count items after the header. The items
+ must be filled in by the caller.
+*/
+static PyObject* newNode(uint32_t datamap, uint32_t nodemap, PyObject *edit, Py_ssize_t count) {
+  PyObject *node = PyList_New(HEADER_SIZE + count);
+  if(node == NULL) {
+    return NULL;
+  }
+
+  PyObject *datamapObj = PyLong_FromUnsignedLong(datamap);
+  PyObject *nodemapObj = PyLong_FromUnsignedLong(nodemap);
+  if(datamapObj == NULL || nodemapObj == NULL) {
+    Py_XDECREF(datamapObj);
+    Py_XDECREF(nodemapObj);
+    Py_DECREF(node);
+    return NULL;
+  }
+
+  PyList_SET_ITEM(node, DATAMAP_INDEX, datamapObj);
+  PyList_SET_ITEM(node, NODEMAP_INDEX, nodemapObj);
+  Py_INCREF(edit);
+  PyList_SET_ITEM(node, EDIT_INDEX, edit);
+  return node;
+}
+
+/*
+ Returns a new reference to a node that may be updated in place by the caller.
+ That is the node itself if it is owned by edit, otherwise a copy owned by edit.
+*/
+static PyObject* editableNode(PyObject *node, PyObject *edit) {
+  if(IS_EDITABLE(node, edit)) {
+    Py_INCREF(node);
+    return node;
+  }
+
+  PyObject *result = PyList_GetSlice(node, 0, PyList_GET_SIZE(node));
+  if(result == NULL) {
+    return NULL;
+  }
+
+  Py_INCREF(edit);
+  if(PyList_SetItem(result, EDIT_INDEX, edit) < 0) {
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  return result;
+}
+
+/*
+ Returns a copy of node owned by edit with an entry inserted at index. The copy is allocated
+ with its exact size, inserting into a copied list would leave it over allocated for good.
+*/
+static PyObject* copyNodeWithEntry(PyObject *node, PyObject *edit, Py_ssize_t index,
+                                   PyObject *key, PyObject *value, uint32_t datamap, uint32_t nodemap) {
+  Py_ssize_t i, size = PyList_GET_SIZE(node);
+  PyObject *result = newNode(datamap, nodemap, edit, size - HEADER_SIZE + 2);
+  if(result == NULL) {
+    return NULL;
+  }
+
+  for(i = HEADER_SIZE; i < size; i++) {
+    PyObject *item = PyList_GET_ITEM(node, i);
+    Py_INCREF(item);
+    PyList_SET_ITEM(result, (i < index) ? i : i + 2, item);
+  }
+
+  Py_INCREF(key);
+  PyList_SET_ITEM(result, index, key);
+  Py_INCREF(value);
+  PyList_SET_ITEM(result, index + 1, value);
+  return result;
+}
+
+/*
+ Returns a copy of node owned by edit where the entry at index i has been replaced by subNode,
+ inserted at index j of the copy.
+*/
+static PyObject* copyNodeWithSubNode(PyObject *node, PyObject *edit, Py_ssize_t i, Py_ssize_t j,
+                                     PyObject *subNode, uint32_t datamap, uint32_t nodemap) {
+  Py_ssize_t k, target = HEADER_SIZE, size = PyList_GET_SIZE(node);
+  PyObject *result = newNode(datamap, nodemap, edit, size - HEADER_SIZE - 1);
+  if(result == NULL) {
+    return NULL;
+  }
+
+  for(k = HEADER_SIZE; k < size; k++) {
+    if(k == i) {
+      k++;
+      continue;
+    }
+
+    if(target == j) {
+      Py_INCREF(subNode);
+      PyList_SET_ITEM(result, target++, subNode);
+    }
+
+    PyObject *item = PyList_GET_ITEM(node, k);
+    Py_INCREF(item);
+    PyList_SET_ITEM(result, target++, item);
+  }
+
+  if(target == j) {
+    Py_INCREF(subNode);
+    PyList_SET_ITEM(result, target, subNode);
+  }
+
+  return result;
+}
+
+static int insertEntry(PyObject *node, Py_ssize_t index, PyObject *key, PyObject *value) {
+  if(PyList_Insert(node, index, key) < 0) {
+    return -1;
+  }
+
+  return PyList_Insert(node, index + 1, value);
+}
+
+/*********************** Lookup **************************/
+
+static PyObject* collisionLookup(PyObject *node, Py_hash_t hash, PyObject *key, PyObject *defaultValue) {
+  Py_hash_t collisionHash;
+  Py_ssize_t i;
+
+  if(getCollisionHash(node, &collisionHash) < 0) {
+    return NULL;
+  }
+
+  if(collisionHash == hash) {
+    for(i = 1; i < PyTuple_GET_SIZE(node); i += 2) {
+      int eq = keysEqual(PyTuple_GET_ITEM(node, i), key);
+      if(eq < 0) {
+        return NULL;
+      }
+
+      if(eq) {
+        PyObject *result = PyTuple_GET_ITEM(node, i + 1);
+        Py_INCREF(result);
+        return result;
+      }
+    }
+  }
+
+  Py_INCREF(defaultValue);
+  return defaultValue;
+}
+
+static PyObject* nodeLookup(PyObject *node, Py_hash_t hash, PyObject *key, PyObject *defaultValue) {
+  unsigned int shift = 0;
+  uint32_t datamap, nodemap, bit;
+  PyObject *result;
+
+  // Hold a reference to the current node in case the trie is modified
+  // during key comparison.
+  Py_INCREF(node);
+  for(;;) {
+    if(IS_COLLISION_NODE(node)) {
+      result = collisionLookup(node, hash, key, defaultValue);
+      Py_DECREF(node);
+      return result;
+    }
+
+    bit = 1u << FRAGMENT(hash, shift);
+    if(getBitmap(node, DATAMAP_INDEX, &datamap) < 0) {
+      Py_DECREF(node);
+      return NULL;
+    }
+
+    if(datamap & bit) {
+      Py_ssize_t i = DATA_INDEX(datamap, bit);
+      int eq = keysEqual(PyList_GET_ITEM(node, i), key);
+      if(eq < 0) {
+        Py_DECREF(node);
+        return NULL;
+      }
+
+      result = eq ? PyList_GET_ITEM(node, i + 1) : defaultValue;
+      Py_INCREF(result);
+      Py_DECREF(node);
+      return result;
+    }
+
+    if(getBitmap(node, NODEMAP_INDEX, &nodemap) < 0) {
+      Py_DECREF(node);
+      return NULL;
+    }
+
+    if(!(nodemap & bit)) {
+      Py_DECREF(node);
+      Py_INCREF(defaultValue);
+      return defaultValue;
+    }
+
+    PyObject *subNode = PyList_GET_ITEM(node, PyList_GET_SIZE(node) - 1 - INDEX_BELOW(nodemap, bit));
+    Py_INCREF(subNode);
+    Py_DECREF(node);
+    node = subNode;
+    shift += BITS;
+  }
+}
+
+/*********************** Insert **************************/
+
+static PyObject* mergeEntries(unsigned int shift,
+                              Py_hash_t hash1, PyObject *key1, PyObject *value1,
+                              Py_hash_t hash2, PyObject *key2, PyObject *value2,
+                              PyObject *edit) {
+  if(hash1 == hash2) {
+    PyObject *hashObj = PyLong_FromSsize_t(hash1);
+    if(hashObj == NULL) {
+      return NULL;
+    }
+
+    PyObject *result = PyTuple_Pack(5, hashObj, key1, value1, key2, value2);
+    Py_DECREF(hashObj);
+    return result;
+  }
+
+  uint32_t fragment1 = FRAGMENT(hash1, shift);
+  uint32_t fragment2 = FRAGMENT(hash2, shift);
+  PyObject *result;
+
+  if(fragment1 == fragment2) {
+    PyObject *subNode = mergeEntries(shift + BITS, hash1, key1, value1, hash2, key2, value2, edit);
+    if(subNode == NULL) {
+      return NULL;
+    }
+
+    result = newNode(0, 1u << fragment1, edit, 1);
+    if(result == NULL) {
+      Py_DECREF(subNode);
+      return NULL;
+    }
+
+    PyList_SET_ITEM(result, HEADER_SIZE, subNode);
+    return result;
+  }
+
+  result = newNode((1u << fragment1) | (1u << fragment2), 0, edit, 4);
+  if(result == NULL) {
+    return NULL;
+  }
+
+  if(fragment1 > fragment2) {
+    PyObject *tmp;
+    tmp = key1; key1 = key2; key2 = tmp;
+    tmp = value1; value1 = value2; value2 = tmp;
+  }
+
+  Py_INCREF(key1);
+  Py_INCREF(value1);
+  Py_INCREF(key2);
+  Py_INCREF(value2);
+  PyList_SET_ITEM(result, HEADER_SIZE, key1);
+  PyList_SET_ITEM(result, HEADER_SIZE + 1, value1);
+  PyList_SET_ITEM(result, HEADER_SIZE + 2, key2);
+  PyList_SET_ITEM(result, HEADER_SIZE + 3, value2);
+  return result;
+}
+
+static PyObject* mergeCollision(unsigned int shift, PyObject *collision, Py_hash_t collisionHash,
+                                Py_hash_t hash, PyObject *key, PyObject *value, PyObject *edit) {
+  uint32_t collisionFragment = FRAGMENT(collisionHash, shift);
+  uint32_t fragment = FRAGMENT(hash, shift);
+  PyObject *result;
+
+  if(collisionFragment == fragment) {
+    PyObject *subNode = mergeCollision(shift + BITS, collision, collisionHash, hash, key, value, edit);
+    if(subNode == NULL) {
+      return NULL;
+    }
+
+    result = newNode(0, 1u << fragment, edit, 1);
+    if(result == NULL) {
+      Py_DECREF(subNode);
+      return NULL;
+    }
+
+    PyList_SET_ITEM(result, HEADER_SIZE, subNode);
+    return result;
+  }
+
+  result = newNode(1u << fragment, 1u << collisionFragment, edit, 3);
+  if(result == NULL) {
+    return NULL;
+  }
+
+  Py_INCREF(key);
+  Py_INCREF(value);
+  Py_INCREF(collision);
+  PyList_SET_ITEM(result, HEADER_SIZE, key);
+  PyList_SET_ITEM(result, HEADER_SIZE + 1, value);
+  PyList_SET_ITEM(result, HEADER_SIZE + 2, collision);
+  return result;
+}
+
+/*
+ Returns a new tuple of the given size holding the items of node. The slots
+ beyond the size of node must be filled in by the caller.
+*/
+static PyObject* copyTuple(PyObject *node, Py_ssize_t size) {
+  Py_ssize_t i;
+  PyObject *result = PyTuple_New(size);
+  if(result == NULL) {
+    return NULL;
+  }
+
+  for(i = 0; i < PyTuple_GET_SIZE(node) && i < size; i++) {
+    PyObject *item = PyTuple_GET_ITEM(node, i);
+    Py_INCREF(item);
+    PyTuple_SET_ITEM(result, i, item);
+  }
+
+  return result;
+}
+
+static PyObject* collisionAssoc(PyObject *node, unsigned int shift, Py_hash_t hash,
+                                PyObject *key, PyObject *value, PyObject *edit, int *added) {
+  Py_hash_t collisionHash;
+  Py_ssize_t i, size = PyTuple_GET_SIZE(node);
+  PyObject *result;
+
+  if(getCollisionHash(node, &collisionHash) < 0) {
+    return NULL;
+  }
+
+  if(collisionHash != hash) {
+    *added = 1;
+    return mergeCollision(shift, node, collisionHash, hash, key, value, edit);
+  }
+
+  for(i = 1; i < size; i += 2) {
+    int eq = keysEqual(PyTuple_GET_ITEM(node, i), key);
+    if(eq < 0) {
+      return NULL;
+    }
+
+    if(eq) {
+      if(PyTuple_GET_ITEM(node, i + 1) == value) {
+        Py_INCREF(node);
+        return node;
+      }
+
+      result = copyTuple(node, size);
+      if(result == NULL) {
+        return NULL;
+      }
+
+      Py_DECREF(PyTuple_GET_ITEM(result, i + 1));
+      Py_INCREF(value);
+      PyTuple_SET_ITEM(result, i + 1, value);
+      return result;
+    }
+  }
+
+  result = copyTuple(node, size + 2);
+  if(result == NULL) {
+    return NULL;
+  }
+
+  Py_INCREF(key);
+  Py_INCREF(value);
+  PyTuple_SET_ITEM(result, size, key);
+  PyTuple_SET_ITEM(result, size + 1, value);
+  *added = 1;
+  return result;
+}
+
+/*
+ Returns a new reference to the updated node. That is the node itself if it was
+ updated in place or if the value was already present.
+*/
+static PyObject* nodeAssoc(PyObject *node, unsigned int shift, Py_hash_t hash,
+                           PyObject *key, PyObject *value, PyObject *edit, int *added) {
+  uint32_t datamap, nodemap, bit;
+  PyObject *result;
+
+  if(IS_COLLISION_NODE(node)) {
+    return collisionAssoc(node, shift, hash, key, value, edit, added);
+  }
+
+  bit = 1u << FRAGMENT(hash, shift);
+  if(getBitmap(node, DATAMAP_INDEX, &datamap) < 0 || getBitmap(node, NODEMAP_INDEX, &nodemap) < 0) {
+    return NULL;
+  }
+
+  if(datamap & bit) {
+    Py_ssize_t i = DATA_INDEX(datamap, bit);
+    PyObject *storedKey = PyList_GET_ITEM(node, i);
+    PyObject *storedValue = PyList_GET_ITEM(node, i + 1);
+    Py_INCREF(storedKey);
+    Py_INCREF(storedValue);
+
+    int eq = keysEqual(storedKey, key);
+    if(eq < 0) {
+      goto stored_error;
+    }
+
+    if(eq) {
+      Py_DECREF(storedKey);
+      Py_DECREF(storedValue);
+      if(storedValue == value) {
+        Py_INCREF(node);
+        return node;
+      }
+
+      result = editableNode(node, edit);
+      if(result == NULL) {
+        return NULL;
+      }
+
+      Py_INCREF(value);
+      if(PyList_SetItem(result, i + 1, value) < 0) {
+        Py_DECREF(result);
+        return NULL;
+      }
+
+      return result;
+    }
+
+    // Another key occupies the slot, push both down into a new sub node
+    Py_hash_t storedHash = PyObject_Hash(storedKey);
+    if(storedHash == -1) {
+      goto stored_error;
+    }
+
+    PyObject *subNode = mergeEntries(shift + BITS, storedHash, storedKey, storedValue, hash, key, value, edit);
+    Py_DECREF(storedKey);
+    Py_DECREF(storedValue);
+    if(subNode == NULL) {
+      return NULL;
+    }
+
+    nodemap |= bit;
+    if(!IS_EDITABLE(node, edit)) {
+      result = copyNodeWithSubNode(node, edit, i, PyList_GET_SIZE(node) - 2 - INDEX_BELOW(nodemap, bit),
+                                   subNode, datamap ^ bit, nodemap);
+      Py_DECREF(subNode);
+      if(result != NULL) {
+        *added = 1;
+      }
+
+      return result;
+    }
+
+    Py_INCREF(node);
+    result = node;
+    if(PyList_SetSlice(result, i, i + 2, NULL) < 0 ||
+       setBitmap(result, DATAMAP_INDEX, datamap ^ bit) < 0 ||
+       setBitmap(result, NODEMAP_INDEX, nodemap) < 0 ||
+       PyList_Insert(result, PyList_GET_SIZE(result) - INDEX_BELOW(nodemap, bit), subNode) < 0) {
+      Py_DECREF(subNode);
+      Py_DECREF(result);
+      return NULL;
+    }
+
+    Py_DECREF(subNode);
+    *added = 1;
+    return result;
+
+  stored_error:
+    Py_DECREF(storedKey);
+    Py_DECREF(storedValue);
+    return NULL;
+  }
+
+  if(nodemap & bit) {
+    Py_ssize_t j = PyList_GET_SIZE(node) - 1 - INDEX_BELOW(nodemap, bit);
+    PyObject *subNode = PyList_GET_ITEM(node, j);
+    Py_INCREF(subNode);
+    PyObject *newSubNode = nodeAssoc(subNode, shift + BITS, hash, key, value, edit, added);
+    if(newSubNode == NULL || newSubNode == subNode) {
+      Py_DECREF(subNode);
+      if(newSubNode == NULL) {
+        return NULL;
+      }
+
+      Py_DECREF(newSubNode);
+      Py_INCREF(node);
+      return node;
+    }
+
+    Py_DECREF(subNode);
+    result = editableNode(node, edit);
+    if(result == NULL) {
+      Py_DECREF(newSubNode);
+      return NULL;
+    }
+
+    // Steals the reference to the new sub node
+    if(PyList_SetItem(result, j, newSubNode) < 0) {
+      Py_DECREF(result);
+      return NULL;
+    }
+
+    return result;
+  }
+
+  if(!IS_EDITABLE(node, edit)) {
+    result = copyNodeWithEntry(node, edit, DATA_INDEX(datamap, bit), key, value, datamap | bit, nodemap);
+    if(result == NULL) {
+      return NULL;
+    }
+
+    *added = 1;
+    return result;
+  }
+
+  Py_INCREF(node);
+  result = node;
+  if(insertEntry(result, DATA_INDEX(datamap, bit), key, value) < 0 ||
+     setBitmap(result, DATAMAP_INDEX, datamap | bit) < 0) {
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  *added = 1;
+  return result;
+}
+
+/*********************** Delete **************************/
+
+static PyObject* inlineEntry(PyObject *node, uint32_t bit, Py_ssize_t j, PyObject *key, PyObject *value, PyObject *edit) {
+  uint32_t datamap, nodemap;
+  PyObject *result = editableNode(node, edit);
+  if(result == NULL) {
+    return NULL;
+  }
+
+  if(getBitmap(result, DATAMAP_INDEX, &datamap) < 0 || getBitmap(result, NODEMAP_INDEX, &nodemap) < 0) {
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  // The entry may be owned by the node that is about to be dropped
+  Py_INCREF(key);
+  Py_INCREF(value);
+  datamap |= bit;
+  if(PyList_SetSlice(result, j, j + 1, NULL) < 0 ||
+     setBitmap(result, DATAMAP_INDEX, datamap) < 0 ||
+     setBitmap(result, NODEMAP_INDEX, nodemap ^ bit) < 0 ||
+     insertEntry(result, DATA_INDEX(datamap, bit), key, value) < 0) {
+    Py_DECREF(result);
+    result = NULL;
+  }
+
+  Py_DECREF(key);
+  Py_DECREF(value);
+  return result;
+}
+
+static PyObject* collisionDissoc(PyObject *node, Py_hash_t hash, PyObject *key, int *found) {
+  Py_hash_t collisionHash;
+  Py_ssize_t i, k, size = PyTuple_GET_SIZE(node);
+
+  if(getCollisionHash(node, &collisionHash) < 0) {
+    return NULL;
+  }
+
+  if(collisionHash == hash) {
+    for(i = 1; i < size; i += 2) {
+      int eq = keysEqual(PyTuple_GET_ITEM(node, i), key);
+      if(eq < 0) {
+        return NULL;
+      }
+
+      if(eq) {
+        PyObject *result = PyTuple_New(size - 2);
+        if(result == NULL) {
+          return NULL;
+        }
+
+        for(k = 0; k < size - 2; k++) {
+          PyObject *item = PyTuple_GET_ITEM(node, k < i ? k : k + 2);
+          Py_INCREF(item);
+          PyTuple_SET_ITEM(result, k, item);
+        }
+
+        *found = 1;
+        return result;
+      }
+    }
+  }
+
+  Py_INCREF(node);
+  return node;
+}
+
+/*
+ Returns a new reference to the updated node. found is set to 0 and a new
+ reference to the node itself is returned if the key is not present.
+*/
+static PyObject* nodeDissoc(PyObject *node, unsigned int shift, Py_hash_t hash, PyObject *key, PyObject *edit, int *found) {
+  uint32_t datamap, nodemap, bit;
+  PyObject *result;
+
+  if(IS_COLLISION_NODE(node)) {
+    return collisionDissoc(node, hash, key, found);
+  }
+
+  bit = 1u << FRAGMENT(hash, shift);
+  if(getBitmap(node, DATAMAP_INDEX, &datamap) < 0 || getBitmap(node, NODEMAP_INDEX, &nodemap) < 0) {
+    return NULL;
+  }
+
+  if(datamap & bit) {
+    Py_ssize_t i = DATA_INDEX(datamap, bit);
+    int eq = keysEqual(PyList_GET_ITEM(node, i), key);
+    if(eq < 0) {
+      return NULL;
+    }
+
+    if(!eq) {
+      Py_INCREF(node);
+      return node;
+    }
+
+    result = editableNode(node, edit);
+    if(result == NULL) {
+      return NULL;
+    }
+
+    if(PyList_SetSlice(result, i, i + 2, NULL) < 0 || setBitmap(result, DATAMAP_INDEX, datamap ^ bit) < 0) {
+      Py_DECREF(result);
+      return NULL;
+    }
+
+    *found = 1;
+    return result;
+  }
+
+  if(!(nodemap & bit)) {
+    Py_INCREF(node);
+    return node;
+  }
+
+  Py_ssize_t j = PyList_GET_SIZE(node) - 1 - INDEX_BELOW(nodemap, bit);
+  PyObject *subNode = PyList_GET_ITEM(node, j);
+  Py_INCREF(subNode);
+  PyObject *newSubNode = nodeDissoc(subNode, shift + BITS, hash, key, edit, found);
+  if(newSubNode == NULL || !*found) {
+    Py_DECREF(subNode);
+    if(newSubNode == NULL) {
+      return NULL;
+    }
+
+    Py_DECREF(newSubNode);
+    Py_INCREF(node);
+    return node;
+  }
+
+  // Keep the trie canonical, a sub node that is down to a single key is inlined
+  // in this node and a lone collision node is pulled up to this level.
+  if(IS_COLLISION_NODE(newSubNode)) {
+    if(PyTuple_GET_SIZE(newSubNode) == 3) {
+      result = inlineEntry(node, bit, j, PyTuple_GET_ITEM(newSubNode, 1), PyTuple_GET_ITEM(newSubNode, 2), edit);
+      Py_DECREF(subNode);
+      Py_DECREF(newSubNode);
+      return result;
+    }
+  } else {
+    uint32_t subDatamap, subNodemap;
+    if(getBitmap(newSubNode, DATAMAP_INDEX, &subDatamap) < 0 || getBitmap(newSubNode, NODEMAP_INDEX, &subNodemap) < 0) {
+      Py_DECREF(subNode);
+      Py_DECREF(newSubNode);
+      return NULL;
+    }
+
+    if(subNodemap == 0 && POPCOUNT(subDatamap) == 1) {
+      result = inlineEntry(node, bit, j, PyList_GET_ITEM(newSubNode, HEADER_SIZE),
+                           PyList_GET_ITEM(newSubNode, HEADER_SIZE + 1), edit);
+      Py_DECREF(subNode);
+      Py_DECREF(newSubNode);
+      return result;
+    }
+
+    if(subDatamap == 0 && POPCOUNT(subNodemap) == 1 && IS_COLLISION_NODE(PyList_GET_ITEM(newSubNode, HEADER_SIZE))) {
+      PyObject *collision = PyList_GET_ITEM(newSubNode, HEADER_SIZE);
+      Py_INCREF(collision);
+      Py_DECREF(newSubNode);
+      newSubNode = collision;
+    }
+  }
+
+  if(newSubNode == subNode) {
+    Py_DECREF(subNode);
+    Py_DECREF(newSubNode);
+    Py_INCREF(node);
+    return node;
+  }
+
+  Py_DECREF(subNode);
+  result = editableNode(node, edit);
+  if(result == NULL) {
+    Py_DECREF(newSubNode);
+    return NULL;
+  }
+
+  // Steals the reference to the new sub node
+  if(PyList_SetItem(result, j, newSubNode) < 0) {
+    Py_DECREF(result);
+    return NULL;
+  }
+
+  return result;
+}
+
+/*********************** Bulk loading **************************/
+
+/*
+ Maps are bulk loaded by first collecting all entries, then sorting them in the order
+ they will have in the trie and finally building each node of the trie exactly once,
+ bottom up.
+*/
+
+typedef struct {
+  uint64_t order;  // The hash with the fragments rearranged to sort in trie order
+  Py_ssize_t seq;  // Position in the input, later entries replace earlier ones with equal keys
+  PyObject *key;
+  PyObject *value;
+} Entry;
+
+typedef struct {
+  Entry *entries;
+  Py_ssize_t count;
+  Py_ssize_t capacity;
+} EntryList;
+
+// The bits of a 64 bit hash that are left after the last complete fragment
+#define TOP_BITS 4
+#define TOP_MASK ((1 << TOP_BITS) - 1)
+#define FULL_FRAGMENTS ((64 - TOP_BITS) / BITS)
+
+static uint64_t hashOrder(Py_hash_t hash) {
+  uint64_t h = (uint64_t)(int64_t)hash;
+  uint64_t order = 0;
+  int i;
+
+  for(i = 0; i < FULL_FRAGMENTS; i++) {
+    order = (order << BITS) | ((h >> (i * BITS)) & MASK);
+  }
+
+  return (order << TOP_BITS) | (h >> (FULL_FRAGMENTS * BITS));
+}
+
+static Py_hash_t orderHash(uint64_t order) {
+  uint64_t h = (order & TOP_MASK) << (FULL_FRAGMENTS * BITS);
+  int i;
+
+  for(i = 0; i < FULL_FRAGMENTS; i++) {
+    h |= ((order >> (64 - BITS * (i + 1))) & MASK) << (i * BITS);
+  }
+
+  return (Py_hash_t)(int64_t)h;
+}
+
+/*
+ Same as FRAGMENT() but for the rearranged hash.
+*/
+static uint32_t orderFragment(uint64_t order, unsigned int shift) {
+  if(shift < FULL_FRAGMENTS * BITS) {
+    return (uint32_t)(order >> (64 - BITS - shift)) & MASK;
+  }
+
+  // The last fragment is sign extended from the top bits of the hash
+  uint32_t top = (uint32_t)(order & TOP_MASK);
+  return (top & (1 << (TOP_BITS - 1))) ? (top | (MASK & ~TOP_MASK)) : top;
+}
+
+static int compareEntries(const void *a, const void *b) {
+  const Entry *x = (const Entry*)a;
+  const Entry *y = (const Entry*)b;
+  if(x->order != y->order) {
+    return (x->order < y->order) ? -1 : 1;
+  }
+
+  return (x->seq > y->seq) - (x->seq < y->seq);
+}
+
+static void clearEntries(EntryList *list) {
+  Py_ssize_t i;
+  for(i = 0; i < list->count; i++) {
+    Py_DECREF(list->entries[i].key);
+    Py_DECREF(list->entries[i].value);
+  }
+
+  PyMem_Free(list->entries);
+  list->entries = NULL;
+  list->count = 0;
+  list->capacity = 0;
+}
+
+static int appendEntry(EntryList *list, Py_hash_t hash, PyObject *key, PyObject *value) {
+  if(list->count == list->capacity) {
+    Py_ssize_t capacity = (list->capacity > 0) ? 2 * list->capacity : 64;
+    Entry *entries = PyMem_Realloc(list->entries, capacity * sizeof(Entry));
+    if(entries == NULL) {
+      PyErr_NoMemory();
+      return -1;
+    }
+
+    list->entries = entries;
+    list->capacity = capacity;
+  }
+
+  Entry *entry = &list->entries[list->count];
+  entry->order = hashOrder(hash);
+  entry->seq = list->count;
+  Py_INCREF(key);
+  Py_INCREF(value);
+  entry->key = key;
+  entry->value = value;
+  list->count++;
+  return 0;
+}
+
+static int appendItem(EntryList *list, PyObject *item, int hashed) {
+  Py_ssize_t expected = hashed ? 3 : 2;
+  Py_hash_t hash;
+  int result = -1;
+
+  PyObject *seq = PySequence_Fast(item, "");
+  if(seq == NULL) {
+    if(PyErr_ExceptionMatches(PyExc_TypeError)) {
+      PyErr_Format(PyExc_TypeError, "cannot convert map update sequence element #%zd to a sequence", list->count);
+    }
+
+    return -1;
+  }
+
+  if(PySequence_Fast_GET_SIZE(seq) != expected) {
+    PyErr_Format(PyExc_ValueError, "map update sequence element #%zd has length %zd; %zd is required",
+                 list->count, PySequence_Fast_GET_SIZE(seq), expected);
+  } else {
+    PyObject **items = PySequence_Fast_ITEMS(seq);
+    if(hashed) {
+      hash = (Py_hash_t)PyLong_AsSsize_t(items[0]);
+      if(hash != -1 || !PyErr_Occurred()) {
+        result = appendEntry(list, hash, items[1], items[2]);
+      }
+    } else {
+      hash = PyObject_Hash(items[0]);
+      if(hash != -1) {
+        result = appendEntry(list, hash, items[0], items[1]);
+      }
+    }
+  }
+
+  Py_DECREF(seq);
+  return result;
+}
+
+/*
+ Collects all key value pairs, or (hash, key, value) triples if hashed, from items.
+*/
+static int collectEntries(PyObject *items, int hashed, EntryList *list) {
+  PyObject *item;
+
+  if(!hashed && PyDict_CheckExact(items)) {
+    // Fast path for the common case of creating a map from a dict
+    Py_ssize_t pos = 0;
+    PyObject *key, *value;
+    while(PyDict_Next(items, &pos, &key, &value)) {
+      // The dict may be modified while hashing the key
+      Py_INCREF(key);
+      Py_INCREF(value);
+      Py_hash_t hash = PyObject_Hash(key);
+      int status = (hash == -1) ? -1 : appendEntry(list, hash, key, value);
+      Py_DECREF(key);
+      Py_DECREF(value);
+      if(status < 0) {
+        return -1;
+      }
+    }
+
+    return 0;
+  }
+
+  PyObject *it = PyObject_GetIter(items);
+  if(it == NULL) {
+    return -1;
+  }
+
+  while((item = PyIter_Next(it)) != NULL) {
+    int status = appendItem(list, item, hashed);
+    Py_DECREF(item);
+    if(status < 0) {
+      break;
+    }
+  }
+
+  Py_DECREF(it);
+  return PyErr_Occurred() ? -1 : 0;
+}
+
+/*
+ Removes all but the first of entries with equal keys from the sorted list. The value of
+ the last one is kept. Entries with equal keys have equal hashes and are next to each
+ other, in input order, after sorting.
+*/
+static int removeDuplicates(EntryList *list) {
+  Entry *entries = list->entries;
+  Py_ssize_t i = 0, k, out = 0;
+
+  while(i < list->count) {
+    Py_ssize_t groupStart = out;
+    uint64_t order = entries[i].order;
+    for(; (i < list->count) && (entries[i].order == order); i++) {
+      for(k = groupStart; k < out; k++) {
+        int eq = keysEqual(entries[k].key, entries[i].key);
+        if(eq < 0) {
+          // Keep the list consistent for the cleanup
+          memmove(&entries[out], &entries[i], (list->count - i) * sizeof(Entry));
+          list->count = out + list->count - i;
+          return -1;
+        }
+
+        if(eq) {
+          break;
+        }
+      }
+
+      if(k < out) {
+        Py_DECREF(entries[k].value);
+        Py_DECREF(entries[i].key);
+        entries[k].value = entries[i].value;
+      } else {
+        entries[out++] = entries[i];
+      }
+    }
+  }
+
+  list->count = out;
+  return 0;
+}
+
+static PyObject* buildCollisionNode(Entry *entries, Py_ssize_t count) {
+  Py_ssize_t i;
+  PyObject *hash = PyLong_FromSsize_t(orderHash(entries[0].order));
+  if(hash == NULL) {
+    return NULL;
+  }
+
+  PyObject *node = PyTuple_New(1 + 2 * count);
+  if(node == NULL) {
+    Py_DECREF(hash);
+    return NULL;
+  }
+
+  PyTuple_SET_ITEM(node, 0, hash);
+  for(i = 0; i < count; i++) {
+    Py_INCREF(entries[i].key);
+    Py_INCREF(entries[i].value);
+    PyTuple_SET_ITEM(node, 1 + 2 * i, entries[i].key);
+    PyTuple_SET_ITEM(node, 2 + 2 * i, entries[i].value);
+  }
+
+  return node;
+}
+
+/*
+ Builds the node at shift holding the sorted, duplicate free, entries. There must be
+ at least two entries unless this is the root.
+*/
+static PyObject* buildNode(Entry *entries, Py_ssize_t count, unsigned int shift, PyObject *edit) {
+  uint32_t datamap = 0, nodemap = 0, fragment;
+  Py_ssize_t i, j, dataCount = 0, nodeCount = 0;
+
+  for(i = 0; i < count; i = j) {
+    fragment = orderFragment(entries[i].order, shift);
+    for(j = i + 1; (j < count) && (orderFragment(entries[j].order, shift) == fragment); j++);
+
+    if(j - i == 1) {
+      datamap |= 1u << fragment;
+      dataCount++;
+    } else {
+      nodemap |= 1u << fragment;
+      nodeCount++;
+    }
+  }
+
+  PyObject *node = newNode(datamap, nodemap, edit, 2 * dataCount + nodeCount);
+  if(node == NULL) {
+    return NULL;
+  }
+
+  Py_ssize_t dataIndex = HEADER_SIZE;
+  Py_ssize_t nodeIndex = PyList_GET_SIZE(node) - 1;
+  for(i = 0; i < count; i = j) {
+    fragment = orderFragment(entries[i].order, shift);
+    for(j = i + 1; (j < count) && (orderFragment(entries[j].order, shift) == fragment); j++);
+
+    if(j - i == 1) {
+      Py_INCREF(entries[i].key);
+      Py_INCREF(entries[i].value);
+      PyList_SET_ITEM(node, dataIndex++, entries[i].key);
+      PyList_SET_ITEM(node, dataIndex++, entries[i].value);
+    } else {
+      // Sub nodes are stored in reverse order at the end of the node
+      PyObject *subNode = (entries[i].order == entries[j - 1].order) ?
+        buildCollisionNode(&entries[i], j - i) : buildNode(&entries[i], j - i, shift + BITS, edit);
+      if(subNode == NULL) {
+        Py_DECREF(node);
+        return NULL;
+      }
+
+      PyList_SET_ITEM(node, nodeIndex--, subNode);
+    }
+  }
+
+  return node;
+}
+
+/*********************** Module interface **************************/
+
+static int checkArgCount(const char *name, Py_ssize_t nargs, Py_ssize_t expected) {
+  if(nargs != expected) {
+    PyErr_Format(PyExc_TypeError, "%s() takes exactly %zd arguments (%zd given)", name, expected, nargs);
+    return -1;
+  }
+
+  return 0;
+}
+
+static PyObject* pmapc_lookup(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if(checkArgCount("lookup", nargs, 3) < 0) {
+    return NULL;
+  }
+
+  Py_hash_t hash = PyObject_Hash(args[1]);
+  if(hash == -1) {
+    return NULL;
+  }
+
+  return nodeLookup(args[0], hash, args[1], args[2]);
+}
+
+static PyObject* pmapc_assoc(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  int added = 0;
+
+  if(checkArgCount("assoc", nargs, 4) < 0) {
+    return NULL;
+  }
+
+  Py_hash_t hash = PyObject_Hash(args[1]);
+  if(hash == -1) {
+    return NULL;
+  }
+
+  PyObject *root = nodeAssoc(args[0], 0, hash, args[1], args[2], args[3], &added);
+  if(root == NULL) {
+    return NULL;
+  }
+
+  PyObject *result = PyTuple_Pack(2, root, added ? Py_True : Py_False);
+  Py_DECREF(root);
+  return result;
+}
+
+static PyObject* pmapc_dissoc(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  int found = 0;
+
+  if(checkArgCount("dissoc", nargs, 3) < 0) {
+    return NULL;
+  }
+
+  Py_hash_t hash = PyObject_Hash(args[1]);
+  if(hash == -1) {
+    return NULL;
+  }
+
+  PyObject *root = nodeDissoc(args[0], 0, hash, args[1], args[2], &found);
+  if(root == NULL || found) {
+    return root;
+  }
+
+  Py_DECREF(root);
+  Py_RETURN_NONE;
+}
+
+static PyObject* pmapc_assoc_all(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  PyObject *root, *edit;
+  EntryList list = {NULL, 0, 0};
+  Py_ssize_t i, added = 0;
+
+  if(checkArgCount("assoc_all", nargs, 4) < 0) {
+    return NULL;
+  }
+
+  root = args[0];
+  edit = args[2];
+  int hashed = PyObject_IsTrue(args[3]);
+  if(hashed < 0 || collectEntries(args[1], hashed, &list) < 0) {
+    goto error;
+  }
+
+  Py_INCREF(root);
+  if(PyList_CheckExact(root) && PyList_GET_SIZE(root) == HEADER_SIZE) {
+    // Empty trie, bulk load it
+    qsort(list.entries, list.count, sizeof(Entry), compareEntries);
+    if(removeDuplicates(&list) < 0) {
+      Py_DECREF(root);
+      goto error;
+    }
+
+    if(list.count > 0) {
+      Py_DECREF(root);
+      root = buildNode(list.entries, list.count, 0, edit);
+      if(root == NULL) {
+        goto error;
+      }
+    }
+
+    added = list.count;
+  } else {
+    for(i = 0; i < list.count; i++) {
+      int isAdded = 0;
+      Entry *entry = &list.entries[i];
+      PyObject *newRoot = nodeAssoc(root, 0, orderHash(entry->order), entry->key, entry->value, edit, &isAdded);
+      Py_DECREF(root);
+      if(newRoot == NULL) {
+        goto error;
+      }
+
+      root = newRoot;
+      added += isAdded;
+    }
+  }
+
+  clearEntries(&list);
+  return Py_BuildValue("(Nn)", root, added);
+
+error:
+  clearEntries(&list);
+  return NULL;
+}
+
+static PyMethodDef PmapcMethods[] = {
+  {"lookup", (PyCFunction)(void(*)(void))pmapc_lookup, METH_FASTCALL,
+   "lookup(root, key, default)\n"
+   "Return the value stored for key in the trie, default if not present."},
+  {"assoc", (PyCFunction)(void(*)(void))pmapc_assoc, METH_FASTCALL,
+   "assoc(root, key, value, edit)\n"
+   "Return a tuple of the updated trie and a boolean telling if key was added."},
+  {"dissoc", (PyCFunction)(void(*)(void))pmapc_dissoc, METH_FASTCALL,
+   "dissoc(root, key, edit)\n"
+   "Return the updated trie with key removed, None if key is not present."},
+  {"assoc_all", (PyCFunction)(void(*)(void))pmapc_assoc_all, METH_FASTCALL,
+   "assoc_all(root, items, edit, hashed)\n"
+   "Insert all key value pairs in items, (hash, key, value) triples if hashed is true.\n"
+   "Return a tuple of the updated trie and the number of keys added."},
+  {NULL, NULL, 0, NULL}
+};
+
+
+/********************* Python module initialization ************************/
+
+static struct PyModuleDef moduledef = {
+  PyModuleDef_HEAD_INIT,
+  "pmapc",                          /* m_name */
+  "Persistent map trie operations", /* m_doc */
+  -1,                               /* m_size */
+  PmapcMethods,                     /* m_methods */
+  NULL,                             /* m_reload */
+  NULL,                             /* m_traverse */
+  NULL,                             /* m_clear */
+  NULL,                             /* m_free */
+};
+
+PyMODINIT_FUNC PyInit_pmapc(void) {
+  return PyModule_Create(&moduledef);
+}
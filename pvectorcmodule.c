@@ -48,6 +48,8 @@ typedef struct {
   unsigned int shift;
   VNode *root;
   VNode *tail;
+  Py_hash_t cachedHash; /* -1 until the hash has been calculated */
+  char deepFrozen; /* Set by freeze() when no element needs freezing */
   PyObject *in_weakreflist; /* List of weak references */
 } PVector;
 
@@ -55,7 +57,6 @@ typedef struct {
   PyObject_HEAD
   PVector* originalVector;
   PVector* newVector;
-  PyObject* appendList;
 } PVectorEvolver;
 
 
@@ -72,8 +73,9 @@ static PyObject* transform(PVector* self, PyObject* args) {
 }
 
 
-// No access to internal members
+// No access to internal members apart from the flag maintained by freeze()
 static PyMemberDef PVector_members[] = {
+	{"_deep_frozen", T_BOOL, offsetof(PVector, deepFrozen), 0, "True if no element needs freezing"},
 	{NULL}  /* Sentinel */
 };
 
@@ -133,6 +135,7 @@ static VNode* copyNode(VNode* source) {
 static PVector* emptyNewPvec(void);
 static PVector* copyPVector(PVector *original);
 static void extendWithItem(PVector *newVec, PyObject *item);
+static void extendWithRange(PVector *newVec, PVector *source, Py_ssize_t start, Py_ssize_t stop);
 
 static PyObject *PVectorEvolver_persistent(PVectorEvolver *);
 static int PVectorEvolver_set_item(PVectorEvolver *, PyObject*, PyObject*);
@@ -272,27 +275,48 @@ static PyObject *PVector_repr(PVector *self) {
 }
 
 
+// The xxHash based algorithm of the tuple hash in CPython 3.8 and later. A vector hashes
+// as a tuple holding its elements, like the Python implementation, so that equal vectors
+// of both kinds hash equal.
+#if SIZEOF_PY_HASH_T > 4
+#define XXPRIME_1 ((Py_uhash_t)11400714785074694791ULL)
+#define XXPRIME_2 ((Py_uhash_t)14029467366897019727ULL)
+#define XXPRIME_5 ((Py_uhash_t)2870177450012600261ULL)
+#define XXROTATE(x) ((x << 31) | (x >> 33))
+#else
+#define XXPRIME_1 ((Py_uhash_t)2654435761UL)
+#define XXPRIME_2 ((Py_uhash_t)2246822519UL)
+#define XXPRIME_5 ((Py_uhash_t)374761393UL)
+#define XXROTATE(x) ((x << 13) | (x >> 19))
+#endif
+
 static Py_hash_t PVector_hash(PVector *self) {
-  // Follows the pattern of the tuple hash
-  long x, y;
   Py_ssize_t i;
-  long mult = 1000003L;
-  x = 0x456789L;
+  Py_uhash_t acc = XXPRIME_5;
+
+  // The vector is immutable so the hash only has to be calculated once
+  if(self->cachedHash != -1) {
+    return self->cachedHash;
+  }
+
   for(i=0; i<self->count; i++) {
-      y = PyObject_Hash(_get_item(self, i));
-      if (y == -1) {
-        return -1;
-      }
-      x = (x ^ y) * mult;
-      mult += (long)(82520L + i + i);
+    Py_uhash_t lane = PyObject_Hash(_get_item(self, i));
+    if(lane == (Py_uhash_t)-1) {
+      return -1;
+    }
+
+    acc += lane * XXPRIME_2;
+    acc = XXROTATE(acc);
+    acc *= XXPRIME_1;
   }
 
-  x += 97531L;
-  if(x == -1) {
-    x = -2;
+  acc += self->count ^ (XXPRIME_5 ^ 3527539UL);
+  if(acc == (Py_uhash_t)-1) {
+    acc = 1546275796;
   }
 
-  return x;
+  self->cachedHash = (Py_hash_t)acc;
+  return self->cachedHash;
 }
 
 static PyObject* compareSizes(long vlen, long wlen, int op) {
@@ -356,7 +380,9 @@ static PyObject* PVector_richcompare(PyObject *v, PyObject *w, int op) {
     vlen = vt->count;
     wlen = wt->count;
 
-    if (vlen != wlen) {
+    // Vectors of different length, or with different hashes, cannot be equal
+    if ((vlen != wlen) ||
+        ((vt->cachedHash != -1) && (wt->cachedHash != -1) && (vt->cachedHash != wt->cachedHash))) {
         if (op == Py_EQ) {
             Py_INCREF(Py_False);
             return Py_False;
@@ -414,12 +440,10 @@ static PyObject* PVector_repeat(PVector *self, Py_ssize_t n) {
   } else if ((self->count * n)/self->count != n) {
     return PyErr_NoMemory();
   } else {
-    Py_ssize_t i, j;
+    Py_ssize_t i;
     PVector *newVec = copyPVector(self);
     for(i=0; i<(n-1); i++) {
-      for(j=0; j<self->count; j++) {
-        extendWithItem(newVec, PVector_get_item(self, j));
-      }
+      extendWithRange(newVec, self, 0, self->count);
     }
     return (PyObject*)newVec;
   }
@@ -513,22 +537,18 @@ static PVector* rawCopyPVector(PVector* vector) {
   newVector->shift = vector->shift;
   newVector->root = vector->root;
   newVector->tail = vector->tail;
+  newVector->cachedHash = -1;
+  newVector->deepFrozen = 0;
   newVector->in_weakreflist = NULL;
   PyObject_GC_Track((PyObject*)newVector);
   return newVector;
 }
 
-static void initializeEvolver(PVectorEvolver* evolver, PVector* vector, PyObject* appendList) {
+static void initializeEvolver(PVectorEvolver* evolver, PVector* vector) {
   // Need to hold a reference to the underlying vector to manage
   // the ref counting properly.
   evolver->originalVector = vector;
   evolver->newVector = vector;
-
-  if(appendList == NULL) {
-    evolver->appendList = PyList_New(0);
-  } else {
-    evolver->appendList = appendList;
-  }
 }
 
 static PyObject * PVector_evolver(PVector *self) {
@@ -536,7 +556,7 @@ static PyObject * PVector_evolver(PVector *self) {
   if (evolver == NULL) {
     return NULL;
   }
-  initializeEvolver(evolver, self, NULL);
+  initializeEvolver(evolver, self);
   PyObject_GC_Track(evolver);
   Py_INCREF(self);
   return (PyObject *)evolver;
@@ -562,8 +582,12 @@ static PyObject* PVector_extend(PVector *self, PyObject *args);
 
 static PyObject* PVector_delete(PVector *self, PyObject *args);
 
+static PyObject* PVector_insert(PVector *self, PyObject *args);
+
 static PyObject* PVector_remove(PVector *self, PyObject *args);
 
+static PyObject* PVector_diff(PVector *self, PyObject *other);
+
 static PySequenceMethods PVector_sequence_methods = {
     (lenfunc)PVector_len,            /* sq_length */
     (binaryfunc)PVector_extend,      /* sq_concat */
@@ -596,8 +620,10 @@ static PyMethodDef PVector_methods[] = {
         {"evolver",     (PyCFunction)PVector_evolver, METH_NOARGS, "Return new evolver for pvector"},
 	{"mset",        (PyCFunction)PVector_mset, METH_VARARGS, "Inserts multiple elements at the specified positions"},
         {"tolist",      (PyCFunction)PVector_toList, METH_NOARGS, "Convert to list"},
+        {"insert",      (PyCFunction)PVector_insert, METH_VARARGS, "Insert an element before index"},
         {"delete",      (PyCFunction)PVector_delete, METH_VARARGS, "Delete element(s) by index"},
         {"remove",      (PyCFunction)PVector_remove, METH_VARARGS, "Remove element(s) by equality"},
+        {"diff",        (PyCFunction)PVector_diff, METH_O, "Return the splices that turn the vector into other"},
 	{NULL}
 };
 
@@ -665,6 +691,8 @@ static PVector* emptyNewPvec(void) {
   pvec->shift = SHIFT;
   pvec->root = newNode();
   pvec->tail = newNode();
+  pvec->cachedHash = -1;
+  pvec->deepFrozen = 0;
   pvec->in_weakreflist = NULL;
   PyObject_GC_Track((PyObject*)pvec);
   return pvec;
@@ -688,6 +716,8 @@ static PVector* newPvec(unsigned int count, unsigned int shift, VNode *root) {
   pvec->shift = shift;
   pvec->root = root;
   pvec->tail = newNode();
+  pvec->cachedHash = -1;
+  pvec->deepFrozen = 0;
   pvec->in_weakreflist = NULL;
   PyObject_GC_Track((PyObject*)pvec);
   return pvec;
@@ -744,36 +774,185 @@ static PVector* copyPVector(PVector *original) {
   return newVec;
 }
 
+/*
+ Moves the full tail of newVec into the tree and gives it a new, empty, tail. The count is
+ left as is so the caller must add at least one item to the tail before the vector is
+ consistent again.
+*/
+static void pushTailIntoTree(PVector *newVec) {
+  VNode* new_root;
+  if(ROOT_NODE_FULL(newVec)) {
+    new_root = newNode();
+    new_root->items[0] = newVec->root;
+    new_root->items[1] = newPath(newVec->shift, newVec->tail);
+    newVec->shift += SHIFT;
+  } else {
+    new_root = pushTail(newVec->shift, newVec->count, newVec->root, newVec->tail);
+    releaseNode(newVec->shift, newVec->root);
+  }
+
+  newVec->root = new_root;
+
+  // Need to adjust the ref count of the old tail here since no new references were
+  // actually created, we just moved the tail.
+  DEC_NODE_REF_COUNT(newVec->tail);
+  newVec->tail = newNode();
+}
+
 /* Does not steal a reference, this must be managed outside of this function */
 static void extendWithItem(PVector *newVec, PyObject *item) {
   unsigned int tail_size = TAIL_SIZE(newVec);
 
   if(tail_size >= BRANCH_FACTOR) {
-    VNode* new_root;
-    if(ROOT_NODE_FULL(newVec)) {
-      new_root = newNode();
-      new_root->items[0] = newVec->root;
-      new_root->items[1] = newPath(newVec->shift, newVec->tail);
-      newVec->shift += SHIFT;
+    pushTailIntoTree(newVec);
+    tail_size = 0;
+  }
+
+  newVec->tail->items[tail_size] = item;    
+  newVec->count++;
+}
+
+static void copyItems(void **dest, void **src, Py_ssize_t count) {
+  Py_ssize_t i;
+  for(i = 0; i < count; i++) {
+    Py_INCREF((PyObject*)src[i]);
+    dest[i] = src[i];
+  }
+}
+
+/*
+ Appends the elements from start to stop in source to newVec. Complete leaves of source
+ are shared as is where they line up with the leaves of newVec, other elements are copied
+ one leaf slice at a time.
+*/
+static void extendWithRange(PVector *newVec, PVector *source, Py_ssize_t start, Py_ssize_t stop) {
+  while(start < stop) {
+    Py_ssize_t tail_size = TAIL_SIZE(newVec);
+    Py_ssize_t offset = start & BIT_MASK;
+    Py_ssize_t length = BRANCH_FACTOR - offset;
+    VNode *node = nodeFor(source, start);
+
+    if(length > stop - start) {
+      length = stop - start;
+    }
+
+    if(tail_size >= BRANCH_FACTOR) {
+      pushTailIntoTree(newVec);
+      tail_size = 0;
+    }
+
+    if((length == BRANCH_FACTOR) && (tail_size == 0)) {
+      // Leaves are never modified once released, share it
+      releaseNode(0, newVec->tail);
+      INC_NODE_REF_COUNT(node);
+      newVec->tail = node;
     } else {
-      new_root = pushTail(newVec->shift, newVec->count, newVec->root, newVec->tail);
-      releaseNode(newVec->shift, newVec->root);
+      if(length > BRANCH_FACTOR - tail_size) {
+        length = BRANCH_FACTOR - tail_size;
+      }
+
+      copyItems(&newVec->tail->items[tail_size], &node->items[offset], length);
     }
 
-    newVec->root = new_root;
+    newVec->count += length;
+    start += length;
+  }
+}
+
+/*
+ Returns a new reference to node with all elements beyond the index last cut away.
+ Sub nodes that are not affected are shared.
+*/
+static VNode* trimNode(unsigned int level, VNode *node, Py_ssize_t last) {
+  int i;
+  int subIndex = (last >> level) & BIT_MASK;
+  VNode *child = node->items[subIndex];
+  VNode *result;
 
-    // Need to adjust the ref count of the old tail here since no new references were
-    // actually created, we just moved the tail.
-    DEC_NODE_REF_COUNT(newVec->tail);
-    newVec->tail = newNode();
-    tail_size = 0;
+  if(level > SHIFT) {
+    child = trimNode(level - SHIFT, child, last);
+  } else {
+    INC_NODE_REF_COUNT(child);
   }
 
-  newVec->tail->items[tail_size] = item;    
-  newVec->count++;
+  if((child == node->items[subIndex]) && ((subIndex == BIT_MASK) || (node->items[subIndex + 1] == NULL))) {
+    DEC_NODE_REF_COUNT(child);
+    INC_NODE_REF_COUNT(node);
+    return node;
+  }
+
+  result = newNode();
+  for(i = 0; i < subIndex; i++) {
+    result->items[i] = node->items[i];
+    INC_NODE_REF_COUNT((VNode*)result->items[i]);
+  }
+
+  result->items[subIndex] = child;
+  return result;
+}
+
+/*
+ Returns a new vector holding the first n elements of self. All complete leaves are shared
+ with self so this is log32(n). The new vector has not been released yet and may be extended
+ in place.
+*/
+static PVector* newPrefixVector(PVector *self, Py_ssize_t n) {
+  PVector *result;
+  VNode *root;
+  unsigned int shift;
+
+  if(n <= 0) {
+    return copyPVector(EMPTY_VECTOR);
+  }
+
+  if(n >= self->count) {
+    return copyPVector(self);
+  }
+
+  Py_ssize_t tail_off = TAIL_OFF(self);
+  if(n > tail_off) {
+    INC_NODE_REF_COUNT(self->root);
+    result = newPvec(n, self->shift, self->root);
+    copyItems(result->tail->items, self->tail->items, n - tail_off);
+    return result;
+  }
+
+  // The leaf holding the last element becomes the new tail
+  VNode *leaf = nodeFor(self, n - 1);
+  tail_off = ((n - 1) >> SHIFT) << SHIFT;
+  if(tail_off == 0) {
+    root = newNode();
+    shift = SHIFT;
+  } else {
+    Py_ssize_t last = tail_off - 1;
+    root = self->root;
+    shift = self->shift;
+    while((shift > SHIFT) && ((last >> shift) == 0)) {
+      root = root->items[0];
+      shift -= SHIFT;
+    }
+
+    root = trimNode(shift, root, last);
+  }
+
+  result = newPvec(n, shift, root);
+  copyItems(result->tail->items, leaf->items, n - tail_off);
+  return result;
 }
 
 
+/*
+ Returns a new vector holding the elements of self from start to stop.
+*/
+static PVector* newSliceVector(PVector *self, Py_ssize_t start, Py_ssize_t stop) {
+  PVector *newVec = newPrefixVector(self, (start == 0) ? stop : 0);
+  if(start > 0) {
+    extendWithRange(newVec, self, start, stop);
+  }
+
+  return newVec;
+}
+
 #define SLICE_CAST
 
 static PyObject *PVector_subscript(PVector* self, PyObject* item) {
@@ -799,6 +978,8 @@ static PyObject *PVector_subscript(PVector* self, PyObject* item) {
     } else if((slicelength == self->count) && (step > 0)) {
       Py_INCREF(self);
       return (PyObject*)self;
+    } else if(step == 1) {
+      return (PyObject*)newSliceVector(self, start, stop);
     } else {
       PVector *newVec = copyPVector(EMPTY_VECTOR);
       for (cur=start, i=0; i<slicelength; cur += (size_t)step, i++) {
@@ -840,6 +1021,19 @@ static PyObject* PVector_extend(PVector *self, PyObject *iterable) {
     PyObject *it;
     PyObject *(*iternext)(PyObject *);
 
+    if(PVector_CheckExact(iterable)) {
+      PVector *other = (PVector*)iterable;
+      if((other->count == 0) || (self->count == 0)) {
+        PyObject *result = (PyObject*)((other->count == 0) ? self : other);
+        Py_INCREF(result);
+        return result;
+      }
+
+      PVector *newVec = copyPVector(self);
+      extendWithRange(newVec, other, 0, other->count);
+      return (PyObject*)newVec;
+    }
+
     it = PyObject_GetIter(iterable);
     if (it == NULL) {
         return NULL;
@@ -1011,8 +1205,7 @@ static PyObject* PVector_mset(PVector *self, PyObject *args) {
 
 static PyObject* internalDelete(PVector *self, Py_ssize_t index, PyObject *stop_obj) {
   Py_ssize_t stop;
-  PyObject *list;
-  PyObject *result;
+  PVector *newVec;
 
   if (index < 0) {
     index += self->count;
@@ -1041,14 +1234,23 @@ static PyObject* internalDelete(PVector *self, Py_ssize_t index, PyObject *stop_
     stop = index + 1;
   }
 
-  list = PVector_toList(self);
-  if(PyList_SetSlice(list, index, stop, NULL) < 0) {
-    return NULL;
+  // Same bounds handling as for list slices
+  if (index < 0) {
+    index = 0;
   }
 
-  result = PVector_extend(EMPTY_VECTOR, list);
-  Py_DECREF(list);
-  return result;
+  if (stop > self->count) {
+    stop = self->count;
+  }
+
+  if (index >= stop) {
+    Py_INCREF(self);
+    return (PyObject*)self;
+  }
+
+  newVec = newPrefixVector(self, index);
+  extendWithRange(newVec, self, stop, self->count);
+  return (PyObject*)newVec;
 }
 
 static PyObject* PVector_delete(PVector *self, PyObject *args) {
@@ -1062,6 +1264,34 @@ static PyObject* PVector_delete(PVector *self, PyObject *args) {
   return internalDelete(self, index, stop_obj);
 }
 
+static PyObject* PVector_insert(PVector *self, PyObject *args) {
+  Py_ssize_t index;
+  PyObject *obj;
+  PVector *newVec;
+
+  if(!PyArg_ParseTuple(args, "nO:insert", &index, &obj)) {
+    return NULL;
+  }
+
+  // Same bounds handling as for list.insert
+  if (index < 0) {
+    index += self->count;
+    if (index < 0) {
+      index = 0;
+    }
+  }
+
+  if (index > self->count) {
+    index = self->count;
+  }
+
+  newVec = newPrefixVector(self, index);
+  Py_INCREF(obj);
+  extendWithItem(newVec, obj);
+  extendWithRange(newVec, self, index, self->count);
+  return (PyObject*)newVec;
+}
+
 static PyObject* PVector_remove(PVector *self, PyObject *args) {
   Py_ssize_t index;
   PyObject* py_index = PVector_index(self, args);
@@ -1076,6 +1306,144 @@ static PyObject* PVector_remove(PVector *self, PyObject *args) {
   return NULL;
 }
 
+/*
+ Diffing. The trees of the two vectors are walked in parallel and sub trees shared between
+ them are skipped. Indices where the elements differ are collected into ranges which are added
+ to the result as splices (start, stop, elements of other from start to stop).
+*/
+typedef struct {
+  PyObject *splices;
+  PVector *other;
+  Py_ssize_t start;
+  Py_ssize_t stop;
+} DiffState;
+
+static int addSplice(DiffState *state, Py_ssize_t start, Py_ssize_t stop, PVector *values) {
+  PyObject *splice = Py_BuildValue("(nnN)", start, stop, values);
+  if(splice == NULL) {
+    return -1;
+  }
+
+  int result = PyList_Append(state->splices, splice);
+  Py_DECREF(splice);
+  return result;
+}
+
+static int flushDiffRange(DiffState *state) {
+  if(state->start < state->stop) {
+    return addSplice(state, state->start, state->stop, newSliceVector(state->other, state->start, state->stop));
+  }
+
+  return 0;
+}
+
+static int diffItems(DiffState *state, PyObject *item1, PyObject *item2, Py_ssize_t index) {
+  int equal = PyObject_RichCompareBool(item1, item2, Py_EQ);
+  if(equal < 0) {
+    return -1;
+  }
+
+  if(!equal) {
+    if(index != state->stop) {
+      if(flushDiffRange(state) < 0) {
+        return -1;
+      }
+
+      state->start = index;
+    }
+
+    state->stop = index + 1;
+  }
+
+  return 0;
+}
+
+static int diffNodes(DiffState *state, VNode *node1, VNode *node2, unsigned int level, Py_ssize_t offset, Py_ssize_t limit) {
+  Py_ssize_t i;
+  if(node1 == node2) {
+    return 0;
+  }
+
+  if(level == 0) {
+    for(i = 0; (i < BRANCH_FACTOR) && (offset + i < limit); i++) {
+      if(diffItems(state, node1->items[i], node2->items[i], offset + i) < 0) {
+        return -1;
+      }
+    }
+  } else {
+    for(i = 0; (i < BRANCH_FACTOR) && (offset + (i << level) < limit); i++) {
+      if(diffNodes(state, node1->items[i], node2->items[i], level - SHIFT, offset + (i << level), limit) < 0) {
+        return -1;
+      }
+    }
+  }
+
+  return 0;
+}
+
+static PyObject* PVector_diff(PVector *self, PyObject *other_obj) {
+  PVector *other;
+  PyObject *result = NULL;
+  Py_ssize_t i;
+
+  if(PyObject_TypeCheck(other_obj, &PVectorType)) {
+    Py_INCREF(other_obj);
+    other = (PVector*)other_obj;
+  } else {
+    other = (PVector*)PVector_extend(EMPTY_VECTOR, other_obj);
+    if(other == NULL) {
+      return NULL;
+    }
+  }
+
+  DiffState state = {PyList_New(0), other, 0, 0};
+  if(state.splices == NULL) {
+    goto done;
+  }
+
+  Py_ssize_t treeLimit = Py_MIN(TAIL_OFF(self), TAIL_OFF(other));
+  Py_ssize_t common = Py_MIN(self->count, other->count);
+  if(treeLimit > 0) {
+    VNode *root1 = self->root;
+    VNode *root2 = other->root;
+    unsigned int shift1 = self->shift;
+    unsigned int shift2 = other->shift;
+    for(; shift1 > shift2; shift1 -= SHIFT) {
+      root1 = root1->items[0];
+    }
+
+    for(; shift2 > shift1; shift2 -= SHIFT) {
+      root2 = root2->items[0];
+    }
+
+    if(diffNodes(&state, root1, root2, shift1, 0, treeLimit) < 0) {
+      goto done;
+    }
+  }
+
+  for(i = treeLimit; i < common; i++) {
+    if(diffItems(&state, _get_item(self, i), _get_item(other, i), i) < 0) {
+      goto done;
+    }
+  }
+
+  if(flushDiffRange(&state) < 0) {
+    goto done;
+  }
+
+  if((self->count != other->count) &&
+     (addSplice(&state, common, self->count, newSliceVector(other, common, other->count)) < 0)) {
+    goto done;
+  }
+
+  result = PVector_extend(EMPTY_VECTOR, state.splices);
+
+done:
+  Py_XDECREF(state.splices);
+  Py_DECREF(other);
+  return result;
+}
+
 
 /*********************** PVector Iterator **************************/
 
@@ -1297,23 +1665,33 @@ static void PVectorEvolver_dealloc(PVectorEvolver *self) {
   }
 
   Py_DECREF(self->originalVector);
-  Py_DECREF(self->appendList);
 
   PyObject_GC_Del(self);
   Py_TRASHCAN_END;
 }
 
-static PyObject *PVectorEvolver_append(PVectorEvolver *self, PyObject *args) {
-  if (PyList_Append(self->appendList, args) == 0) {
-    Py_INCREF(self);
-    return (PyObject*)self;
-  }
+static void evolverAppend(PVectorEvolver *self, PyObject *item);
 
-  return NULL;
+static PyObject *PVectorEvolver_append(PVectorEvolver *self, PyObject *args) {
+  evolverAppend(self, args);
+  Py_INCREF(self);
+  return (PyObject*)self;
 }
 
 static PyObject *PVectorEvolver_extend(PVectorEvolver *self, PyObject *args) {
-  if (PyList_SetSlice(self->appendList, PY_SSIZE_T_MAX, PY_SSIZE_T_MAX, args) < 0) {
+  PyObject *iterator = PyObject_GetIter(args);
+  PyObject *item;
+  if(iterator == NULL) {
+    return NULL;
+  }
+
+  while((item = PyIter_Next(iterator)) != NULL) {
+    evolverAppend(self, item);
+    Py_DECREF(item);
+  }
+
+  Py_DECREF(iterator);
+  if(PyErr_Occurred()) {
     return NULL;
   }
 
@@ -1329,17 +1707,13 @@ static PyObject *PVectorEvolver_subscript(PVectorEvolver *self, PyObject *item)
     }
 
     if (position < 0) {
-      position += self->newVector->count + PyList_GET_SIZE(self->appendList);
+      position += self->newVector->count;
     }
 
     if(0 <= position && position < self->newVector->count) {
       PyObject *result = _get_item(self->newVector, position);
       Py_XINCREF(result);
       return result;
-    } else if (0 <= position && position < (self->newVector->count + PyList_GET_SIZE(self->appendList))) {
-      PyObject *result = PyList_GetItem(self->appendList, position - self->newVector->count);
-      Py_INCREF(result);
-      return result;
     } else {
       PyErr_SetString(PyExc_IndexError, "Index out of range");
     }
@@ -1442,6 +1816,120 @@ static int internalPVectorDelete(PVectorEvolver *self, Py_ssize_t position) {
   return 0;
 }
 
+/*
+ The evolver works on a vector of its own that has not been released. Nodes that have been
+ created by the evolver are marked dirty, they are owned by the evolver and are updated in
+ place. Clean nodes may be shared with other vectors and are copied before being updated.
+ While the evolver holds the vector its clean root and tail are referenced without being
+ counted, the counts are adjusted when the vector is cleaned.
+*/
+static void ensureNewVector(PVectorEvolver *self) {
+  if(self->originalVector == self->newVector) {
+    // Create new vector since we're about to modify the original
+    self->newVector = rawCopyPVector(self->originalVector);
+  }
+}
+
+static VNode* newDirtyNode(void) {
+  VNode *result = newNode();
+  SET_DIRTY(result);
+  return result;
+}
+
+static VNode* newDirtyPath(unsigned int level, VNode* node) {
+  if(level == 0) {
+    return node;
+  }
+
+  VNode* result = newDirtyNode();
+  result->items[0] = newDirtyPath(level - SHIFT, node);
+  return result;
+}
+
+static VNode* pushTailWithDirty(unsigned int level, unsigned int count, VNode* parent, VNode* tail) {
+  int subIndex = ((count - 1) >> level) & BIT_MASK;
+  VNode* result = parent;
+
+  if(!IS_DIRTY(parent)) {
+    result = copyNode(parent);
+    SET_DIRTY(result);
+  }
+
+  if(level == SHIFT) {
+    result->items[subIndex] = tail;
+  } else {
+    VNode* child = result->items[subIndex];
+    if(child != NULL) {
+      result->items[subIndex] = pushTailWithDirty(level - SHIFT, count, child, tail);
+      if(result->items[subIndex] != child) {
+        // Child replaced by a dirty copy, drop the reference to the old child
+        DEC_NODE_REF_COUNT(child);
+      }
+    } else {
+      result->items[subIndex] = newDirtyPath(level - SHIFT, tail);
+    }
+  }
+
+  return result;
+}
+
+static void evolverAppend(PVectorEvolver *self, PyObject *item) {
+  ensureNewVector(self);
+  PVector *vector = self->newVector;
+  unsigned int tailSize = TAIL_SIZE(vector);
+
+  if(tailSize >= BRANCH_FACTOR) {
+    VNode *tail = vector->tail;
+    if(!IS_DIRTY(tail)) {
+      // The tail is now referenced from a node in the tree
+      INC_NODE_REF_COUNT(tail);
+    }
+
+    if(ROOT_NODE_FULL(vector)) {
+      VNode *root = newDirtyNode();
+      if(!IS_DIRTY(vector->root)) {
+        INC_NODE_REF_COUNT(vector->root);
+      }
+
+      root->items[0] = vector->root;
+      root->items[1] = newDirtyPath(vector->shift, tail);
+      vector->root = root;
+      vector->shift += SHIFT;
+    } else {
+      vector->root = pushTailWithDirty(vector->shift, vector->count, vector->root, tail);
+    }
+
+    vector->tail = newDirtyNode();
+    tailSize = 0;
+  } else if(!IS_DIRTY(vector->tail)) {
+    VNode *tail = newDirtyNode();
+    copyItems(tail->items, vector->tail->items, tailSize);
+    vector->tail = tail;
+  }
+
+  Py_INCREF(item);
+  vector->tail->items[tailSize] = item;
+  vector->count++;
+}
+
+static void evolverPop(PVectorEvolver *self) {
+  ensureNewVector(self);
+  PVector *vector = self->newVector;
+  unsigned int tailSize = TAIL_SIZE(vector);
+  PyObject *item = vector->tail->items[tailSize - 1];
+
+  if(IS_DIRTY(vector->tail)) {
+    vector->tail->items[tailSize - 1] = NULL;
+    vector->count--;
+    Py_DECREF(item);
+  } else {
+    VNode *tail = newDirtyNode();
+    copyItems(tail->items, vector->tail->items, tailSize - 1);
+    vector->tail = tail;
+    vector->count--;
+  }
+}
+
 static int PVectorEvolver_set_item(PVectorEvolver *self, PyObject* item, PyObject* value) {
   if (PyIndex_Check(item)) {
     Py_ssize_t position = PyNumber_AsSsize_t(item, PyExc_IndexError);
@@ -1450,16 +1938,12 @@ static int PVectorEvolver_set_item(PVectorEvolver *self, PyObject* item, PyObjec
     }
          
     if (position < 0) {
-      position += self->newVector->count + PyList_GET_SIZE(self->appendList);
+      position += self->newVector->count;
     }
 
     if((0 <= position) && (position < self->newVector->count)) {
-      if(self->originalVector == self->newVector) {
-        // Create new vector since we're about to modify the original
-        self->newVector = rawCopyPVector(self->originalVector);
-      }
-
       if(value != NULL) {
+        ensureNewVector(self);
         if(position < TAIL_OFF(self->newVector)) {
           self->newVector->root = doSetWithDirty(self->newVector->root, self->newVector->shift, position, value);
         } else {
@@ -1469,21 +1953,16 @@ static int PVectorEvolver_set_item(PVectorEvolver *self, PyObject* item, PyObjec
         return 0;
       }
 
-      return internalPVectorDelete(self, position);
-    } else if((0 <= position) && (position < (self->newVector->count + PyList_GET_SIZE(self->appendList)))) {
-      if (value != NULL) {
-        int result = PyList_SetItem(self->appendList, position - self->newVector->count, value); 
-        if(result == 0) {
-          Py_INCREF(value);
-        }
-        return result;
+      if((position == self->newVector->count - 1) && ((TAIL_SIZE(self->newVector) > 1) || (position == 0))) {
+        // Deleting the last element, no need to touch the tree as long as the tail is non empty afterwards
+        evolverPop(self);
+        return 0;
       }
 
       return internalPVectorDelete(self, position);
-    } else if((0 <= position)
-              && (position < (self->newVector->count + PyList_GET_SIZE(self->appendList) + 1))
-              && (value != NULL)) {
-        return PyList_Append(self->appendList, value);
+    } else if((position == self->newVector->count) && (value != NULL)) {
+      evolverAppend(self, value);
+      return 0;
     } else {
       PyErr_Format(PyExc_IndexError, "Index out of range: %zd", position);
     }
@@ -1494,33 +1973,22 @@ static int PVectorEvolver_set_item(PVectorEvolver *self, PyObject* item, PyObjec
 }
 
 static PyObject *PVectorEvolver_persistent(PVectorEvolver *self) {
-  PVector *resultVector;
   if(self->newVector != self->originalVector) {
     cleanVector(self->newVector);
     Py_DECREF(self->originalVector);
   }
 
-  resultVector = self->newVector;
-
-  if(PyList_GET_SIZE(self->appendList)) {
-    PVector *oldVector = resultVector;
-    resultVector = (PVector*)PVector_extend(resultVector, self->appendList);
-    Py_DECREF(oldVector);
-    Py_DECREF(self->appendList);
-    self->appendList = NULL;
-  }
-
-  initializeEvolver(self, resultVector, self->appendList);
-  Py_INCREF(resultVector);  
-  return (PyObject*)resultVector;
+  initializeEvolver(self, self->newVector);
+  Py_INCREF(self->newVector);
+  return (PyObject*)self->newVector;
 }
 
 static Py_ssize_t PVectorEvolver_len(PVectorEvolver *self) {
-  return self->newVector->count + PyList_GET_SIZE(self->appendList);
+  return self->newVector->count;
 }
 
 static PyObject* PVectorEvolver_is_dirty(PVectorEvolver *self) {
-  if((self->newVector != self->originalVector) || (PyList_GET_SIZE(self->appendList) > 0)) {
+  if(self->newVector != self->originalVector) {
     Py_INCREF(Py_True);
     return Py_True;
   }
@@ -1534,10 +2002,252 @@ static int PVectorEvolver_traverse(PVectorEvolver *self, visitproc visit, void *
   if (self->newVector != self->originalVector) {
       Py_VISIT(self->originalVector);
   }
-  Py_VISIT(self->appendList);
   return 0;
 }
 
+/*********************** Snapshot support ************************/
+
+/*
+ Conversion between the nodes of a vector and nested lists laid out like the nodes
+ of the Python implementation, used by pyrsistent.snapshot. Both directions memoize
+ nodes so that a node shared between vectors becomes a single list and vice versa.
+
+ The export memo maps node addresses to a tuple (list, vector). The vector keeps the
+ node alive, and with it the address, for as long as the memo is in use.
+
+ The import memo maps (id(list), level) to a tuple (list, capsule, size) where the
+ capsule holds a reference to the node and size is the number of elements below it.
+*/
+
+#define NODE_CAPSULE_NAME "pvectorc.node"
+#define MAX_SHIFT 30
+
+static PyObject* exportNode(VNode *node, unsigned int level, PyObject *owner, PyObject *memo) {
+  PyObject *key = PyLong_FromVoidPtr(node);
+  if(key == NULL) {
+    return NULL;
+  }
+
+  PyObject *entry = PyDict_GetItemWithError(memo, key);
+  if(entry != NULL) {
+    Py_DECREF(key);
+    PyObject *result = PyTuple_GET_ITEM(entry, 0);
+    Py_INCREF(result);
+    return result;
+  }
+
+  if(PyErr_Occurred()) {
+    Py_DECREF(key);
+    return NULL;
+  }
+
+  Py_ssize_t size = 0;
+  while(size < BRANCH_FACTOR && node->items[size] != NULL) {
+    size++;
+  }
+
+  PyObject *result = PyList_New(size);
+  if(result == NULL) {
+    Py_DECREF(key);
+    return NULL;
+  }
+
+  for(Py_ssize_t i = 0; i < size; i++) {
+    PyObject *item;
+    if(level == 0) {
+      item = (PyObject*)node->items[i];
+      Py_INCREF(item);
+    } else {
+      item = exportNode(node->items[i], level - SHIFT, owner, memo);
+      if(item == NULL) {
+        Py_DECREF(result);
+        Py_DECREF(key);
+        return NULL;
+      }
+    }
+
+    PyList_SET_ITEM(result, i, item);
+  }
+
+  entry = PyTuple_Pack(2, result, owner);
+  if(entry == NULL || PyDict_SetItem(memo, key, entry) < 0) {
+    Py_XDECREF(entry);
+    Py_DECREF(result);
+    Py_DECREF(key);
+    return NULL;
+  }
+
+  Py_DECREF(entry);
+  Py_DECREF(key);
+  return result;
+}
+
+static PyObject* pyrsistent_export_tree(PyObject *self, PyObject *args) {
+  PVector *vector;
+  PyObject *memo;
+  if(!PyArg_ParseTuple(args, "O!O!", &PVectorType, &vector, &PyDict_Type, &memo)) {
+    return NULL;
+  }
+
+  PyObject *root = exportNode(vector->root, vector->shift, (PyObject*)vector, memo);
+  if(root == NULL) {
+    return NULL;
+  }
+
+  Py_ssize_t tailSize = TAIL_SIZE(vector);
+  PyObject *tail = PyList_New(tailSize);
+  if(tail == NULL) {
+    Py_DECREF(root);
+    return NULL;
+  }
+
+  for(Py_ssize_t i = 0; i < tailSize; i++) {
+    PyObject *item = (PyObject*)vector->tail->items[i];
+    Py_INCREF(item);
+    PyList_SET_ITEM(tail, i, item);
+  }
+
+  return Py_BuildValue("(IINN)", vector->count, vector->shift, root, tail);
+}
+
+static void releaseNodeCapsule(PyObject *capsule) {
+  VNode *node = PyCapsule_GetPointer(capsule, NODE_CAPSULE_NAME);
+  releaseNode((int)(Py_ssize_t)PyCapsule_GetContext(capsule), node);
+}
+
+static VNode* invalidNode(unsigned int level, VNode *node) {
+  releaseNode(level, node);
+  PyErr_SetString(PyExc_ValueError, "Invalid vector node in snapshot");
+  return NULL;
+}
+
+/*
+ Returns a new reference to the node built from list and stores the number of
+ elements below it in size. Only trees that are packed to the left with full leaves,
+ like the ones built by the vector operations, are accepted.
+*/
+static VNode* importNode(PyObject *list, unsigned int level, Py_ssize_t *size, PyObject *memo) {
+  PyObject *key = Py_BuildValue("(NI)", PyLong_FromVoidPtr(list), level);
+  if(key == NULL) {
+    return NULL;
+  }
+
+  PyObject *entry = PyDict_GetItemWithError(memo, key);
+  if(entry != NULL) {
+    Py_DECREF(key);
+    VNode *node = PyCapsule_GetPointer(PyTuple_GET_ITEM(entry, 1), NODE_CAPSULE_NAME);
+    *size = PyLong_AsSsize_t(PyTuple_GET_ITEM(entry, 2));
+    INC_NODE_REF_COUNT(node);
+    return node;
+  }
+
+  if(PyErr_Occurred()) {
+    Py_DECREF(key);
+    return NULL;
+  }
+
+  if(!PyList_CheckExact(list) || PyList_GET_SIZE(list) > BRANCH_FACTOR) {
+    Py_DECREF(key);
+    return invalidNode(level, NULL);
+  }
+
+  Py_ssize_t length = PyList_GET_SIZE(list);
+  VNode *node = newNode();
+  Py_ssize_t total = 0;
+  if(level == 0) {
+    if(length != BRANCH_FACTOR) {
+      Py_DECREF(key);
+      return invalidNode(level, node);
+    }
+
+    for(Py_ssize_t i = 0; i < length; i++) {
+      PyObject *item = PyList_GET_ITEM(list, i);
+      Py_INCREF(item);
+      node->items[i] = item;
+    }
+
+    total = BRANCH_FACTOR;
+  } else {
+    // Every child but the last one must be full
+    Py_ssize_t capacity = (Py_ssize_t)1 << level;
+    for(Py_ssize_t i = 0; i < length; i++) {
+      Py_ssize_t childSize;
+      VNode *child = importNode(PyList_GET_ITEM(list, i), level - SHIFT, &childSize, memo);
+      if(child == NULL) {
+        Py_DECREF(key);
+        releaseNode(level, node);
+        return NULL;
+      }
+
+      node->items[i] = child;
+      total += childSize;
+      if(childSize == 0 || (childSize != capacity && i != length - 1)) {
+        Py_DECREF(key);
+        return invalidNode(level, node);
+      }
+    }
+  }
+
+  PyObject *capsule = PyCapsule_New(node, NODE_CAPSULE_NAME, releaseNodeCapsule);
+  if(capsule == NULL) {
+    Py_DECREF(key);
+    releaseNode(level, node);
+    return NULL;
+  }
+
+  // The capsule owns one reference to the node, the caller gets the other one
+  INC_NODE_REF_COUNT(node);
+  PyCapsule_SetContext(capsule, (void*)(Py_ssize_t)level);
+  entry = Py_BuildValue("(ONn)", list, capsule, total);
+  if(entry == NULL || PyDict_SetItem(memo, key, entry) < 0) {
+    Py_XDECREF(entry);
+    Py_DECREF(key);
+    releaseNode(level, node);
+    return NULL;
+  }
+
+  Py_DECREF(entry);
+  Py_DECREF(key);
+  *size = total;
+  return node;
+}
+
+static PyObject* pyrsistent_import_tree(PyObject *self, PyObject *args) {
+  unsigned int count, shift;
+  PyObject *root, *tail, *memo;
+  if(!PyArg_ParseTuple(args, "IIO!O!O!", &count, &shift, &PyList_Type, &root, &PyList_Type, &tail, &PyDict_Type, &memo)) {
+    return NULL;
+  }
+
+  Py_ssize_t treeSize = (count < BRANCH_FACTOR) ? 0 : (((count - 1) >> SHIFT) << SHIFT);
+  if(shift < SHIFT || shift > MAX_SHIFT || shift % SHIFT != 0 ||
+     PyList_GET_SIZE(tail) != (Py_ssize_t)count - treeSize ||
+     treeSize > ((Py_ssize_t)1 << (shift + SHIFT))) {
+    PyErr_SetString(PyExc_ValueError, "Invalid vector in snapshot");
+    return NULL;
+  }
+
+  Py_ssize_t size;
+  VNode *rootNode = importNode(root, shift, &size, memo);
+  if(rootNode == NULL) {
+    return NULL;
+  }
+
+  if(size != treeSize) {
+    invalidNode(shift, rootNode);
+    return NULL;
+  }
+
+  PVector *result = newPvec(count, shift, rootNode);
+  for(Py_ssize_t i = 0; i < PyList_GET_SIZE(tail); i++) {
+    PyObject *item = PyList_GET_ITEM(tail, i);
+    Py_INCREF(item);
+    result->tail->items[i] = item;
+  }
+
+  return (PyObject*)result;
+}
+
 static PyMethodDef PyrsistentMethods[] = {
   {"pvector", pyrsistent_pvec, METH_VARARGS, 
    "pvector([iterable])\n"
@@ -1545,6 +2255,12 @@ static PyMethodDef PyrsistentMethods[] = {
    ">>> v1 = pvector([1, 2, 3])\n"
    ">>> v1\n"
    "pvector([1, 2, 3])"},
+  {"export_tree", pyrsistent_export_tree, METH_VARARGS,
+   "export_tree(vector, memo)\n"
+   "Return (count, shift, root, tail) of vector with the nodes converted to lists, see pyrsistent.snapshot."},
+  {"import_tree", pyrsistent_import_tree, METH_VARARGS,
+   "import_tree(count, shift, root, tail, memo)\n"
+   "Create a vector from the output of export_tree(), see pyrsistent.snapshot."},
   {NULL, NULL, 0, NULL}
 };
 
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from pyrsistent._pmap import pmap, m, PMap
+from pyrsistent._pmap import pmap, m, PMap, pmap_from_hashed
 
 from pyrsistent._pvector import pvector, v, PVector
 
@@ -27,12 +27,12 @@ from pyrsistent._immutable import immutable
 
 from pyrsistent._helpers import freeze, thaw, mutant
 
-from pyrsistent._transformations import inc, discard, rex, ny
+from pyrsistent._transformations import inc, discard, rex, ny, compile_transform
 
 from pyrsistent._toolz import get_in
 
 
-__all__ = ('pmap', 'm', 'PMap',
+__all__ = ('pmap', 'm', 'PMap', 'pmap_from_hashed',
            'pvector', 'v', 'PVector',
            'pset', 's', 'PSet',
            'pbag', 'b', 'PBag',
@@ -44,4 +44,4 @@ __all__ = ('pmap', 'm', 'PMap',
            'immutable',
            'freeze', 'thaw', 'mutant',
            'get_in',
-           'inc', 'discard', 'rex', 'ny')
+           'inc', 'discard', 'rex', 'ny', 'compile_transform')
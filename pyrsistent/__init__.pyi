@@ -49,6 +49,7 @@ def pmap(initial: Mapping[KT, VT] = {}, pre_size: int = 0) -> PMap[KT, VT]: ...
 def pmap(initial: Iterable[Tuple[KT, VT]] = {}, pre_size: int = 0) -> PMap[KT, VT]: ...
 def pmap(initial: Union[Mapping[KT, VT], Iterable[Tuple[KT, VT]]] = {}, pre_size: int = 0) -> PMap[KT, VT]: ...
 def m(**kwargs: VT) -> PMap[str, VT]: ...
+def pmap_from_hashed(triples: Iterable[Tuple[int, KT, VT]]) -> PMap[KT, VT]: ...
 
 def pvector(iterable: Iterable[T] = ...) -> PVector[T]: ...
 def v(*iterable: T) -> PVector[T]: ...
@@ -127,10 +128,10 @@ def pvector_field(
 def pbag(elements: Iterable[T]) -> PBag[T]: ...
 def b(*elements: T) -> PBag[T]: ...
 
-def plist(iterable: Iterable[T] = (), reverse: bool = False) -> PList[T]: ...
+def plist(iterable: Iterable[T] = (), reverse: bool = False, counted: bool = False) -> PList[T]: ...
 def l(*elements: T) -> PList[T]: ...
 
-def pdeque(iterable: Optional[Iterable[T]] = None, maxlen: Optional[int] = None) -> PDeque[T]: ...
+def pdeque(iterable: Optional[Iterable[T]] = None, maxlen: Optional[int] = None, indexed: bool = False) -> PDeque[T]: ...
 def dq(*iterable: T) -> PDeque[T]: ...
 
 @overload
@@ -213,5 +214,6 @@ def discard(evolver: PVectorEvolver[T], key: int) -> None: ...
 def discard(evolver: PSetEvolver[T], key: T) -> None: ...
 def rex(expr: str) -> Callable[[Any], bool]: ...
 def ny(_: Any) -> bool: ...
+def compile_transform(*transformations: Any) -> Callable[[Any], Any]: ...
 
 def get_in(keys: Iterable, coll: Mapping, default: Optional[Any] = None, no_default: bool = False) -> Any: ...
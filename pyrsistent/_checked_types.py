@@ -305,6 +305,14 @@ class CheckedPVector(Generic[T_co], PythonPVector, CheckedType, metaclass=_Check
     def extend(self, it):
         return self.evolver().extend(it).persistent()
 
+    def insert(self, index, val):
+        _check_types([val], self._checked_types, self.__class__)
+        error_data = _invariant_errors_iterable([val], self._checked_invariants)
+        if error_data:
+            raise InvariantException(error_codes=error_data)
+
+        return self.__class__(super(CheckedPVector, self).insert(index, val))
+
     create = classmethod(_checked_type_create)
 
     def serialize(self, format=None):
@@ -542,6 +550,6 @@ class CheckedPMap(PMap[KT, VT_co], CheckedType, metaclass=_CheckedMapTypeMeta):
                 raise InvariantException(error_codes=self._invariant_errors)
 
             if self.is_dirty() or type(self._original_pmap) != self._destination_class:
-                return self._destination_class(self._buckets_evolver.persistent(), self._size)
+                return self._with_entries_hash(self._destination_class(self._persistent_root(), self._size))
 
             return self._original_pmap
@@ -44,6 +44,119 @@ def check_type(destination_cls, field, name, value):
         raise PTypeError(destination_cls, name, field.type, actual_type, message)
 
 
+def apply_factory(type_cls, field, value, ignore_extra):
+    if is_field_ignore_extra_complaint(type_cls, field, ignore_extra):
+        return field.factory(value, ignore_extra=ignore_extra)
+
+    return field.factory(value)
+
+
+# The functions below produce source code for the checks of a field, used by PClass and PRecord
+# to generate specialized constructors when a class is defined. The code operates on a local
+# variable named value, checks that are no-ops for the field are left out. Objects referenced
+# by the code are added to namespace under names starting with prefix.
+
+def factory_source(namespace, prefix, field):
+    if field._factory is PFIELD_NO_FACTORY:
+        if len(field.type) != 1:
+            return []
+
+        typ = tuple(field.type)[0]
+        if isinstance(typ, type):
+            if not issubclass(typ, CheckedType):
+                return []
+            namespace[prefix + '_factory'] = typ.create
+            factory_call = '{0}_factory(value)'.format(prefix)
+        else:
+            # The type is given by name and can only be resolved when the field is used
+            factory_call = '{0}_field.factory(value)'.format(prefix)
+    else:
+        namespace[prefix + '_factory'] = field._factory
+        factory_call = '{0}_factory(value)'.format(prefix)
+
+    namespace[prefix + '_field'] = field
+    return ['if ignore_extra:',
+            '    value = apply_factory(type_cls, {0}_field, value, ignore_extra)'.format(prefix),
+            'else:',
+            '    value = ' + factory_call]
+
+
+def type_check_source(namespace, prefix, name, field):
+    if not field.type:
+        return []
+
+    namespace[prefix + '_field'] = field
+    check = 'check_type(cls, {0}_field, {1!r}, value)'.format(prefix, name)
+    if all(isinstance(t, type) for t in field.type):
+        namespace[prefix + '_types'] = tuple(field.type)
+        return ['if not isinstance(value, {0}_types):'.format(prefix), '    ' + check]
+
+    return [check]
+
+
+def invariant_source(namespace, prefix, field):
+    if field.invariant is PFIELD_NO_INVARIANT:
+        return None
+
+    namespace[prefix + '_invariant'] = field.invariant
+    return '{0}_invariant(value)'.format(prefix)
+
+
+def indent(lines, level):
+    return ['    ' * level + line for line in lines]
+
+
+def make_field_setters(fields, type_cls, missing_value=None):
+    """
+    Generate a function per field that runs the factory, type check and invariant of the field
+    on a value and returns the result. Invariant errors are collected in the lists passed in.
+
+    The factory only runs if factory_fields is None or holds the name of the field. If
+    missing_value is given, invariant errors raised by the factory are collected as well and
+    missing_value is returned, otherwise they propagate.
+    """
+    namespace = dict(type_cls=type_cls, _MISSING_VALUE=missing_value)
+    lines = []
+    for i, (name, field) in enumerate(fields.items()):
+        prefix = '_f{0}'.format(i)
+        lines.append('def {0}_set(cls, value, factory_fields, ignore_extra, invariant_errors, missing_fields):'.format(prefix))
+        factory = factory_source(namespace, prefix, field)
+        if factory:
+            lines.append('    if factory_fields is None or {0!r} in factory_fields:'.format(name))
+            if missing_value is None:
+                lines += indent(factory, 2)
+            else:
+                lines.append('        try:')
+                lines += indent(factory, 3)
+                lines += ['        except InvariantException as e:',
+                          '            invariant_errors += e.invariant_errors',
+                          '            missing_fields += e.missing_fields',
+                          '            return _MISSING_VALUE']
+
+        lines += indent(type_check_source(namespace, prefix, name, field), 1)
+        invariant = invariant_source(namespace, prefix, field)
+        if invariant:
+            lines += ['    is_ok, error_code = ' + invariant,
+                      '    if not is_ok:',
+                      '        invariant_errors.append(error_code)']
+        lines.append('    return value')
+
+    namespace = compile_functions(lines, namespace)
+    return dict((name, namespace['_f{0}_set'.format(i)]) for i, name in enumerate(fields))
+
+
+def compile_functions(lines, namespace):
+    namespace.update(apply_factory=apply_factory, check_type=check_type, check_global_invariants=check_global_invariants,
+                     InvariantException=InvariantException)
+    source = '\n'.join(lines)
+    try:
+        exec(source, namespace)
+    except SyntaxError as e:
+        raise SyntaxError(str(e) + ':\n' + source) from e
+
+    return namespace
+
+
 def is_type_cls(type_cls, field_type):
     if type(field_type) is set:
         return True
@@ -0,0 +1,335 @@
+# A persistent 2-3 finger tree annotated with sizes, used as the backing store of indexed pdeques.
+#
+# A tree at depth d holds items nested d levels deep in _Node instances, the elements themselves
+# live at depth 0 and have size one. Every function takes the depth of the tree it operates on
+# so that the size of an item can be determined without wrapping the elements.
+
+
+class _Empty(object):
+    __slots__ = ()
+    size = 0
+
+
+class _Single(object):
+    __slots__ = ('size', 'item')
+
+    def __init__(self, size, item):
+        self.size = size
+        self.item = item
+
+
+class _Deep(object):
+    __slots__ = ('size', 'prefix', 'middle', 'suffix')
+
+    def __init__(self, size, prefix, middle, suffix):
+        self.size = size
+        self.prefix = prefix
+        self.middle = middle
+        self.suffix = suffix
+
+
+class _Node(object):
+    __slots__ = ('size', 'items')
+
+    def __init__(self, size, items):
+        self.size = size
+        self.items = items
+
+
+EMPTY_TREE = _Empty()
+
+
+def _item_size(item, depth):
+    return item.size if depth else 1
+
+
+def _items_size(items, depth):
+    if depth:
+        return sum(node.size for node in items)
+
+    return len(items)
+
+
+def _deep(prefix, middle, suffix, depth):
+    return _Deep(_items_size(prefix, depth) + middle.size + _items_size(suffix, depth), prefix, middle, suffix)
+
+
+def _nodes(items, depth):
+    # Group items, at least two, into nodes of three with nodes of two at the end when needed
+    result = []
+    i = 0
+    count = len(items)
+    while count - i > 4 or count - i == 3:
+        node_items = items[i:i + 3]
+        result.append(_Node(_items_size(node_items, depth), node_items))
+        i += 3
+
+    while i < count:
+        node_items = items[i:i + 2]
+        result.append(_Node(_items_size(node_items, depth), node_items))
+        i += 2
+
+    return tuple(result)
+
+
+def from_items(items, depth=0):
+    """
+    Build a tree from a tuple of items in linear time.
+    """
+    count = len(items)
+    if count == 0:
+        return EMPTY_TREE
+
+    if count == 1:
+        return _Single(_item_size(items[0], depth), items[0])
+
+    if count <= 8:
+        half = count // 2
+        return _deep(items[:half], EMPTY_TREE, items[half:], depth)
+
+    return _deep(items[:3], from_items(_nodes(items[3:-3], depth), depth + 1), items[-3:], depth)
+
+
+def push_left(tree, item, depth=0):
+    if tree is EMPTY_TREE:
+        return _Single(_item_size(item, depth), item)
+
+    size = tree.size + _item_size(item, depth)
+    if type(tree) is _Single:
+        return _Deep(size, (item,), EMPTY_TREE, (tree.item,))
+
+    prefix = tree.prefix
+    if len(prefix) < 4:
+        return _Deep(size, (item,) + prefix, tree.middle, tree.suffix)
+
+    node_items = prefix[1:]
+    node = _Node(_items_size(node_items, depth), node_items)
+    return _Deep(size, (item, prefix[0]), push_left(tree.middle, node, depth + 1), tree.suffix)
+
+
+def push_right(tree, item, depth=0):
+    if tree is EMPTY_TREE:
+        return _Single(_item_size(item, depth), item)
+
+    size = tree.size + _item_size(item, depth)
+    if type(tree) is _Single:
+        return _Deep(size, (tree.item,), EMPTY_TREE, (item,))
+
+    suffix = tree.suffix
+    if len(suffix) < 4:
+        return _Deep(size, tree.prefix, tree.middle, suffix + (item,))
+
+    node_items = suffix[:3]
+    node = _Node(_items_size(node_items, depth), node_items)
+    return _Deep(size, tree.prefix, push_right(tree.middle, node, depth + 1), (suffix[3], item))
+
+
+def _deep_left(prefix, middle, suffix, depth):
+    # Like _deep but the prefix may be empty
+    if prefix:
+        return _deep(prefix, middle, suffix, depth)
+
+    if middle is EMPTY_TREE:
+        return from_items(suffix, depth)
+
+    node, middle = pop_left(middle, depth + 1)
+    return _deep(node.items, middle, suffix, depth)
+
+
+def _deep_right(prefix, middle, suffix, depth):
+    # Like _deep but the suffix may be empty
+    if suffix:
+        return _deep(prefix, middle, suffix, depth)
+
+    if middle is EMPTY_TREE:
+        return from_items(prefix, depth)
+
+    node, middle = pop_right(middle, depth + 1)
+    return _deep(prefix, middle, node.items, depth)
+
+
+def pop_left(tree, depth=0):
+    """
+    Return the leftmost item and the tree without it. The tree must not be empty.
+    """
+    if type(tree) is _Single:
+        return tree.item, EMPTY_TREE
+
+    prefix = tree.prefix
+    return prefix[0], _deep_left(prefix[1:], tree.middle, tree.suffix, depth)
+
+
+def pop_right(tree, depth=0):
+    """
+    Return the rightmost item and the tree without it. The tree must not be empty.
+    """
+    if type(tree) is _Single:
+        return tree.item, EMPTY_TREE
+
+    suffix = tree.suffix
+    return suffix[-1], _deep_right(tree.prefix, tree.middle, suffix[:-1], depth)
+
+
+def leftmost(tree):
+    if type(tree) is _Single:
+        return tree.item
+
+    return tree.prefix[0]
+
+
+def rightmost(tree):
+    if type(tree) is _Single:
+        return tree.item
+
+    return tree.suffix[-1]
+
+
+def _concat(tree1, items, tree2, depth):
+    if tree1 is EMPTY_TREE:
+        for item in reversed(items):
+            tree2 = push_left(tree2, item, depth)
+        return tree2
+
+    if tree2 is EMPTY_TREE:
+        for item in items:
+            tree1 = push_right(tree1, item, depth)
+        return tree1
+
+    if type(tree1) is _Single:
+        return push_left(_concat(EMPTY_TREE, items, tree2, depth), tree1.item, depth)
+
+    if type(tree2) is _Single:
+        return push_right(_concat(tree1, items, EMPTY_TREE, depth), tree2.item, depth)
+
+    middle = _concat(tree1.middle, _nodes(tree1.suffix + items + tree2.prefix, depth), tree2.middle, depth + 1)
+    return _Deep(tree1.size + _items_size(items, depth) + tree2.size, tree1.prefix, middle, tree2.suffix)
+
+
+def concat(tree1, tree2):
+    """
+    Concatenate two trees of elements in logarithmic time.
+    """
+    return _concat(tree1, (), tree2, 0)
+
+
+def _split_items(items, index, depth):
+    if not depth:
+        return items[:index], items[index], items[index + 1:], 0
+
+    for i, node in enumerate(items):
+        if index < node.size:
+            return items[:i], node, items[i + 1:], index
+        index -= node.size
+
+
+def _split_tree(tree, index, depth):
+    # Split a non empty tree around the item containing index. Returns the trees before and
+    # after that item, the item itself and the position of index within the item.
+    if type(tree) is _Single:
+        return EMPTY_TREE, tree.item, EMPTY_TREE, index
+
+    prefix_size = _items_size(tree.prefix, depth)
+    if index < prefix_size:
+        before, item, after, index = _split_items(tree.prefix, index, depth)
+        return from_items(before, depth), item, _deep_left(after, tree.middle, tree.suffix, depth), index
+
+    index -= prefix_size
+    if index < tree.middle.size:
+        middle_before, node, middle_after, index = _split_tree(tree.middle, index, depth + 1)
+        before, item, after, index = _split_items(node.items, index, depth)
+        return (_deep_right(tree.prefix, middle_before, before, depth), item,
+                _deep_left(after, middle_after, tree.suffix, depth), index)
+
+    before, item, after, index = _split_items(tree.suffix, index - tree.middle.size, depth)
+    return _deep_right(tree.prefix, tree.middle, before, depth), item, from_items(after, depth), index
+
+
+def split(tree, index):
+    """
+    Split tree into two trees, the first one holding the index first elements, in logarithmic time.
+    """
+    if index <= 0:
+        return EMPTY_TREE, tree
+
+    if index >= tree.size:
+        return tree, EMPTY_TREE
+
+    before, item, after, _ = _split_tree(tree, index, 0)
+    return before, push_left(after, item)
+
+
+def lookup(tree, index):
+    """
+    Return the element at index, 0 <= index < tree.size, in logarithmic time.
+    """
+    depth = 0
+    while type(tree) is _Deep:
+        prefix_size = _items_size(tree.prefix, depth)
+        if index < prefix_size:
+            items = tree.prefix
+            break
+
+        index -= prefix_size
+        if index < tree.middle.size:
+            tree = tree.middle
+            depth += 1
+            continue
+
+        index -= tree.middle.size
+        items = tree.suffix
+        break
+    else:
+        items = (tree.item,)
+
+    while depth:
+        for node in items:
+            if index < node.size:
+                break
+            index -= node.size
+
+        items = node.items
+        depth -= 1
+
+    return items[index]
+
+
+def _iter_items(items, depth):
+    if not depth:
+        yield from items
+    else:
+        for node in items:
+            yield from _iter_items(node.items, depth - 1)
+
+
+def _iter_tree(tree, depth):
+    if type(tree) is _Single:
+        yield from _iter_items((tree.item,), depth)
+    elif type(tree) is _Deep:
+        yield from _iter_items(tree.prefix, depth)
+        yield from _iter_tree(tree.middle, depth + 1)
+        yield from _iter_items(tree.suffix, depth)
+
+
+def iterate(tree):
+    return _iter_tree(tree, 0)
+
+
+def _reversed_items(items, depth):
+    if not depth:
+        yield from reversed(items)
+    else:
+        for node in reversed(items):
+            yield from _reversed_items(node.items, depth - 1)
+
+
+def _reversed_tree(tree, depth):
+    if type(tree) is _Single:
+        yield from _reversed_items((tree.item,), depth)
+    elif type(tree) is _Deep:
+        yield from _reversed_items(tree.suffix, depth)
+        yield from _reversed_tree(tree.middle, depth + 1)
+        yield from _reversed_items(tree.prefix, depth)
+
+
+def iterate_reversed(tree):
+    return _reversed_tree(tree, 0)
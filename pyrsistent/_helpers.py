@@ -1,10 +1,204 @@
 import collections
+import collections.abc
 from functools import wraps
+from operator import is_
 from pyrsistent._pmap import PMap, pmap
 from pyrsistent._pset import PSet, pset
 from pyrsistent._pvector import PVector, pvector
 
-def freeze(o, strict=True):
+
+# Types of values that are never converted, known up front to save time on the leaves of a structure
+_ATOMIC_TYPES = frozenset([str, int, float, bool, type(None), bytes])
+
+_IN_PROGRESS = object()
+
+
+def _convert(o, classify, strict, memoize):
+    """
+    Convert o and all containers nested in it without recursing, deep structures are
+    handled regardless of the recursion limit.
+
+    classify(type, strict) returns None for types of values that are used as is or a function
+    that given a value returns None if it should be used as is or a tuple (build, keys, values,
+    reuse) where build(keys, converted_values) creates the converted container. If reuse is
+    given reuse(value) is returned instead when none of the values were changed by the
+    conversion. The classification of each type is cached for the duration of the conversion
+    since the isinstance checks it involves are expensive. If memoize is true containers
+    appearing more than once in o are only converted once and the result shared.
+    """
+    expanders = dict.fromkeys(_ATOMIC_TYPES)
+    expand = expanders[type(o)] = classify(type(o), strict)
+    spec = expand(o) if expand else None
+    if spec is None:
+        return o
+
+    # Containers currently being converted are kept in the memo as well to detect cycles. All
+    # containers are reachable from o during the conversion so their ids are not reused.
+    memo = {id(o): _IN_PROGRESS}
+    stack = [(o, spec, [])]
+    while True:
+        original, (build, keys, values, reuse), converted = stack[-1]
+        for i in range(len(converted), len(values)):
+            value = values[i]
+            typ = type(value)
+            try:
+                expand = expanders[typ]
+            except KeyError:
+                expand = expanders[typ] = classify(typ, strict)
+
+            if expand is None:
+                converted.append(value)
+                continue
+
+            value_id = id(value)
+            if value_id in memo:
+                result = memo[value_id]
+                if result is _IN_PROGRESS:
+                    raise ValueError('Cannot convert a structure that contains itself')
+
+                converted.append(result)
+                continue
+
+            spec = expand(value)
+            if spec is None:
+                converted.append(value)
+                continue
+
+            for v in spec[2]:
+                if type(v) not in _ATOMIC_TYPES:
+                    memo[value_id] = _IN_PROGRESS
+                    stack.append((value, spec, []))
+                    break
+            else:
+                # Containers holding only atomic values, common on the lower levels of a structure,
+                # are converted right away
+                result = spec[3](value) if spec[3] else spec[0](spec[1], spec[2])
+                if memoize:
+                    memo[value_id] = result
+
+                converted.append(result)
+                continue
+
+            break
+        else:
+            stack.pop()
+            if reuse and all(map(is_, converted, values)):
+                result = reuse(original)
+            else:
+                result = build(keys, converted)
+
+            if memoize:
+                memo[id(original)] = result
+            else:
+                del memo[id(original)]
+
+            if not stack:
+                return result
+
+            stack[-1][2].append(result)
+
+
+def _build_pmap(keys, values):
+    return pmap(dict(zip(keys, values)))
+
+
+def _build_pvector(_, values):
+    return pvector(values)
+
+
+def _build_deep_frozen_pmap(keys, values):
+    return _mark_deep_frozen(_build_pmap(keys, values))
+
+
+def _build_deep_frozen_pvector(keys, values):
+    return _mark_deep_frozen(_build_pvector(keys, values))
+
+
+def _build_tuple(_, values):
+    return tuple(values)
+
+
+def _build_dict(keys, values):
+    return dict(zip(keys, values))
+
+
+def _build_list(_, values):
+    return values
+
+
+def _identity(o):
+    return o
+
+
+def _mark_deep_frozen(o):
+    o._deep_frozen = True
+    return o
+
+
+def _is_deep_frozen(o):
+    # The flag is only set by freeze on structures where no element needs freezing. Since
+    # the structures are persistent it remains valid.
+    return getattr(o, '_deep_frozen', False)
+
+
+_NO_VALUES = ()
+
+_PVECTOR_TYPE = type(pvector())
+
+
+def _classify_freeze(typ, strict):
+    # Only a strict freeze converts the values of nested pmaps and pvectors, structures
+    # created by a non strict freeze may still hold values that need freezing
+    build_pmap = _build_deep_frozen_pmap if strict else _build_pmap
+    build_pvector = _build_deep_frozen_pvector if strict else _build_pvector
+    if typ is dict or typ is collections.defaultdict:
+        return lambda o: (build_pmap, list(o.keys()), list(o.values()), None)
+    if strict and typ is PMap:
+        return lambda o: None if _is_deep_frozen(o) else _expand_items(build_pmap, o, _mark_deep_frozen)
+    if strict and issubclass(typ, PMap):
+        return lambda o: _expand_items(build_pmap, o, None)
+    if typ is list:
+        return lambda o: (build_pvector, None, o, None)
+    if strict and typ is _PVECTOR_TYPE:
+        return lambda o: None if _is_deep_frozen(o) else (build_pvector, None, o.tolist(), _mark_deep_frozen)
+    if strict and issubclass(typ, PVector):
+        return lambda o: (build_pvector, None, o.tolist(), None)
+    if typ is tuple:
+        return lambda o: (_build_tuple, None, o, _identity)
+    if typ is set:
+        # impossible to have anything that needs freezing inside a set or pset
+        return lambda o: ((lambda _, __: pset(o)), None, _NO_VALUES, None)
+    if issubclass(typ, _LazyFrozen):
+        return lambda o: ((lambda _, __: o.materialize()), None, _NO_VALUES, None)
+    return None
+
+
+def _classify_thaw(typ, strict):
+    # Lazy views are thawed through their items rather than the plain containers they were created
+    # from, those must not be returned since the views rely on them not being modified
+    if issubclass(typ, (PVector, _LazyPVector)):
+        return lambda o: (_build_list, None, list(o), None)
+    if strict and typ is list:
+        return lambda o: (_build_list, None, list(o), _identity)
+    if strict and typ is dict:
+        return lambda o: (_build_dict, list(o.keys()), list(o.values()), _identity)
+    if issubclass(typ, (PMap, _LazyPMap)):
+        return lambda o: _expand_items(_build_dict, o, None)
+    if typ is tuple:
+        return lambda o: (_build_tuple, None, o, _identity)
+    if issubclass(typ, PSet):
+        # impossible to thaw inside psets or sets
+        return lambda o: ((lambda _, __: set(o)), None, _NO_VALUES, None)
+    return None
+
+
+def _expand_items(build, mapping, reuse):
+    # Traverse the mapping only once, it may be expensive to iterate
+    items = list(mapping.items())
+    return build, [k for k, _ in items], [v for _, v in items], reuse
+
+
+def freeze(o, strict=True, lazy=False):
     """
     Recursively convert simple Python containers into pyrsistent versions
     of those containers.
@@ -25,28 +219,30 @@ def freeze(o, strict=True):
     dict keys and set elements are often instances of mutable objects that
     support hash-by-id, which this function can't convert anyway.
 
+    Containers that appear multiple times in o are only frozen once and the
+    result shared.
+
+    If lazy == True a read only mapping or sequence is returned for a dict or list
+    that freezes the containers nested in it first when they are accessed. Use
+    materialize() on it to get the corresponding pmap or pvector. o must not
+    be modified after it has been frozen lazily.
+
     >>> freeze(set([1, 2]))
     pset([1, 2])
     >>> freeze([1, {'a': 3}])
     pvector([1, pmap({'a': 3})])
     >>> freeze((1, []))
     (1, pvector([]))
+    >>> lazy = freeze({'a': [1, 2], 'b': {'c': 3}}, lazy=True)
+    >>> lazy['a']
+    lazy(pvector([1, 2]))
+    >>> lazy.materialize()['b']
+    pmap({'c': 3})
     """
-    typ = type(o)
-    if typ is dict or (strict and isinstance(o, PMap)):
-        return pmap({k: freeze(v, strict) for k, v in o.items()})
-    if typ is collections.defaultdict or (strict and isinstance(o, PMap)):
-        return pmap({k: freeze(v, strict) for k, v in o.items()})
-    if typ is list or (strict and isinstance(o, PVector)):
-        curried_freeze = lambda x: freeze(x, strict)
-        return pvector(map(curried_freeze, o))
-    if typ is tuple:
-        curried_freeze = lambda x: freeze(x, strict)
-        return tuple(map(curried_freeze, o))
-    if typ is set:
-        # impossible to have anything that needs freezing inside a set or pset
-        return pset(o)
-    return o
+    if lazy:
+        return _freeze_lazily(o, strict)
+
+    return _convert(o, _classify_freeze, strict, True)
 
 
 def thaw(o, strict=True):
@@ -71,19 +267,115 @@ def thaw(o, strict=True):
     >>> thaw((1, v()))
     (1, [])
     """
+    return _convert(o, _classify_thaw, strict, False)
+
+
+def _freeze_lazily(o, strict):
     typ = type(o)
-    if isinstance(o, PVector) or (strict and typ is list):
-        curried_thaw = lambda x: thaw(x, strict)
-        return list(map(curried_thaw, o))
-    if isinstance(o, PMap) or (strict and typ is dict):
-        return {k: thaw(v, strict) for k, v in o.items()}
-    if typ is tuple:
-        curried_thaw = lambda x: thaw(x, strict)
-        return tuple(map(curried_thaw, o))
-    if isinstance(o, PSet):
-        # impossible to thaw inside psets or sets
-        return set(o)
-    return o
+    if typ is dict or typ is collections.defaultdict:
+        return _LazyPMap(o, strict)
+    if typ is list:
+        return _LazyPVector(o, strict)
+    return freeze(o, strict)
+
+
+class _LazyFrozen(object):
+    """
+    Base class of the read only views returned by freeze(..., lazy=True). Nested
+    containers are frozen lazily when accessed and cached.
+    """
+    __slots__ = ('_source', '_strict', '_children', '_frozen')
+
+    def __init__(self, source, strict):
+        self._source = source
+        self._strict = strict
+        self._children = {}
+        self._frozen = None
+
+    def __getitem__(self, key):
+        try:
+            return self._children[key]
+        except KeyError:
+            value = _freeze_lazily(self._source[key], self._strict)
+            if self._frozen is not None:
+                # Keep views created after materialization in line with the frozen structure
+                if isinstance(value, _LazyFrozen):
+                    value._frozen = self._frozen[key]
+                else:
+                    value = self._frozen[key]
+
+            self._children[key] = value
+            return value
+
+    def __len__(self):
+        return len(self._source)
+
+    def materialize(self):
+        """
+        Return the fully frozen version of this structure.
+        """
+        if self._frozen is None:
+            # Children that have already been accessed are frozen in place of their sources
+            # to make them part of the result
+            source = self._source.copy()
+            for key, child in self._children.items():
+                source[key] = child
+
+            self._frozen = freeze(source, self._strict)
+
+        return self._frozen
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyFrozen):
+            other = other.materialize()
+
+        return self.materialize() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.materialize())
+
+    def __repr__(self):
+        return 'lazy({0})'.format(repr(self.materialize()))
+
+    def __reduce__(self):
+        # Pickling support, the frozen structure is stored
+        return _identity, (self.materialize(),)
+
+
+class _LazyPMap(_LazyFrozen, collections.abc.Mapping):
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        # Looking up a missing key must not add it to a defaultdict source
+        if key not in self._source:
+            raise KeyError(key)
+
+        return super(_LazyPMap, self).__getitem__(key)
+
+    def __iter__(self):
+        return iter(self._source)
+
+    def __contains__(self, key):
+        return key in self._source
+
+
+class _LazyPVector(_LazyFrozen, collections.abc.Sequence):
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _LazyPVector(self._source[index], self._strict)
+
+        if index < 0:
+            index += len(self._source)
+
+        if not 0 <= index < len(self._source):
+            raise IndexError('Index out of range: {0}'.format(index))
+
+        return super(_LazyPVector, self).__getitem__(index)
 
 
 def mutant(fn):
@@ -1,5 +1,5 @@
+from collections import Counter
 from collections.abc import Container, Iterable, Sized, Hashable
-from functools import reduce
 from typing import Generic, TypeVar
 from pyrsistent._pmap import pmap
 
@@ -10,6 +10,13 @@ def _add_to_counters(counters, element):
     return counters.set(element, counters.get(element, 0) + 1)
 
 
+def _check_count(count):
+    if count < 0:
+        raise ValueError('Counts must not be negative, was {0}'.format(count))
+
+    return count > 0
+
+
 class PBag(Generic[T_co]):
     """
     A persistent bag/multiset type.
@@ -33,11 +40,14 @@ class PBag(Generic[T_co]):
     pbag([1, 2, 3, 4])
     """
 
-    __slots__ = ('_counts', '__weakref__')
+    __slots__ = ('_counts', '_size', '__weakref__')
 
-    def __init__(self, counts):
+    def __init__(self, counts, size=None):
         self._counts = counts
 
+        # The total number of elements is kept up to date by all operations
+        self._size = sum(counts.itervalues()) if size is None else size
+
     def add(self, element):
         """
         Add an element to the bag.
@@ -50,7 +60,7 @@ class PBag(Generic[T_co]):
         >>> s3
         pbag([1, 2])
         """
-        return PBag(_add_to_counters(self._counts, element))
+        return PBag(_add_to_counters(self._counts, element), self._size + 1)
 
     def update(self, iterable):
         """
@@ -61,10 +71,33 @@ class PBag(Generic[T_co]):
         pbag([1, 1, 2])
         """
         if iterable:
-            return PBag(reduce(_add_to_counters, iterable, self._counts))
+            # Counter aggregates the elements in C, the bag is then updated once per distinct element
+            return self.update_counts(Counter(iterable))
 
         return self
 
+    def update_counts(self, counts):
+        """
+        Update bag with the elements in counts, a mapping from element to the number of
+        times to add it.
+
+        >>> s = pbag([1])
+        >>> s.update_counts({1: 2, 2: 1})
+        pbag([1, 1, 1, 2])
+        """
+        if not self._counts:
+            new_counts = {element: count for element, count in counts.items() if _check_count(count)}
+            return PBag(pmap(new_counts), sum(new_counts.values())) if new_counts else self
+
+        e = self._counts.evolver()
+        size = self._size
+        for element, count in counts.items():
+            if _check_count(count):
+                e[element] = self._counts.get(element, 0) + count
+                size += count
+
+        return PBag(e.persistent(), size) if e.is_dirty() else self
+
     def remove(self, element):
         """
         Remove an element from the bag.
@@ -83,7 +116,7 @@ class PBag(Generic[T_co]):
             newc = self._counts.remove(element)
         else:
             newc = self._counts.set(element, self._counts[element] - 1)
-        return PBag(newc)
+        return PBag(newc, self._size - 1)
 
     def count(self, element):
         """
@@ -104,7 +137,7 @@ class PBag(Generic[T_co]):
         >>> len(pbag([1, 1, 2]))
         3
         """
-        return sum(self._counts.itervalues())
+        return self._size
 
     def __iter__(self):
         """
@@ -165,10 +198,9 @@ class PBag(Generic[T_co]):
         """
         if not isinstance(other, PBag):
             return NotImplemented
-        result = self._counts.evolver()
-        for elem, other_count in other._counts.iteritems():
-            result[elem] = self.count(elem) + other_count
-        return PBag(result.persistent())
+        if len(self._counts) < len(other._counts):
+            return other.update_counts(self._counts)
+        return self.update_counts(other._counts)
 
     def __sub__(self, other):
         """
@@ -180,13 +212,17 @@ class PBag(Generic[T_co]):
         if not isinstance(other, PBag):
             return NotImplemented
         result = self._counts.evolver()
+        size = self._size
         for elem, other_count in other._counts.iteritems():
-            newcount = self.count(elem) - other_count
+            count = self.count(elem)
+            newcount = count - other_count
             if newcount > 0:
                 result[elem] = newcount
-            elif elem in self:
+                size -= other_count
+            elif count:
                 result.remove(elem)
-        return PBag(result.persistent())
+                size -= count
+        return PBag(result.persistent(), size)
 
     def __or__(self, other):
         """
@@ -197,12 +233,15 @@ class PBag(Generic[T_co]):
         """
         if not isinstance(other, PBag):
             return NotImplemented
-        result = self._counts.evolver()
-        for elem, other_count in other._counts.iteritems():
-            count = self.count(elem)
-            newcount = max(count, other_count)
-            result[elem] = newcount
-        return PBag(result.persistent())
+        larger, smaller = (self, other) if len(self._counts) >= len(other._counts) else (other, self)
+        result = larger._counts.evolver()
+        size = larger._size
+        for elem, other_count in smaller._counts.iteritems():
+            count = larger._counts.get(elem, 0)
+            if other_count > count:
+                result[elem] = other_count
+                size += other_count - count
+        return PBag(result.persistent(), size)
 
     def __and__(self, other):
         """
@@ -213,12 +252,15 @@ class PBag(Generic[T_co]):
         """
         if not isinstance(other, PBag):
             return NotImplemented
+        larger, smaller = (self, other) if len(self._counts) >= len(other._counts) else (other, self)
         result = pmap().evolver()
-        for elem, count in self._counts.iteritems():
-            newcount = min(count, other.count(elem))
+        size = 0
+        for elem, count in smaller._counts.iteritems():
+            newcount = min(count, larger._counts.get(elem, 0))
             if newcount > 0:
                 result[elem] = newcount
-        return PBag(result.persistent())
+                size += newcount
+        return PBag(result.persistent(), size)
 
     def __hash__(self):
         """
@@ -230,6 +272,7 @@ class PBag(Generic[T_co]):
         >>> pbag([1, 1, 2]) in m
         False
         """
+        # The hash of the counts is cached and kept up to date in bags derived from this one
         return hash(self._counts)
 
 
@@ -263,8 +306,8 @@ def pbag(elements):
     """
     if not elements:
         return _EMPTY_PBAG
-    return PBag(reduce(_add_to_counters, elements, pmap()))
+    return _EMPTY_PBAG.update(elements)
 
 
-_EMPTY_PBAG = PBag(pmap())
+_EMPTY_PBAG = PBag(pmap(), 0)
 
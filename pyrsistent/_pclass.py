@@ -1,6 +1,7 @@
 from pyrsistent._checked_types import (InvariantException, CheckedType, _restore_pickle, store_invariants)
 from pyrsistent._field_common import (
-    set_fields, check_type, is_field_ignore_extra_complaint, PFIELD_NO_INITIAL, serialize, check_global_invariants
+    set_fields, check_global_invariants, PFIELD_NO_INITIAL, serialize, factory_source, type_check_source, invariant_source, indent,
+    compile_functions, make_field_setters
 )
 from pyrsistent._transformations import transform
 
@@ -9,29 +10,89 @@ def _is_pclass(bases):
     return len(bases) == 1 and bases[0] == CheckedType
 
 
+def _inherited_slots(bases):
+    return set(slot for base in bases for cls in base.__mro__ for slot in cls.__dict__.get('__slots__', ()))
+
+
 class PClassMeta(type):
     def __new__(mcs, name, bases, dct):
         set_fields(dct, bases, name='_pclass_fields')
         store_invariants(dct, bases, '_pclass_invariants', '__invariant__')
-        dct['__slots__'] = ('_pclass_frozen',) + tuple(key for key in dct['_pclass_fields'])
+
+        # Only add slots for fields that are new in this class, a slot declared again in a
+        # sub class takes up space in every instance without ever being used.
+        inherited_slots = _inherited_slots(bases)
+        dct['__slots__'] = tuple(key for key in dct['_pclass_fields'] if key not in inherited_slots)
 
         # There must only be one __weakref__ entry in the inheritance hierarchy,
-        # lets put it on the top level class.
+        # lets put it on the top level class together with the other bookkeeping slots.
         if _is_pclass(bases):
-            dct['__slots__'] += ('__weakref__',)
+            dct['__slots__'] += ('_pclass_frozen', '_pclass_hash', '__weakref__')
 
+        dct['_pclass_new'] = staticmethod(_make_pclass_new(dct['_pclass_fields'], dct['_pclass_invariants']))
+        dct['_pclass_setters'] = make_field_setters(dct['_pclass_fields'], PClass if dct['_pclass_fields'] else None)
         return super(PClassMeta, mcs).__new__(mcs, name, bases, dct)
 
 _MISSING_VALUE = object()
+_object_new = object.__new__
+_object_setattr = object.__setattr__
 
 
-def _check_and_set_attr(cls, field, name, value, result, invariant_errors):
-    check_type(cls, field, name, value)
-    is_ok, error_code = field.invariant(value)
-    if not is_ok:
-        invariant_errors.append(error_code)
-    else:
-        setattr(result, name, value)
+def _make_pclass_new(fields, invariants):
+    """
+    Generate the constructor of a PClass with the given fields. The checks of each field are
+    inlined and the ones that are no-ops, such as missing types or invariants, left out.
+    """
+    namespace = dict(_MISSING_VALUE=_MISSING_VALUE, _object_new=_object_new, _object_setattr=_object_setattr,
+                     type_cls=PClass if fields else None)
+    lines = ['def _pclass_new(cls, kwargs):',
+             '    result = _object_new(cls)',
+             "    factory_fields = kwargs.pop('_factory_fields', None)",
+             "    ignore_extra = kwargs.pop('ignore_extra', None)",
+             '    missing_fields = []',
+             '    invariant_errors = []']
+
+    for i, (name, field) in enumerate(fields.items()):
+        prefix = '_f{0}'.format(i)
+        check_and_set = type_check_source(namespace, prefix, name, field)
+        invariant = invariant_source(namespace, prefix, field)
+        if invariant:
+            check_and_set += ['is_ok, error_code = ' + invariant,
+                              'if is_ok:',
+                              '    _object_setattr(result, {0!r}, value)'.format(name),
+                              'else:',
+                              '    invariant_errors.append(error_code)']
+        else:
+            check_and_set.append('_object_setattr(result, {0!r}, value)'.format(name))
+
+        lines += ['    value = kwargs.pop({0!r}, _MISSING_VALUE)'.format(name),
+                  '    if value is not _MISSING_VALUE:']
+        factory = factory_source(namespace, prefix, field)
+        if factory:
+            lines.append('        if factory_fields is None or {0!r} in factory_fields:'.format(name))
+            lines += indent(factory, 3)
+        lines += indent(check_and_set, 2)
+
+        if field.initial is not PFIELD_NO_INITIAL:
+            namespace[prefix + '_initial'] = field.initial
+            lines += ['    else:',
+                      '        value = {0}_initial{1}'.format(prefix, '()' if callable(field.initial) else '')]
+            lines += indent(check_and_set, 2)
+        elif field.mandatory:
+            lines += ['    else:',
+                      '        missing_fields.append(cls.__name__ + {0!r})'.format('.' + name)]
+
+    lines += ['    if invariant_errors or missing_fields:',
+              "        raise InvariantException(tuple(invariant_errors), tuple(missing_fields), 'Field invariant failed')",
+              '    if kwargs:',
+              """        raise AttributeError("'{0}' are not among the specified fields for {1}".format(""",
+              "            ', '.join(kwargs), cls.__name__))"]
+    if invariants:
+        lines.append('    check_global_invariants(result, cls._pclass_invariants)')
+    lines += ["    _object_setattr(result, '_pclass_frozen', True)",
+              '    return result']
+
+    return compile_functions(lines, namespace)['_pclass_new']
 
 
 class PClass(CheckedType, metaclass=PClassMeta):
@@ -44,40 +105,8 @@ class PClass(CheckedType, metaclass=PClassMeta):
     More documentation and examples of PClass usage is available at https://github.com/tobgu/pyrsistent
     """
     def __new__(cls, **kwargs):    # Support *args?
-        result = super(PClass, cls).__new__(cls)
-        factory_fields = kwargs.pop('_factory_fields', None)
-        ignore_extra = kwargs.pop('ignore_extra', None)
-        missing_fields = []
-        invariant_errors = []
-        for name, field in cls._pclass_fields.items():
-            if name in kwargs:
-                if factory_fields is None or name in factory_fields:
-                    if is_field_ignore_extra_complaint(PClass, field, ignore_extra):
-                        value = field.factory(kwargs[name], ignore_extra=ignore_extra)
-                    else:
-                        value = field.factory(kwargs[name])
-                else:
-                    value = kwargs[name]
-                _check_and_set_attr(cls, field, name, value, result, invariant_errors)
-                del kwargs[name]
-            elif field.initial is not PFIELD_NO_INITIAL:
-                initial = field.initial() if callable(field.initial) else field.initial
-                _check_and_set_attr(
-                    cls, field, name, initial, result, invariant_errors)
-            elif field.mandatory:
-                missing_fields.append('{0}.{1}'.format(cls.__name__, name))
-
-        if invariant_errors or missing_fields:
-            raise InvariantException(tuple(invariant_errors), tuple(missing_fields), 'Field invariant failed')
-
-        if kwargs:
-            raise AttributeError("'{0}' are not among the specified fields for {1}".format(
-                ', '.join(kwargs), cls.__name__))
-
-        check_global_invariants(result, cls._pclass_invariants)
-
-        result._pclass_frozen = True
-        return result
+        # The constructor is generated for each class by the meta class
+        return cls._pclass_new(cls, kwargs)
 
     def set(self, *args, **kwargs):
         """
@@ -101,15 +130,43 @@ class PClass(CheckedType, metaclass=PClassMeta):
         if args:
             kwargs[args[0]] = args[1]
 
-        factory_fields = set(kwargs)
+        cls = self.__class__
+        if cls.__new__ is not PClass.__new__:
+            # Sub classes with their own constructor may alter the values, let it handle all fields
+            factory_fields = set(kwargs)
+            for key in self._pclass_fields:
+                if key not in kwargs:
+                    value = getattr(self, key, _MISSING_VALUE)
+                    if value is not _MISSING_VALUE:
+                        kwargs[key] = value
+
+            return cls(_factory_fields=factory_fields, **kwargs)
+
+        # Only the updated fields are checked, the values of the other fields are copied over
+        # as is since they were already checked when this instance was created.
+        result = _object_new(cls)
+        invariant_errors = []
+        for name, setter in cls._pclass_setters.items():
+            value = kwargs.pop(name, _MISSING_VALUE)
+            if value is _MISSING_VALUE:
+                value = getattr(self, name, _MISSING_VALUE)
+                if value is _MISSING_VALUE:
+                    continue
+            else:
+                value = setter(cls, value, None, False, invariant_errors, None)
 
-        for key in self._pclass_fields:
-            if key not in kwargs:
-                value = getattr(self, key, _MISSING_VALUE)
-                if value is not _MISSING_VALUE:
-                    kwargs[key] = value
+            _object_setattr(result, name, value)
+
+        if invariant_errors:
+            raise InvariantException(tuple(invariant_errors), (), 'Field invariant failed')
 
-        return self.__class__(_factory_fields=factory_fields, **kwargs)
+        if kwargs:
+            raise AttributeError("'{0}' are not among the specified fields for {1}".format(
+                ', '.join(kwargs), cls.__name__))
+
+        check_global_invariants(result, cls._pclass_invariants)
+        _object_setattr(result, '_pclass_frozen', True)
+        return result
 
     @classmethod
     def create(cls, kwargs, _factory_fields=None, ignore_extra=False):
@@ -164,8 +221,13 @@ class PClass(CheckedType, metaclass=PClassMeta):
         return not self == other
 
     def __hash__(self):
-        # May want to optimize this by caching the hash somehow
-        return hash(tuple((key, getattr(self, key, _MISSING_VALUE)) for key in self._pclass_fields))
+        # Instances are frozen so the hash is computed once and cached
+        try:
+            return self._pclass_hash
+        except AttributeError:
+            result = hash(tuple((key, getattr(self, key, _MISSING_VALUE)) for key in self._pclass_fields))
+            object.__setattr__(self, '_pclass_hash', result)
+            return result
 
     def __setattr__(self, key, value):
         if getattr(self, '_pclass_frozen', False):
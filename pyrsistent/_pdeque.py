@@ -2,6 +2,7 @@ from collections.abc import Sequence, Hashable
 from itertools import islice, chain
 from numbers import Integral
 from typing import TypeVar, Generic
+from pyrsistent import _fingertree
 from pyrsistent._plist import plist
 
 T_co = TypeVar('T_co', covariant=True)
@@ -15,7 +16,8 @@ class PDeque(Generic[T_co]):
     A maximum length can be specified to create a bounded queue.
 
     Fully supports the Sequence and Hashable protocols including indexing and slicing but
-    if you need fast random access go for the PVector instead.
+    if you need fast random access go for the PVector instead, or create the deque with
+    indexed=True.
 
     Do not instantiate directly, instead use the factory functions :py:func:`dq` or :py:func:`pdeque` to
     create an instance.
@@ -350,7 +352,175 @@ Sequence.register(PDeque)
 Hashable.register(PDeque)
 
 
-def pdeque(iterable=(), maxlen=None):
+class _IndexedPDeque(PDeque):
+    """
+    PDeque backed by a finger tree. Appends and pops in both ends execute in amortized constant
+    time, indexing, slicing, rotation and extension with another indexed deque in logarithmic
+    time. The tree is kept in the original order and flagged when the deque is reversed.
+
+    Do not instantiate directly, use :py:func:`pdeque` with indexed=True.
+    """
+    __slots__ = ('_tree', '_reversed')
+
+    def __new__(cls, tree, reversed_, maxlen=None):
+        instance = super(_IndexedPDeque, cls).__new__(cls, None, None, tree.size, maxlen)
+        instance._tree = tree
+        instance._reversed = reversed_
+        return instance
+
+    def _with_tree(self, tree):
+        return _IndexedPDeque(tree, self._reversed, self._maxlen)
+
+    @property
+    def right(self):
+        if not self._length:
+            raise IndexError('No elements in empty deque')
+
+        return _fingertree.leftmost(self._tree) if self._reversed else _fingertree.rightmost(self._tree)
+
+    @property
+    def left(self):
+        if not self._length:
+            raise IndexError('No elements in empty deque')
+
+        return _fingertree.rightmost(self._tree) if self._reversed else _fingertree.leftmost(self._tree)
+
+    def __iter__(self):
+        if self._reversed:
+            return _fingertree.iterate_reversed(self._tree)
+
+        return _fingertree.iterate(self._tree)
+
+    def __repr__(self):
+        return "pdeque({0}{1}, indexed=True)".format(
+            list(self), ', maxlen={0}'.format(self._maxlen) if self._maxlen is not None else '')
+    __str__ = __repr__
+
+    def _split(self, index):
+        # Split at a logical index, returning the logical left and right trees
+        if self._reversed:
+            right, left = _fingertree.split(self._tree, self._length - index)
+            return left, right
+
+        return _fingertree.split(self._tree, index)
+
+    def _concat(self, left, right):
+        if self._reversed:
+            return _fingertree.concat(right, left)
+
+        return _fingertree.concat(left, right)
+
+    def _slice_tree(self, start, stop):
+        if self._reversed:
+            start, stop = self._length - stop, self._length - start
+
+        tree = _fingertree.split(self._tree, stop)[0]
+        return _fingertree.split(tree, start)[1]
+
+    def pop(self, count=1):
+        if count < 0:
+            return self.popleft(-count)
+
+        return self._with_tree(self._slice_tree(0, max(self._length - count, 0)))
+
+    def popleft(self, count=1):
+        if count < 0:
+            return self.pop(-count)
+
+        return self._with_tree(self._slice_tree(min(count, self._length), self._length))
+
+    def _push(self, elem, right):
+        tree = self._tree
+        if self._maxlen is not None and self._length == self._maxlen:
+            if self._maxlen == 0:
+                return self
+
+            tree = _fingertree.pop_left(tree)[1] if right != self._reversed else _fingertree.pop_right(tree)[1]
+
+        if right != self._reversed:
+            return self._with_tree(_fingertree.push_right(tree, elem))
+
+        return self._with_tree(_fingertree.push_left(tree, elem))
+
+    def append(self, elem):
+        return self._push(elem, True)
+
+    def appendleft(self, elem):
+        return self._push(elem, False)
+
+    def _tree_from(self, iterable, reverse):
+        # Build a tree holding the elements of iterable in the physical order of this deque
+        if isinstance(iterable, _IndexedPDeque) and iterable._reversed == (self._reversed != reverse):
+            return iterable._tree
+
+        elements = tuple(iterable)
+        return _fingertree.from_items(elements[::-1] if self._reversed != reverse else elements)
+
+    def extend(self, iterable):
+        result = self._with_tree(self._concat(self._tree, self._tree_from(iterable, False)))
+        if self._maxlen is not None and result._length > self._maxlen:
+            return result.popleft(result._length - self._maxlen)
+
+        return result
+
+    def extendleft(self, iterable):
+        result = self._with_tree(self._concat(self._tree_from(iterable, True), self._tree))
+        if self._maxlen is not None and result._length > self._maxlen:
+            return result.pop(result._length - self._maxlen)
+
+        return result
+
+    def count(self, elem):
+        return sum(1 for e in self if e == elem)
+
+    def index(self, value, start=0, stop=None):
+        for i, e in enumerate(islice(self, start, stop), start):
+            if e is value or e == value:
+                return i
+
+        raise ValueError('{0} is not in PDeque'.format(value))
+
+    def remove(self, elem):
+        for i, e in enumerate(self):
+            if e == elem:
+                return self._with_tree(self._concat(self._slice_tree(0, i), self._slice_tree(i + 1, self._length)))
+
+        raise ValueError('{0} not found in PDeque'.format(elem))
+
+    def reverse(self):
+        return _IndexedPDeque(self._tree, not self._reversed, self._maxlen)
+    __reversed__ = reverse
+
+    def rotate(self, steps):
+        if abs(steps) >= self._length:
+            return self
+
+        left, right = self._split(self._length - steps if steps >= 0 else -steps)
+        return self._with_tree(self._concat(right, left))
+
+    def __reduce__(self):
+        # Pickling support
+        return pdeque, (list(self), self._maxlen, True)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return pdeque(tuple(self)[index], maxlen=self._maxlen, indexed=True)
+
+            return self._with_tree(self._slice_tree(start, max(start, stop)))
+
+        if not isinstance(index, Integral):
+            raise TypeError("'%s' object cannot be interpreted as an index" % type(index).__name__)
+
+        shifted = index if index >= 0 else self._length + index
+        if not 0 <= shifted < self._length:
+            raise IndexError("pdeque index {0} out of range {1}".format(index, self._length))
+
+        return _fingertree.lookup(self._tree, self._length - shifted - 1 if self._reversed else shifted)
+
+
+def pdeque(iterable=(), maxlen=None, indexed=False):
     """
     Return deque containing the elements of iterable. If maxlen is specified then
     len(iterable) - maxlen elements are discarded from the left to if len(iterable) > maxlen.
@@ -359,10 +529,21 @@ def pdeque(iterable=(), maxlen=None):
     pdeque([1, 2, 3])
     >>> pdeque([1, 2, 3, 4], maxlen=2)
     pdeque([3, 4], maxlen=2)
+
+    If indexed is True the deque is backed by a finger tree which supports indexing, slicing
+    and rotation in logarithmic time at the cost of somewhat slower appends and pops.
+
+    >>> d = pdeque(range(10), indexed=True)
+    >>> d[7]
+    7
+    >>> d[2:5]
+    pdeque([2, 3, 4], indexed=True)
     """
     t = tuple(iterable)
     if maxlen is not None:
-        t = t[-maxlen:]
+        t = t[-maxlen:] if maxlen else ()
+    if indexed:
+        return _IndexedPDeque(_fingertree.from_items(t), False, maxlen)
     length = len(t)
     pivot = int(length / 2)
     left = plist(t[:pivot])
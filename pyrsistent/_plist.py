@@ -1,44 +1,65 @@
 from collections.abc import Sequence, Hashable
 from numbers import Integral
-from functools import reduce
+from itertools import islice
 from typing import Generic, TypeVar
 
 T_co = TypeVar('T_co', covariant=True)
 
 
-class _PListBuilder(object):
-    """
-    Helper class to allow construction of a list without
-    having to reverse it in the end.
-    """
-    __slots__ = ('_head', '_tail')
+# A list is a chain of cons cells ending with the empty list, the only node that is not
+# a cons cell. The cons cell type and the functions below are mirrored by the optional C
+# extension plistc which is used in favour of them if available.
+
+class _PythonCons(object):
+    __slots__ = ('first', 'rest', '__weakref__')
+
+    def __new__(cls, first, rest):
+        instance = super(_PythonCons, cls).__new__(cls)
+        instance.first = first
+        instance.rest = rest
+        return instance
+
+
+def _python_iterate(node):
+    while node:
+        yield node.first
+        node = node.rest
+
 
-    def __init__(self):
-        self._head = _EMPTY_PLIST
-        self._tail = _EMPTY_PLIST
+def _python_length(node):
+    return sum(1 for _ in _python_iterate(node))
 
-    def _append(self, elem, constructor):
-        if not self._tail:
-            self._head = constructor(elem)
-            self._tail = self._head
-        else:
-            self._tail.rest = constructor(elem)
-            self._tail = self._tail.rest
 
-        return self._head
+def _python_drop(node, count):
+    while count > 0 and node:
+        node = node.rest
+        count -= 1
 
-    def append_elem(self, elem):
-        return self._append(elem, lambda e: PList(e, _EMPTY_PLIST))
+    return node
 
-    def append_plist(self, pl):
-        return self._append(pl, lambda l: l)
 
-    def build(self):
-        return self._head
+def _python_cons_all(cls, head, iterable):
+    for elem in iterable:
+        head = cls(elem, head)
+
+    return head
+
+
+try:
+    # Use the C extension for the cons cells if it is available
+    import os
+    if os.environ.get('PYRSISTENT_NO_C_EXTENSION'):
+        _Cons, _iterate, _length, _drop, _cons_all = \
+            _PythonCons, _python_iterate, _python_length, _python_drop, _python_cons_all
+    else:
+        from plistc import Cons as _Cons, iterate as _iterate, length as _length, drop as _drop, cons_all as _cons_all
+except ImportError:
+    _Cons, _iterate, _length, _drop, _cons_all = \
+        _PythonCons, _python_iterate, _python_length, _python_drop, _python_cons_all
 
 
 class _PListBase(object):
-    __slots__ = ('__weakref__',)
+    __slots__ = ()
 
     # Selected implementations can be taken straight from the Sequence
     # class, other are less suitable. Especially those that work with
@@ -56,9 +77,14 @@ class _PListBase(object):
 
         This is obviously O(n) but with the current implementation
         where a list is also a node the overhead of storing the length
-        in every node would be quite significant.
+        in every node would be quite significant. Lists created with
+        counted=True store it anyway and return it in O(1).
         """
-        return sum(1 for _ in self)
+        return _length(self)
+
+    def _empty(self):
+        # The empty list of the same flavor as this list
+        return _EMPTY_PLIST
 
     def __repr__(self):
         return "plist({0})".format(list(self))
@@ -82,11 +108,7 @@ class _PListBase(object):
         >>> plist([1, 2]).mcons([3, 4])
         plist([4, 3, 1, 2])
         """
-        head = self
-        for elem in iterable:
-            head = head.cons(elem)
-
-        return head
+        return _cons_all(PList, self, iterable)
 
     def reverse(self):
         """
@@ -100,13 +122,7 @@ class _PListBase(object):
         >>> reversed(plist([1, 2, 3]))
         plist([3, 2, 1])
         """
-        result = plist()
-        head = self
-        while head:
-            result = result.cons(head.first)
-            head = head.rest
-
-        return result
+        return self._empty().mcons(self)
     __reversed__ = reverse
 
     def split(self, index):
@@ -117,25 +133,15 @@ class _PListBase(object):
         >>> plist([1, 2, 3, 4]).split(2)
         (plist([1, 2]), plist([3, 4]))
         """
-        lb = _PListBuilder()
-        right_list = self
-        i = 0
-        while right_list and i < index:
-            lb.append_elem(right_list.first)
-            right_list = right_list.rest
-            i += 1
-
+        right_list = _drop(self, index)
         if not right_list:
             # Just a small optimization in the cases where no split occurred
-            return self, _EMPTY_PLIST
+            return self, right_list
 
-        return lb.build(), right_list
+        return self._empty().mcons(reversed(list(islice(self, max(index, 0))))), right_list
 
     def __iter__(self):
-        li = self
-        while li:
-            yield li.first
-            li = li.rest
+        return _iterate(self)
 
     def __lt__(self, other):
         if not isinstance(other, _PListBase):
@@ -171,7 +177,7 @@ class _PListBase(object):
                 return self._drop(index.start)
 
             # Take the easy way out for all other slicing cases, not much structural reuse possible anyway
-            return plist(tuple(self)[index])
+            return self._empty().mcons(tuple(self)[index][::-1])
 
         if not isinstance(index, Integral):
             raise TypeError("'%s' object cannot be interpreted as an index" % type(index).__name__)
@@ -189,15 +195,16 @@ class _PListBase(object):
         if count < 0:
             raise IndexError("PList index out of range")
 
-        head = self
-        while count > 0:
-            head = head.rest
-            count -= 1
-
-        return head
+        return _drop(self, count)
 
     def __hash__(self):
-        return hash(tuple(self))
+        # Folded from the end of the list so that the result matches the hashes that
+        # counted lists cache node by node
+        result = hash(())
+        for elem in reversed(list(self)):
+            result = hash((elem, result))
+
+        return result
 
     def remove(self, elem):
         """
@@ -209,24 +216,20 @@ class _PListBase(object):
         >>> plist([1, 2, 1]).remove(1)
         plist([2, 1])
         """
-
-        builder = _PListBuilder()
-        head = self
-        while head:
-            if head.first == elem:
-                return builder.append_plist(head.rest)
-
-            builder.append_elem(head.first)
-            head = head.rest
+        for i, e in enumerate(self):
+            if e == elem:
+                return _drop(self, i + 1).mcons(reversed(list(islice(self, i))))
 
         raise ValueError('{0} not found in PList'.format(elem))
 
 
-class PList(Generic[T_co], _PListBase):
+class PList(Generic[T_co], _PListBase, _Cons):
     """
     Classical Lisp style singly linked list. Adding elements to the head using cons is O(1).
     Element access is O(k) where k is the position of the element in the list. Taking the
-    length of the list is O(n).
+    length of the list is O(n), unless the list was created with counted=True in which case
+    every node stores the length of the list and caches its hash, which is derived in O(1)
+    from the hash of the node's tail.
 
     Fully supports the Sequence and Hashable protocols including indexing and slicing but
     if you need fast random access go for the PVector instead.
@@ -249,13 +252,7 @@ class PList(Generic[T_co], _PListBase):
     >>> y[:2]
     plist([3, 1])
     """
-    __slots__ = ('first', 'rest')
-
-    def __new__(cls, first, rest):
-        instance = super(PList, cls).__new__(cls)
-        instance.first = first
-        instance.rest = rest
-        return instance
+    __slots__ = ()
 
     def __bool__(self):
         return True
@@ -267,7 +264,7 @@ Hashable.register(PList)
 
 
 class _EmptyPList(_PListBase):
-    __slots__ = ()
+    __slots__ = ('__weakref__',)
 
     def __bool__(self):
         return False
@@ -288,7 +285,83 @@ Hashable.register(_EmptyPList)
 _EMPTY_PLIST = _EmptyPList()
 
 
-def plist(iterable=(), reverse=False):
+class _CountedPListBase(object):
+    """
+    Overrides shared by the empty and non empty counted lists. Lists derived from a
+    counted list are counted as well.
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Pickling support
+        return plist, (list(self), False, True)
+
+    def _empty(self):
+        return _EMPTY_COUNTED_PLIST
+
+    def cons(self, elem):
+        return _CountedPList(elem, self, len(self) + 1)
+
+    def mcons(self, iterable):
+        head = self
+        for elem in iterable:
+            head = head.cons(elem)
+
+        return head
+
+
+class _CountedPList(_CountedPListBase, PList):
+    __slots__ = ('_length', '_hash')
+
+    def __new__(cls, first, rest, length):
+        instance = super(_CountedPList, cls).__new__(cls, first, rest)
+        instance._length = length
+        instance._hash = None
+        return instance
+
+    def __len__(self):
+        return self._length
+
+    def __eq__(self, other):
+        if isinstance(other, _CountedPList) and other._length != self._length:
+            return False
+
+        return super(_CountedPList, self).__eq__(other)
+
+    def __hash__(self):
+        if self._hash is None:
+            # Walk down to the first node with a known hash, then fold back up caching
+            # the hash of every node on the way
+            nodes = []
+            node = self
+            while node and node._hash is None:
+                nodes.append(node)
+                node = node.rest
+
+            result = hash(node)
+            for node in reversed(nodes):
+                node._hash = result = hash((node.first, result))
+
+        return self._hash
+
+    def __getitem__(self, index):
+        if isinstance(index, Integral) and not -self._length <= index < self._length:
+            raise IndexError("PList index out of range")
+
+        return super(_CountedPList, self).__getitem__(index)
+
+
+class _EmptyCountedPList(_CountedPListBase, _EmptyPList):
+    __slots__ = ()
+
+    def __len__(self):
+        return 0
+
+
+_EMPTY_COUNTED_PLIST = _EmptyCountedPList()
+
+
+def plist(iterable=(), reverse=False, counted=False):
     """
     Creates a new persistent list containing all elements of iterable.
     Optional parameter reverse specifies if the elements should be inserted in
@@ -298,12 +371,19 @@ def plist(iterable=(), reverse=False):
     plist([1, 2, 3])
     >>> plist([1, 2, 3], reverse=True)
     plist([3, 2, 1])
+
+    If counted is True every node stores the length of the list, making len(), negative
+    indexing and bounds checks O(1), and caches its hash. Hashing a list consed onto an
+    already hashed counted list is O(1). Lists derived from a counted list are also counted.
+
+    >>> len(plist([1, 2, 3], counted=True).cons(0))
+    4
     """
     if not reverse:
         iterable = list(iterable)
         iterable.reverse()
 
-    return reduce(lambda pl, elem: pl.cons(elem), iterable, _EMPTY_PLIST)
+    return (_EMPTY_COUNTED_PLIST if counted else _EMPTY_PLIST).mcons(iterable)
 
 
 def l(*elements):
@@ -1,8 +1,6 @@
 from collections.abc import Mapping, Hashable
-from itertools import chain
 from typing import Generic, TypeVar
 
-from pyrsistent._pvector import pvector
 from pyrsistent._transformations import transform
 
 KT = TypeVar('KT')
@@ -107,6 +105,379 @@ class PMapItems(PMapView):
         elif not isinstance(x, type(self)): return False
         else: return self._map == x._map
 
+# Hash array mapped trie (HAMT) backing PMap
+#
+# The trie follows the CHAMP layout. A node is a Python list:
+#
+#   [datamap, nodemap, edit, k0, v0, k1, v1, ..., node1, node0]
+#
+# datamap and nodemap are bitmaps that tell which of the 32 slots on the level hold a
+# key/value pair and which hold a sub node. Pairs are stored inline after the header in
+# slot order, sub nodes are stored at the end of the list in reverse slot order. Keys with
+# identical hashes that cannot be told apart by the trie are stored in a collision node,
+# a tuple (hash, k0, v0, k1, v1, ...).
+#
+# The trie is kept in canonical form, a sub node always holds at least two keys. This means
+# that the shape of the trie only depends on the keys stored in it.
+#
+# edit is the ownership token of the evolver that created the node. Nodes owned by an
+# evolver are mutated in place by that evolver, all other nodes are copied on update.
+#
+# The functions below are mirrored by the optional C extension pmapc which is used in favour
+# of them if available.
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HEADER_SIZE = 3
+_MISSING = object()
+_EMPTY_NODE = [0, 0, None]
+
+
+def _python_lookup(node, key, default):
+    h = hash(key)
+    shift = 0
+    while True:
+        if type(node) is tuple:
+            if node[0] == h:
+                for i in range(1, len(node), 2):
+                    k = node[i]
+                    if k is key or k == key:
+                        return node[i + 1]
+            return default
+
+        bit = 1 << ((h >> shift) & _MASK)
+        datamap = node[0]
+        if datamap & bit:
+            i = _HEADER_SIZE + 2 * (datamap & (bit - 1)).bit_count()
+            k = node[i]
+            if k is key or k == key:
+                return node[i + 1]
+            return default
+
+        nodemap = node[1]
+        if not nodemap & bit:
+            return default
+
+        node = node[-1 - (nodemap & (bit - 1)).bit_count()]
+        shift += _BITS
+
+
+def _editable(node, edit):
+    if edit is not None and node[2] is edit:
+        return node
+
+    result = node[:]
+    result[2] = edit
+    return result
+
+
+def _merge_entries(shift, h1, k1, v1, h2, k2, v2, edit):
+    if h1 == h2:
+        return h1, k1, v1, k2, v2
+
+    f1 = (h1 >> shift) & _MASK
+    f2 = (h2 >> shift) & _MASK
+    if f1 == f2:
+        return [0, 1 << f1, edit, _merge_entries(shift + _BITS, h1, k1, v1, h2, k2, v2, edit)]
+
+    if f1 < f2:
+        return [(1 << f1) | (1 << f2), 0, edit, k1, v1, k2, v2]
+
+    return [(1 << f1) | (1 << f2), 0, edit, k2, v2, k1, v1]
+
+
+def _merge_collision(shift, collision, h, key, val, edit):
+    fc = (collision[0] >> shift) & _MASK
+    f = (h >> shift) & _MASK
+    if fc == f:
+        return [0, 1 << f, edit, _merge_collision(shift + _BITS, collision, h, key, val, edit)]
+
+    return [1 << f, 1 << fc, edit, key, val, collision]
+
+
+def _collision_assoc(node, shift, h, key, val, edit):
+    if node[0] != h:
+        return _merge_collision(shift, node, h, key, val, edit), True
+
+    for i in range(1, len(node), 2):
+        k = node[i]
+        if k is key or k == key:
+            if node[i + 1] is val:
+                return node, False
+
+            return node[:i + 1] + (val,) + node[i + 2:], False
+
+    return node + (key, val), True
+
+
+def _node_assoc(node, shift, h, key, val, edit):
+    if type(node) is tuple:
+        return _collision_assoc(node, shift, h, key, val, edit)
+
+    bit = 1 << ((h >> shift) & _MASK)
+    datamap = node[0]
+    if datamap & bit:
+        i = _HEADER_SIZE + 2 * (datamap & (bit - 1)).bit_count()
+        k = node[i]
+        if k is key or k == key:
+            if node[i + 1] is val:
+                return node, False
+
+            result = _editable(node, edit)
+            result[i + 1] = val
+            return result, False
+
+        # Another key occupies the slot, push both down into a new sub node
+        sub_node = _merge_entries(shift + _BITS, hash(k), k, node[i + 1], h, key, val, edit)
+        nodemap = node[1] | bit
+        j = len(node) - 2 - (nodemap & (bit - 1)).bit_count()
+        if edit is None or node[2] is not edit:
+            return [datamap ^ bit, nodemap, edit] + node[_HEADER_SIZE:i] + node[i + 2:j + 2] + [sub_node] + node[j + 2:], True
+
+        del node[i:i + 2]
+        node[0] = datamap ^ bit
+        node[1] = nodemap
+        node.insert(j, sub_node)
+        return node, True
+
+    nodemap = node[1]
+    if nodemap & bit:
+        j = len(node) - 1 - (nodemap & (bit - 1)).bit_count()
+        sub_node = node[j]
+        new_sub_node, added = _node_assoc(sub_node, shift + _BITS, h, key, val, edit)
+        if new_sub_node is sub_node:
+            return node, added
+
+        result = _editable(node, edit)
+        result[j] = new_sub_node
+        return result, added
+
+    i = _HEADER_SIZE + 2 * (datamap & (bit - 1)).bit_count()
+    if edit is None or node[2] is not edit:
+        # Build copies with their exact size, inserting into a copy would over allocate it
+        return [datamap | bit, node[1], edit] + node[_HEADER_SIZE:i] + [key, val] + node[i:], True
+
+    node[i:i] = (key, val)
+    node[0] = datamap | bit
+    return node, True
+
+
+def _python_assoc(node, key, val, edit):
+    return _node_assoc(node, 0, hash(key), key, val, edit)
+
+
+def _node_dissoc(node, shift, h, key, edit):
+    if type(node) is tuple:
+        if node[0] == h:
+            for i in range(1, len(node), 2):
+                k = node[i]
+                if k is key or k == key:
+                    return node[:i] + node[i + 2:]
+
+        return None
+
+    bit = 1 << ((h >> shift) & _MASK)
+    datamap = node[0]
+    if datamap & bit:
+        i = _HEADER_SIZE + 2 * (datamap & (bit - 1)).bit_count()
+        k = node[i]
+        if k is key or k == key:
+            result = _editable(node, edit)
+            del result[i:i + 2]
+            result[0] = datamap ^ bit
+            return result
+
+        return None
+
+    nodemap = node[1]
+    if not nodemap & bit:
+        return None
+
+    j = len(node) - 1 - (nodemap & (bit - 1)).bit_count()
+    sub_node = node[j]
+    new_sub_node = _node_dissoc(sub_node, shift + _BITS, h, key, edit)
+    if new_sub_node is None:
+        return None
+
+    # Keep the trie canonical, a sub node that is down to a single key is inlined
+    # in this node and a lone collision node is pulled up to this level.
+    if type(new_sub_node) is tuple:
+        if len(new_sub_node) == 3:
+            return _inline_entry(node, bit, j, new_sub_node[1], new_sub_node[2], edit)
+    elif not new_sub_node[1] and new_sub_node[0].bit_count() == 1:
+        return _inline_entry(node, bit, j, new_sub_node[3], new_sub_node[4], edit)
+    elif not new_sub_node[0] and new_sub_node[1].bit_count() == 1 and type(new_sub_node[3]) is tuple:
+        new_sub_node = new_sub_node[3]
+
+    if new_sub_node is sub_node:
+        return node
+
+    result = _editable(node, edit)
+    result[j] = new_sub_node
+    return result
+
+
+def _inline_entry(node, bit, j, key, val, edit):
+    result = _editable(node, edit)
+    del result[j]
+    datamap = result[0] | bit
+    result[0] = datamap
+    result[1] ^= bit
+    i = _HEADER_SIZE + 2 * (datamap & (bit - 1)).bit_count()
+    result[i:i] = (key, val)
+    return result
+
+
+def _python_dissoc(node, key, edit):
+    return _node_dissoc(node, 0, hash(key), key, edit)
+
+
+def _python_assoc_all(node, items, edit, hashed):
+    # Insert all key value pairs, or (hash, key, value) triples if hashed, in one pass. Returns the
+    # new root together with the number of keys added.
+    added = 0
+    if hashed:
+        for h, key, val in items:
+            node, is_added = _node_assoc(node, 0, h, key, val, edit)
+            added += is_added
+    else:
+        if type(items) is dict:
+            items = items.items()
+
+        for key, val in items:
+            node, is_added = _node_assoc(node, 0, hash(key), key, val, edit)
+            added += is_added
+
+    return node, added
+
+
+def _iter_entries(node):
+    if type(node) is tuple:
+        yield from zip(node[1::2], node[2::2])
+        return
+
+    data_end = _HEADER_SIZE + 2 * node[0].bit_count()
+    yield from zip(node[_HEADER_SIZE:data_end:2], node[_HEADER_SIZE + 1:data_end:2])
+    for sub_node in node[:data_end - 1:-1]:
+        yield from _iter_entries(sub_node)
+
+
+def _nodes_equal(node1, node2):
+    # The trie is canonical so equal maps have identically shaped tries. This makes it possible
+    # to compare two tries level by level and skip any sub trie that is shared between them.
+    if node1 is node2:
+        return True
+
+    if type(node1) is tuple or type(node2) is tuple:
+        if type(node1) is not type(node2) or len(node1) != len(node2) or node1[0] != node2[0]:
+            return False
+
+        # Collision nodes hold their entries in insertion order
+        entries = dict(zip(node2[1::2], node2[2::2]))
+        for key, val in zip(node1[1::2], node1[2::2]):
+            other_val = entries.get(key, _MISSING)
+            if other_val is _MISSING or not (other_val is val or other_val == val):
+                return False
+
+        return True
+
+    if node1[0] != node2[0] or node1[1] != node2[1]:
+        return False
+
+    data_end = _HEADER_SIZE + 2 * node1[0].bit_count()
+    for i in range(_HEADER_SIZE, data_end):
+        item1, item2 = node1[i], node2[i]
+        if not (item1 is item2 or item1 == item2):
+            return False
+
+    for i in range(data_end, len(node1)):
+        if not _nodes_equal(node1[i], node2[i]):
+            return False
+
+    return True
+
+
+def _slot_entries(node, bit):
+    datamap, nodemap = node[0], node[1]
+    if datamap & bit:
+        i = _HEADER_SIZE + 2 * (datamap & (bit - 1)).bit_count()
+        return ((node[i], node[i + 1]),)
+
+    if nodemap & bit:
+        return _iter_entries(node[-1 - (nodemap & (bit - 1)).bit_count()])
+
+    return ()
+
+
+def _diff_entries(entries1, entries2, added, removed, changed):
+    entries2 = dict(entries2)
+    for key, val in entries1:
+        other_val = entries2.pop(key, _MISSING)
+        if other_val is _MISSING:
+            removed[key] = val
+        elif not (other_val is val or other_val == val):
+            changed[key] = (val, other_val)
+
+    added.update(entries2)
+
+
+def _diff_nodes(node1, node2, added, removed, changed):
+    # Walk both tries in parallel, sub tries that are shared between them are skipped.
+    # Slots where the layout of the tries differ are diffed entry by entry.
+    if node1 is node2:
+        return
+
+    if type(node1) is tuple or type(node2) is tuple:
+        _diff_entries(_iter_entries(node1), _iter_entries(node2), added, removed, changed)
+        return
+
+    datamap1, nodemap1, datamap2, nodemap2 = node1[0], node1[1], node2[0], node2[1]
+    bitmap = datamap1 | nodemap1 | datamap2 | nodemap2
+    while bitmap:
+        bit = bitmap & -bitmap
+        bitmap ^= bit
+        if nodemap1 & bit and nodemap2 & bit:
+            sub_node1 = node1[-1 - (nodemap1 & (bit - 1)).bit_count()]
+            sub_node2 = node2[-1 - (nodemap2 & (bit - 1)).bit_count()]
+            if sub_node1 is not sub_node2:
+                _diff_nodes(sub_node1, sub_node2, added, removed, changed)
+        elif datamap1 & bit and datamap2 & bit:
+            i = _HEADER_SIZE + 2 * (datamap1 & (bit - 1)).bit_count()
+            j = _HEADER_SIZE + 2 * (datamap2 & (bit - 1)).bit_count()
+            key1, val1, key2, val2 = node1[i], node1[i + 1], node2[j], node2[j + 1]
+            if key1 is key2 or key1 == key2:
+                if not (val1 is val2 or val1 == val2):
+                    changed[key1] = (val1, val2)
+            else:
+                removed[key1] = val1
+                added[key2] = val2
+        else:
+            _diff_entries(_slot_entries(node1, bit), _slot_entries(node2, bit), added, removed, changed)
+
+def _shares_subtries(node1, node2):
+    # Cheap check on the top level of two tries to tell if they have been derived from
+    # each other or from a common ancestor.
+    if node1 is node2:
+        return True
+
+    if type(node1) is tuple or type(node2) is tuple:
+        return False
+
+    sub_nodes = {id(node) for node in node2[_HEADER_SIZE + 2 * node2[0].bit_count():]}
+    return any(id(node) in sub_nodes for node in node1[_HEADER_SIZE + 2 * node1[0].bit_count():])
+
+
+try:
+    # Use the C extension for the trie operations if it is available
+    import os
+    if os.environ.get('PYRSISTENT_NO_C_EXTENSION'):
+        _lookup, _assoc, _dissoc, _assoc_all = _python_lookup, _python_assoc, _python_dissoc, _python_assoc_all
+    else:
+        from pmapc import lookup as _lookup, assoc as _assoc, dissoc as _dissoc, assoc_all as _assoc_all
+except ImportError:
+    _lookup, _assoc, _dissoc, _assoc_all = _python_lookup, _python_assoc, _python_dissoc, _python_assoc_all
+
+
 class PMap(Generic[KT, VT_co]):
     """
     Persistent map/dict. Tries to follow the same naming conventions as the built in dict where feasible.
@@ -114,11 +485,10 @@ class PMap(Generic[KT, VT_co]):
     Do not instantiate directly, instead use the factory functions :py:func:`m` or :py:func:`pmap` to
     create an instance.
 
-    Was originally written as a very close copy of the Clojure equivalent but was later rewritten to closer
-    re-assemble the python dict. This means that a sparse vector (a PVector) of buckets is used. The keys are
-    hashed and the elements inserted at position hash % len(bucket_vector). Whenever the map size exceeds 2/3 of
-    the containing vectors size the map is reallocated to a vector of double the size. This is done to avoid
-    excessive hash collisions.
+    The map is implemented as a hash array mapped trie (HAMT) with bitmap compressed nodes, following the
+    CHAMP variant of the structure. Updates copy the path from the root to the changed entry, the rest of
+    the trie is shared with the original map. The hot trie operations are implemented in a C extension
+    that is used if available.
 
     This structure corresponds most closely to the built in dict type and is intended as a replacement. Where the
     semantics are the same (more or less) the same function names have been used but for some cases it is not possible,
@@ -145,49 +515,30 @@ class PMap(Generic[KT, VT_co]):
     >>> m3.c
     3
     """
-    __slots__ = ('_size', '_buckets', '__weakref__', '_cached_hash')
+    __slots__ = ('_size', '_root', '__weakref__', '_entries_hash', '_deep_frozen')
 
-    def __new__(cls, size, buckets):
+    def __new__(cls, size, root):
         self = super(PMap, cls).__new__(cls)
         self._size = size
-        self._buckets = buckets
+        self._root = root
         return self
 
     @staticmethod
-    def _get_bucket(buckets, key):
-        index = hash(key) % len(buckets)
-        bucket = buckets[index]
-        return index, bucket
-
-    @staticmethod
-    def _getitem(buckets, key):
-        _, bucket = PMap._get_bucket(buckets, key)
-        if bucket:
-            for k, v in bucket:
-                if k == key:
-                    return v
+    def _getitem(root, key):
+        value = _lookup(root, key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
 
-        raise KeyError(key)
+        return value
 
     def __getitem__(self, key):
-        return PMap._getitem(self._buckets, key)
-
-    @staticmethod
-    def _contains(buckets, key):
-        _, bucket = PMap._get_bucket(buckets, key)
-        if bucket:
-            for k, _ in bucket:
-                if k == key:
-                    return True
-
-            return False
-
-        return False
+        return PMap._getitem(self._root, key)
 
     def __contains__(self, key):
-        return self._contains(self._buckets, key)
+        return _lookup(self._root, key, _MISSING) is not _MISSING
 
-    get = Mapping.get
+    def get(self, key, default=None):
+        return _lookup(self._root, key, default)
 
     def __iter__(self):
         return self.iterkeys()
@@ -218,10 +569,7 @@ class PMap(Generic[KT, VT_co]):
             yield v
 
     def iteritems(self):
-        for bucket in self._buckets:
-            if bucket:
-                for k, v in bucket:
-                    yield k, v
+        return _iter_entries(self._root)
 
     def values(self):
         return PMapValues(self)
@@ -247,12 +595,10 @@ class PMap(Generic[KT, VT_co]):
         if len(self) != len(other):
             return False
         if isinstance(other, PMap):
-            if (hasattr(self, '_cached_hash') and hasattr(other, '_cached_hash')
-                    and self._cached_hash != other._cached_hash):
+            if (hasattr(self, '_entries_hash') and hasattr(other, '_entries_hash')
+                    and self._entries_hash != other._entries_hash):
                 return False
-            if self._buckets == other._buckets:
-                return True
-            return dict(self.iteritems()) == dict(other.iteritems())
+            return _nodes_equal(self._root, other._root)
         elif isinstance(other, dict):
             return dict(self.iteritems()) == other
         return dict(self.iteritems()) == dict(other.items())
@@ -270,9 +616,15 @@ class PMap(Generic[KT, VT_co]):
         return self.__repr__()
 
     def __hash__(self):
-        if not hasattr(self, '_cached_hash'):
-            self._cached_hash = hash(frozenset(self.iteritems()))
-        return self._cached_hash
+        # The hash is derived from the XOR of the hashes of all entries. Once it has been
+        # calculated it is kept up to date by evolvers, so maps derived from a hashed map
+        # can be hashed without visiting all their entries.
+        if not hasattr(self, '_entries_hash'):
+            entries_hash = 0
+            for item in self.iteritems():
+                entries_hash ^= hash(item)
+            self._entries_hash = entries_hash
+        return hash((self._size, self._entries_hash))
 
     def set(self, key, val):
         """
@@ -391,76 +743,91 @@ class PMap(Generic[KT, VT_co]):
     def copy(self):
         return self
 
+    def diff(self, other):
+        """
+        Return the differences between this map and other as a tuple of three maps (added, removed, changed).
+        added holds the entries only found in other, removed the entries only found in this map and changed
+        maps the keys found in both with different values to a tuple (value in this map, value in other).
+
+        Parts of the maps that are shared are skipped, diffing two versions of a map that differ by k
+        updates is roughly O(k log n).
+
+        >>> m1 = m(a=1, b=2, c=3)
+        >>> added, removed, changed = m1.diff(m1.set('a', 4).remove('b').set('d', 5))
+        >>> added
+        pmap({'d': 5})
+        >>> removed
+        pmap({'b': 2})
+        >>> changed
+        pmap({'a': (1, 4)})
+        """
+        if not isinstance(other, PMap):
+            other = pmap(other)
+
+        added, removed, changed = {}, {}, {}
+        _diff_nodes(self._root, other._root, added, removed, changed)
+        return pmap(added), pmap(removed), pmap(changed)
+
     class _Evolver(object):
-        __slots__ = ('_buckets_evolver', '_size', '_original_pmap')
+        __slots__ = ('_root', '_size', '_edit', '_original_pmap', '_entries_hash')
 
         def __init__(self, original_pmap):
             self._original_pmap = original_pmap
-            self._buckets_evolver = original_pmap._buckets.evolver()
+            self._root = original_pmap._root
             self._size = original_pmap._size
+            self._edit = object()
+            # The hash is only kept up to date for maps that have been hashed. The empty map is
+            # excluded since it is the starting point for all maps built from scratch.
+            self._entries_hash = getattr(original_pmap, '_entries_hash', None) if original_pmap._size else None
 
         def __getitem__(self, key):
-            return PMap._getitem(self._buckets_evolver, key)
+            return PMap._getitem(self._root, key)
 
         def __setitem__(self, key, val):
             self.set(key, val)
 
         def set(self, key, val):
-            kv = (key, val)
-            index, bucket = PMap._get_bucket(self._buckets_evolver, key)
-            reallocation_required = len(self._buckets_evolver) < 0.67 * self._size
-            if bucket:
-                for k, v in bucket:
-                    if k == key:
-                        if v is not val:
-                            # Use `not (k2 == k)` rather than `!=` to avoid relying on a well implemented `__ne__`, see #268.
-                            new_bucket = [(k2, v2) if not (k2 == k) else (k2, val) for k2, v2 in bucket]
-                            self._buckets_evolver[index] = new_bucket
-
-                        return self
-
-                # Only check and perform reallocation if not replacing an existing value.
-                # This is a performance tweak, see #247.
-                if reallocation_required:
-                    self._reallocate()
-                    return self.set(key, val)
-
-                new_bucket = [kv]
-                new_bucket.extend(bucket)
-                self._buckets_evolver[index] = new_bucket
-                self._size += 1
+            if self._entries_hash is None:
+                self._root, added = _assoc(self._root, key, val, self._edit)
             else:
-                if reallocation_required:
-                    self._reallocate()
-                    return self.set(key, val)
+                old_val = _lookup(self._root, key, _MISSING)
+                self._root, added = _assoc(self._root, key, val, self._edit)
+                self._update_entries_hash(key, old_val, val)
 
-                self._buckets_evolver[index] = [kv]
+            if added:
                 self._size += 1
 
             return self
 
-        def _reallocate(self):
-            new_size = 2 * len(self._buckets_evolver)
-            new_list = new_size * [None]
-            buckets = self._buckets_evolver.persistent()
-            for k, v in chain.from_iterable(x for x in buckets if x):
-                index = hash(k) % new_size
-                if new_list[index]:
-                    new_list[index].append((k, v))
-                else:
-                    new_list[index] = [(k, v)]
-
-            # A reallocation should always result in a dirty buckets evolver to avoid
-            # possible loss of elements when doing the reallocation.
-            self._buckets_evolver = pvector().evolver()
-            self._buckets_evolver.extend(new_list)
+        def _update_entries_hash(self, key, old_val, new_val):
+            try:
+                entries_hash = self._entries_hash
+                if old_val is not _MISSING:
+                    entries_hash ^= hash((key, old_val))
+                if new_val is not _MISSING:
+                    entries_hash ^= hash((key, new_val))
+                self._entries_hash = entries_hash
+            except Exception:
+                # Unhashable value, stop tracking the hash
+                self._entries_hash = None
+
+        def _with_entries_hash(self, pmap):
+            if self._entries_hash is not None and not hasattr(pmap, '_entries_hash'):
+                pmap._entries_hash = self._entries_hash
+            return pmap
 
         def is_dirty(self):
-            return self._buckets_evolver.is_dirty()
+            return self._root is not self._original_pmap._root
+
+        def _persistent_root(self):
+            # Nodes owned by this evolver are about to be shared, make sure that
+            # they are not mutated by any further updates.
+            self._edit = object()
+            return self._root
 
         def persistent(self):
             if self.is_dirty():
-                self._original_pmap = PMap(self._size, self._buckets_evolver.persistent())
+                self._original_pmap = self._with_entries_hash(PMap(self._size, self._persistent_root()))
 
             return self._original_pmap
 
@@ -468,24 +835,22 @@ class PMap(Generic[KT, VT_co]):
             return self._size
 
         def __contains__(self, key):
-            return PMap._contains(self._buckets_evolver, key)
+            return _lookup(self._root, key, _MISSING) is not _MISSING
 
         def __delitem__(self, key):
             self.remove(key)
 
         def remove(self, key):
-            index, bucket = PMap._get_bucket(self._buckets_evolver, key)
+            if self._entries_hash is not None:
+                self._update_entries_hash(key, _lookup(self._root, key, _MISSING), _MISSING)
 
-            if bucket:
-                # Use `not (k == key)` rather than `!=` to avoid relying on a well implemented `__ne__`, see #268.
-                new_bucket = [(k, v) for (k, v) in bucket if not (k == key)]
-                size_diff = len(bucket) - len(new_bucket)
-                if size_diff > 0:
-                    self._buckets_evolver[index] = new_bucket if new_bucket else None
-                    self._size -= size_diff
-                    return self
+            root = _dissoc(self._root, key, self._edit)
+            if root is None:
+                raise KeyError('{0}'.format(key))
 
-            raise KeyError('{0}'.format(key))
+            self._root = root
+            self._size -= 1
+            return self
 
     def evolver(self):
         """
@@ -522,55 +887,51 @@ Mapping.register(PMap)
 Hashable.register(PMap)
 
 
-def _turbo_mapping(initial, pre_size):
-    if pre_size:
-        size = pre_size
-    else:
-        try:
-            size = 2 * len(initial) or 8
-        except Exception:
-            # Guess we can't figure out the length. Give up on length hinting,
-            # we can always reallocate later.
-            size = 8
-
-    buckets = size * [None]
-
-    if not isinstance(initial, Mapping):
-        # Make a dictionary of the initial data if it isn't already,
-        # that will save us some job further down since we can assume no
-        # key collisions
-        initial = dict(initial)
-
-    for k, v in initial.items():
-        h = hash(k)
-        index = h % size
-        bucket = buckets[index]
-
-        if bucket:
-            bucket.append((k, v))
-        else:
-            buckets[index] = [(k, v)]
+def _turbo_mapping(initial, hashed=False):
+    if type(initial) is not dict and isinstance(initial, Mapping):
+        initial = initial.items()
+
+    # The trie is built in place, in a single pass over the input, since
+    # all nodes are owned by the fresh edit token.
+    root, size = _assoc_all(_EMPTY_NODE, initial, object(), hashed)
+    if not size:
+        return _EMPTY_PMAP
 
-    return PMap(len(initial), pvector().extend(buckets))
+    return PMap(size, root)
 
 
-_EMPTY_PMAP = _turbo_mapping({}, 0)
+_EMPTY_PMAP = PMap(0, _EMPTY_NODE)
 
 
 def pmap(initial={}, pre_size=0):
     """
-    Create new persistent map, inserts all elements in initial into the newly created map.
-    The optional argument pre_size may be used to specify an initial size of the underlying bucket vector. This
-    may have a positive performance impact in the cases where you know beforehand that a large number of elements
-    will be inserted into the map eventually since it will reduce the number of reallocations required.
+    Create new persistent map, inserts all elements in initial into the newly created map. Initial may be
+    a mapping or an iterable of key value pairs, the map is built directly from it without intermediate copies.
+    The optional argument pre_size is accepted for backwards compatibility but has no effect. The underlying
+    trie grows one node at a time as elements are inserted so there is never a need to reallocate it.
 
     >>> pmap({'a': 13, 'b': 14}) == {'a': 13, 'b': 14}
     True
     """
-    if not initial and pre_size == 0:
+    if not initial:
         return _EMPTY_PMAP
 
-    return _turbo_mapping(initial, pre_size)
+    if type(initial) is PMap:
+        return initial
+
+    return _turbo_mapping(initial)
+
+
+def pmap_from_hashed(triples):
+    """
+    Create new persistent map from an iterable of (hash, key, value) triples. This saves calling hash() on
+    each key when the hashes are already at hand. The hash must equal hash(key), as calculated in the current
+    process, or lookups in the resulting map will fail.
+
+    >>> pmap_from_hashed([(hash('a'), 'a', 13), (hash('b'), 'b', 14)]) == {'a': 13, 'b': 14}
+    True
+    """
+    return _turbo_mapping(triples, hashed=True)
 
 
 def m(**kwargs):
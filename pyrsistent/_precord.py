@@ -1,15 +1,30 @@
 from typing import Any
 from pyrsistent._checked_types import CheckedType, _restore_pickle, InvariantException, store_invariants
 from pyrsistent._field_common import (
-    set_fields, check_type, is_field_ignore_extra_complaint, PFIELD_NO_INITIAL, serialize, check_global_invariants
+    set_fields, PFIELD_NO_INITIAL, serialize, check_global_invariants, make_field_setters
 )
 from pyrsistent._pmap import PMap, pmap
 
+_MISSING_VALUE = object()
+
+
+def _check_record(record, invariant_errors, missing_fields):
+    cls = record.__class__
+    if cls._precord_mandatory_fields:
+        missing_fields += tuple('{0}.{1}'.format(cls.__name__, f) for f
+                                in cls._precord_mandatory_fields if f not in record)
+
+    if invariant_errors or missing_fields:
+        raise InvariantException(tuple(invariant_errors), tuple(missing_fields), 'Field invariant failed')
+
+    check_global_invariants(record, cls._precord_invariants)
+
 
 class _PRecordMeta(type):
     def __new__(mcs, name, bases, dct):
         set_fields(dct, bases, name='_precord_fields')
         store_invariants(dct, bases, '_precord_invariants', '__invariant__')
+        dct['_precord_setters'] = make_field_setters(dct['_precord_fields'], CheckedType, _MISSING_VALUE)
         dct['_precord_mandatory_fields'] = \
             set(name for name, field in dct['_precord_fields'].items() if field.mandatory)
         dct['_precord_initial_values'] = \
@@ -30,8 +45,8 @@ class PRecord(PMap[str, Any], CheckedType, metaclass=_PRecordMeta):
         # Hack total! If these two special attributes exist that means we can create
         # ourselves. Otherwise we need to go through the Evolver to create the structures
         # for us.
-        if '_precord_size' in kwargs and '_precord_buckets' in kwargs:
-            return super(PRecord, cls).__new__(cls, kwargs['_precord_size'], kwargs['_precord_buckets'])
+        if '_precord_size' in kwargs and '_precord_root' in kwargs:
+            return super(PRecord, cls).__new__(cls, kwargs['_precord_size'], kwargs['_precord_root'])
 
         factory_fields = kwargs.pop('_factory_fields', None)
         ignore_extra = kwargs.pop('_ignore_extra', False)
@@ -41,11 +56,24 @@ class PRecord(PMap[str, Any], CheckedType, metaclass=_PRecordMeta):
                                   for k, v in cls._precord_initial_values.items())
             initial_values.update(kwargs)
 
-        e = _PRecordEvolver(cls, pmap(pre_size=len(cls._precord_fields)), _factory_fields=factory_fields, _ignore_extra=ignore_extra)
+        # Run the values through the generated field setters and build the record in one go
+        setters = cls._precord_setters
+        values = {}
+        invariant_errors = []
+        missing_fields = []
         for k, v in initial_values.items():
-            e[k] = v
+            setter = setters.get(k)
+            if setter is None:
+                raise AttributeError("'{0}' is not among the specified fields for {1}".format(k, cls.__name__))
+
+            value = setter(cls, v, factory_fields, ignore_extra, invariant_errors, missing_fields)
+            if value is not _MISSING_VALUE:
+                values[k] = value
 
-        return e.persistent()
+        pm = pmap(values)
+        result = super(PRecord, cls).__new__(cls, pm._size, pm._root)
+        _check_record(result, invariant_errors, missing_fields)
+        return result
 
     def set(self, *args, **kwargs):
         """
@@ -114,29 +142,17 @@ class _PRecordEvolver(PMap._Evolver):
         self.set(key, original_value)
 
     def set(self, key, original_value):
-        field = self._destination_cls._precord_fields.get(key)
-        if field:
-            if self._factory_fields is None or field in self._factory_fields:
-                try:
-                    if is_field_ignore_extra_complaint(CheckedType, field, self._ignore_extra):
-                        value = field.factory(original_value, ignore_extra=self._ignore_extra)
-                    else:
-                        value = field.factory(original_value)
-                except InvariantException as e:
-                    self._invariant_error_codes += e.invariant_errors
-                    self._missing_fields += e.missing_fields
-                    return self
-            else:
-                value = original_value
-
-            check_type(self._destination_cls, field, key, value)
-            is_ok, error_code = field.invariant(value)
-            if not is_ok:
-                self._invariant_error_codes.append(error_code)
-
-            return super(_PRecordEvolver, self).set(key, value)
-        else:
-            raise AttributeError("'{0}' is not among the specified fields for {1}".format(key, self._destination_cls.__name__))
+        cls = self._destination_cls
+        setter = cls._precord_setters.get(key)
+        if setter is None:
+            raise AttributeError("'{0}' is not among the specified fields for {1}".format(key, cls.__name__))
+
+        value = setter(cls, original_value, self._factory_fields, self._ignore_extra,
+                       self._invariant_error_codes, self._missing_fields)
+        if value is _MISSING_VALUE:
+            return self
+
+        return super(_PRecordEvolver, self).set(key, value)
 
     def persistent(self):
         cls = self._destination_cls
@@ -144,18 +160,9 @@ class _PRecordEvolver(PMap._Evolver):
         pm = super(_PRecordEvolver, self).persistent()
 
         if is_dirty or not isinstance(pm, cls):
-            result = cls(_precord_buckets=pm._buckets, _precord_size=pm._size)
+            result = self._with_entries_hash(cls(_precord_root=pm._root, _precord_size=pm._size))
         else:
             result = pm
 
-        if cls._precord_mandatory_fields:
-            self._missing_fields += tuple('{0}.{1}'.format(cls.__name__, f) for f
-                                          in (cls._precord_mandatory_fields - set(result.keys())))
-
-        if self._invariant_error_codes or self._missing_fields:
-            raise InvariantException(tuple(self._invariant_error_codes), tuple(self._missing_fields),
-                                     'Field invariant failed')
-
-        check_global_invariants(result, cls._precord_invariants)
-
+        _check_record(result, self._invariant_error_codes, self._missing_fields)
         return result
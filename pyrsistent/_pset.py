@@ -1,7 +1,7 @@
-from collections.abc import Set, Hashable
+from collections.abc import Set, Hashable, Iterable
 import sys
 from typing import TypeVar, Generic
-from pyrsistent._pmap import pmap
+from pyrsistent._pmap import PMap, pmap, _shares_subtries
 
 T_co = TypeVar('T_co', covariant=True)
 
@@ -182,10 +182,86 @@ class PSet(Generic[T_co]):
     __eq__ = Set.__eq__
     __ne__ = Set.__ne__
 
-    __and__ = Set.__and__
-    __or__ = Set.__or__
-    __sub__ = Set.__sub__
-    __xor__ = Set.__xor__
+    # The set operations start from the larger of the sets where possible and only apply the
+    # elements of the smaller set to it. Sets that share structure, because they have been
+    # derived from each other, are diffed with the shared parts of the tries skipped.
+    def __or__(self, other):
+        if not isinstance(other, Iterable):
+            return NotImplemented
+
+        base = self._map
+        if isinstance(other, PSet):
+            base, other = _larger_first(base, other._map)
+            if _shares_subtries(base._root, other._root):
+                other, _, _ = base.diff(other)
+
+        e = base.evolver()
+        for element in other:
+            e[element] = True
+
+        return PSet(e.persistent())
+
+    def __and__(self, other):
+        if not isinstance(other, PSet):
+            return Set.__and__(self, other)
+
+        other, base = _larger_first(self._map, other._map)
+        if _shares_subtries(base._root, other._root):
+            _, removed, _ = base.diff(other)
+        else:
+            removed = [element for element in base if element not in other]
+
+        e = base.evolver()
+        for element in removed:
+            del e[element]
+
+        return PSet(e.persistent())
+
+    def __sub__(self, other):
+        if not isinstance(other, Iterable):
+            return NotImplemented
+
+        base = self._map
+        if isinstance(other, PSet):
+            if _shares_subtries(base._root, other._map._root):
+                _, removed, _ = base.diff(other._map)
+                return PSet(removed)
+
+            other = other._map
+
+        e = base.evolver()
+        if isinstance(other, (Set, PMap)) and len(other) > len(base):
+            for element in base:
+                if element in other:
+                    del e[element]
+        else:
+            for element in other:
+                if element in e:
+                    del e[element]
+
+        return PSet(e.persistent())
+
+    def __xor__(self, other):
+        if not isinstance(other, Iterable):
+            return NotImplemented
+
+        base = self._map
+        if isinstance(other, PSet):
+            base, other = _larger_first(base, other._map)
+            if _shares_subtries(base._root, other._root):
+                added, removed, _ = base.diff(other)
+                return PSet(added.update(removed))
+        elif not isinstance(other, Set):
+            other = set(other)
+
+        e = base.evolver()
+        for element in other:
+            if element in e:
+                del e[element]
+            else:
+                e[element] = True
+
+        return PSet(e.persistent())
 
     issubset = __le__
     issuperset = __ge__
@@ -199,13 +275,20 @@ class PSet(Generic[T_co]):
 Set.register(PSet)
 Hashable.register(PSet)
 
+
+def _larger_first(map1, map2):
+    if len(map1) >= len(map2):
+        return map1, map2
+
+    return map2, map1
+
 _EMPTY_PSET = PSet(pmap())
 
 
 def pset(iterable=(), pre_size=8):
     """
-    Creates a persistent set from iterable. Optionally takes a sizing parameter equivalent to that
-    used for :py:func:`pmap`.
+    Creates a persistent set from iterable. The optional pre_size argument has no effect, it is kept
+    for compatibility with :py:func:`pmap`.
 
     >>> s1 = pset([1, 2, 3, 2])
     >>> s1
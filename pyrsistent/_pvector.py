@@ -1,5 +1,6 @@
 from abc import abstractmethod, ABCMeta
 from collections.abc import Sequence, Hashable
+from itertools import chain
 from numbers import Integral
 import operator
 from typing import TypeVar, Generic
@@ -21,18 +22,11 @@ def compare_pvector(v, other, operator):
     return operator(v.tolist(), other.tolist() if isinstance(other, PVector) else other)
 
 
-def _index_or_slice(index, stop):
-    if stop is None:
-        return index
-
-    return slice(index, stop)
-
-
 class PythonPVector(object):
     """
     Support structure for PVector that implements structural sharing for vectors using a trie.
     """
-    __slots__ = ('_count', '_shift', '_root', '_tail', '_tail_offset', '__weakref__')
+    __slots__ = ('_count', '_shift', '_root', '_tail', '_tail_offset', '__weakref__', '_cached_hash', '_deep_frozen')
 
     def __new__(cls, count, shift, root, tail):
         self = super(PythonPVector, cls).__new__(cls)
@@ -50,10 +44,12 @@ class PythonPVector(object):
 
     def __getitem__(self, index):
         if isinstance(index, slice):
-            # There are more conditions than the below where it would be OK to
-            # return ourselves, implement those...
-            if index.start is None and index.stop is None and index.step is None:
-                return self
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                if start == 0:
+                    return self._prefix(stop)
+
+                return _EMPTY_PVECTOR._extend_range(self, start, stop)
 
             # This is a bit nasty realizing the whole structure as a list before
             # slicing it but it is the fastest way I've found to date, and it's easy :-)
@@ -74,15 +70,31 @@ class PythonPVector(object):
         return self.__repr__()
 
     def __iter__(self):
-        # This is kind of lazy and will produce some memory overhead but it is the fasted method
-        # by far of those tried since it uses the speed of the built in python list directly.
-        return iter(self.tolist())
+        if self._shift == SHIFT:
+            # This is kind of lazy and will produce some memory overhead but it is the fasted method
+            # by far of those tried for small vectors since it uses the speed of the built in python
+            # list directly.
+            return iter(self.tolist())
+
+        # Larger vectors are iterated one leaf at a time, without copying them. This also keeps
+        # iteration of vectors over memory mapped nodes from reading everything up front.
+        return chain(chain.from_iterable(_iter_leaves(self._root, self._shift)), self._tail)
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __eq__(self, other):
-        return self is other or (hasattr(other, '__len__') and self._count == len(other)) and compare_pvector(self, other, operator.eq)
+        if self is other:
+            return True
+
+        if not hasattr(other, '__len__') or self._count != len(other):
+            return False
+
+        if (isinstance(other, PythonPVector) and hasattr(self, '_cached_hash') and hasattr(other, '_cached_hash')
+                and self._cached_hash != other._cached_hash):
+            return False
+
+        return compare_pvector(self, other, operator.eq)
 
     def __gt__(self, other):
         return compare_pvector(self, other, operator.gt)
@@ -132,7 +144,10 @@ class PythonPVector(object):
 
     def __hash__(self):
         # Taking the easy way out again...
-        return hash(self._totuple())
+        if not hasattr(self, '_cached_hash'):
+            self._cached_hash = hash(self._totuple())
+
+        return self._cached_hash
 
     def transform(self, *transformations):
         return transform(self, transformations)
@@ -367,7 +382,13 @@ class PythonPVector(object):
     def extend(self, obj):
         # Mutates the new vector directly for efficiency but that's only an
         # implementation detail, once it is returned it should be considered immutable
-        l = obj.tolist() if isinstance(obj, PythonPVector) else list(obj)
+        if isinstance(obj, PythonPVector):
+            if not self._count and type(obj) is PythonPVector:
+                return obj
+
+            return self._extend_range(obj, 0, obj._count)
+
+        l = list(obj)
         if l:
             new_vector = self.append(l[0])
             new_vector._mutating_extend(l[1:])
@@ -398,21 +419,210 @@ class PythonPVector(object):
         ret.append(self._new_path(level - SHIFT, tail_node))
         return ret
 
+    def _prefix(self, n):
+        """
+        Returns a vector with the first n elements. All complete leaves up to n are shared
+        with this vector so this is log32(n).
+        """
+        if n >= self._count:
+            return self
+
+        if n <= 0:
+            return _EMPTY_PVECTOR
+
+        if n > self._tail_offset:
+            return PythonPVector(n, self._shift, self._root, self._tail[:n - self._tail_offset])
+
+        # The leaf holding the last element becomes the new tail
+        tail_offset = ((n - 1) >> SHIFT) << SHIFT  # >>>
+        tail = PythonPVector._node_for(self, n - 1)[:n - tail_offset]
+        if not tail_offset:
+            return PythonPVector(n, SHIFT, [], tail)
+
+        last = tail_offset - 1
+        root, shift = self._root, self._shift
+        while shift > SHIFT and not last >> shift:  # >>>
+            root = root[0]
+            shift -= SHIFT
+
+        return PythonPVector(n, shift, _trim_node(root, shift, last), tail)
+
+    def _extend_range(self, other, start, stop):
+        """
+        Returns a new vector with the elements from start to stop in other appended. Complete
+        leaves of other are shared as is if they line up with the leaves of the new vector,
+        otherwise the elements are copied.
+        """
+        # Fill up the tail first, after that the new elements start at a leaf boundary
+        tail = list(self._tail)
+        head = min(stop, start + (-len(tail) & BIT_MASK))
+        tail.extend(_elements_in_range(other, start, head))
+
+        full_stop = head + ((stop - head) & ~BIT_MASK)
+        if head & BIT_MASK:
+            elements = _elements_in_range(other, head, full_stop)
+            leaves = [elements[i:i + BRANCH_FACTOR] for i in range(0, len(elements), BRANCH_FACTOR)]
+        else:
+            leaves = [PythonPVector._node_for(other, i) for i in range(head, full_stop, BRANCH_FACTOR)]
+
+        if leaves and tail:
+            leaves.insert(0, tail)
+            tail = []
+
+        new_vector = PythonPVector(self._tail_offset, self._shift, self._root, [])
+        if len(leaves) * 16 < new_vector._count >> SHIFT:  # >>>
+            # Push the leaves one by one to share the nodes of the tree
+            for leaf in leaves:
+                new_vector._tail = leaf
+                new_vector._count += BRANCH_FACTOR
+                new_vector._mutating_insert_tail()
+        elif leaves:
+            # Cheaper to build the tree again from the leaves
+            new_vector._root, new_vector._shift = _build_tree(_leaves(self._root, self._shift) + leaves)
+            new_vector._count += len(leaves) * BRANCH_FACTOR
+
+        new_vector._tail = tail
+        new_vector._count += len(tail)
+        new_vector._mutating_extend(_elements_in_range(other, full_stop, stop))
+        return new_vector
+
     def index(self, value, *args, **kwargs):
         return self.tolist().index(value, *args, **kwargs)
 
     def count(self, value):
         return self.tolist().count(value)
 
+    def insert(self, index, val):
+        index = slice(index, None).indices(self._count)[0]
+        return self._prefix(index).append(val)._extend_range(self, index, self._count)
+
     def delete(self, index, stop=None):
-        l = self.tolist()
-        del l[_index_or_slice(index, stop)]
-        return _EMPTY_PVECTOR.extend(l)
+        if stop is None:
+            if not isinstance(index, Integral):
+                raise TypeError("'%s' object cannot be interpreted as an index" % type(index).__name__)
+
+            if index < 0:
+                index += self._count
+
+            if not 0 <= index < self._count:
+                raise IndexError("delete index out of range")
+
+            stop = index + 1
+        else:
+            index, stop, _ = slice(index, stop).indices(self._count)
+            if stop <= index:
+                return self
+
+        return self._prefix(index)._extend_range(self, stop, self._count)
 
     def remove(self, value):
-        l = self.tolist()
-        l.remove(value)
-        return _EMPTY_PVECTOR.extend(l)
+        return self.delete(self.index(value))
+
+    def diff(self, other):
+        if not isinstance(other, PythonPVector):
+            other = _EMPTY_PVECTOR.extend(other)
+
+        ranges = []
+        tree_limit = min(self._tail_offset, other._tail_offset)
+        if tree_limit > 0:
+            root1, shift1, root2, shift2 = self._root, self._shift, other._root, other._shift
+            while shift1 > shift2:
+                root1, shift1 = root1[0], shift1 - SHIFT
+            while shift2 > shift1:
+                root2, shift2 = root2[0], shift2 - SHIFT
+
+            _diff_nodes(root1, root2, shift1, 0, tree_limit, ranges)
+
+        common = min(self._count, other._count)
+        for i in range(tree_limit, common):
+            item1, item2 = self[i], other[i]
+            if not (item1 is item2 or item1 == item2):
+                _add_to_ranges(ranges, i)
+
+        splices = [(start, stop, other[start:stop]) for start, stop in ranges]
+        if self._count != other._count:
+            splices.append((common, self._count, other[common:]))
+
+        return _EMPTY_PVECTOR.extend(splices)
+
+
+def _add_to_ranges(ranges, index):
+    if ranges and ranges[-1][1] == index:
+        ranges[-1][1] += 1
+    else:
+        ranges.append([index, index + 1])
+
+
+def _diff_nodes(node1, node2, level, offset, limit, ranges):
+    """
+    Add the indexes below limit where the elements of the two nodes differ to ranges. Sub nodes
+    shared between the nodes are skipped.
+    """
+    if node1 is node2:
+        return
+
+    if level:
+        for i in range(min(BRANCH_FACTOR, ((limit - offset - 1) >> level) + 1)):
+            _diff_nodes(node1[i], node2[i], level - SHIFT, offset + (i << level), limit, ranges)
+    else:
+        for i in range(min(BRANCH_FACTOR, limit - offset)):
+            item1, item2 = node1[i], node2[i]
+            if not (item1 is item2 or item1 == item2):
+                _add_to_ranges(ranges, offset + i)
+
+
+def _iter_leaves(node, level):
+    if level == SHIFT:
+        return node
+
+    return chain.from_iterable(_iter_leaves(child, level - SHIFT) for child in node)
+
+
+def _elements_in_range(vector, start, stop):
+    first = start & ~BIT_MASK
+    elements = []
+    for i in range(first, stop, BRANCH_FACTOR):
+        elements.extend(PythonPVector._node_for(vector, i))
+
+    return elements[start - first:stop - first]
+
+
+def _leaves(node, level):
+    if level == SHIFT:
+        return list(node)
+
+    return [leaf for child in node for leaf in _leaves(child, level - SHIFT)]
+
+
+def _build_tree(leaves):
+    """
+    Returns the root and shift of a tree holding leaves, which must all be complete.
+    """
+    nodes, shift = leaves, SHIFT
+    while len(nodes) > BRANCH_FACTOR:
+        nodes = [nodes[i:i + BRANCH_FACTOR] for i in range(0, len(nodes), BRANCH_FACTOR)]
+        shift += SHIFT
+
+    return list(nodes), shift
+
+
+def _trim_node(node, level, last):
+    """
+    Returns node with all elements beyond the index last cut away, sub nodes that are
+    not affected are shared.
+    """
+    sub_index = (last >> level) & BIT_MASK  # >>>
+    child = node[sub_index]
+    if level > SHIFT:
+        child = _trim_node(child, level - SHIFT, last)
+
+    if child is node[sub_index] and len(node) == sub_index + 1:
+        return node
+
+    result = node[:sub_index]
+    result.append(child)
+    return result
+
 
 class PVector(Generic[T_co],metaclass=ABCMeta):
     """
@@ -436,7 +646,11 @@ class PVector(Generic[T_co],metaclass=ABCMeta):
 
     The PVector implements the Sequence protocol and is Hashable.
 
-    Inserts are amortized O(1). Random access is log32(n) where n is the size of the vector.
+    Inserts are amortized O(1). Random access is log32(n) where n is the size of the vector. Taking a slice
+    from the start of the vector is also log32(n). Other slices, concatenation, insert and delete are O(k)
+    where k is the number of elements that end up after the affected position. Complete leaves of 32 elements
+    are shared with the source when they line up with the leaves of the new vector, otherwise the elements
+    are copied.
 
     The following are examples of some common operations on persistent vectors:
 
@@ -651,6 +865,39 @@ class PVector(Generic[T_co],metaclass=ABCMeta):
         True
         """
 
+    @abstractmethod
+    def insert(self, index, val):
+        """
+        Return a new vector with val inserted before index. Follows the semantics of list.insert
+        for indexes beyond the bounds of the vector.
+
+        >>> v1 = v(1, 2, 3)
+        >>> v1.insert(1, 4)
+        pvector([1, 4, 2, 3])
+        >>> v1.insert(-1, 4)
+        pvector([1, 2, 4, 3])
+        >>> v1.insert(10, 4)
+        pvector([1, 2, 3, 4])
+        """
+
+    @abstractmethod
+    def diff(self, other):
+        """
+        Return the differences between this vector and other as a vector of splices (start, stop, values).
+        Replacing the elements from start to stop in this vector with values, for all splices, gives other.
+        Splices over the indexes found in both vectors replace as many elements as they insert, only the
+        last splice changes the length of the vector.
+
+        Parts of the vectors that are shared are skipped, diffing two versions of a vector that differ by
+        k updates is roughly O(k log n).
+
+        >>> v1 = v(1, 2, 3, 4, 5)
+        >>> v1.diff(v1.set(1, 7).set(2, 8).append(6))
+        pvector([(1, 3, pvector([7, 8])), (5, 5, pvector([6]))])
+        >>> v1.diff(v1.set(4, 0).delete(3, 5))
+        pvector([(3, 5, pvector([]))])
+        """
+
     @abstractmethod
     def delete(self, index, stop=None):
         """
@@ -0,0 +1,109 @@
+"""JSON encoding and decoding of pyrsistent structures.
+
+The functions in this module mirror those of the standard library json module but work
+with persistent structures directly. Encoding does not thaw the structure first and
+decoding builds pmaps and pvectors while parsing rather than freezing the parsed result.
+
+    >>> from pyrsistent import json, m, v
+    >>> json.dumps(m(a=v(1, 2)))
+    '{"a": [1, 2]}'
+    >>> json.loads('{"a": [1, {"b": null}]}')
+    pmap({'a': pvector([1, pmap({'b': None})])})
+"""
+import json as _json
+from pyrsistent._helpers import _LazyFrozen
+from pyrsistent._pdeque import PDeque
+from pyrsistent._plist import PList
+from pyrsistent._pmap import PMap, pmap
+from pyrsistent._pset import PSet
+from pyrsistent._pvector import PVector, pvector
+
+__all__ = ('dumps', 'dump', 'loads', 'load')
+
+
+def _default(fallback, o):
+    # Called by the encoder for all objects that it does not know how to encode. Only a
+    # shallow copy of each structure is made, it is dropped as soon as it has been encoded.
+    if isinstance(o, PMap):
+        return dict(o.items())
+    if isinstance(o, PVector):
+        return o.tolist()
+    if isinstance(o, (PSet, PList, PDeque)):
+        return list(o)
+    if isinstance(o, _LazyFrozen):
+        # The plain structure that the view was created from
+        return o._source
+    if fallback is not None:
+        return fallback(o)
+
+    raise TypeError('Object of type {0} is not JSON serializable'.format(type(o).__name__))
+
+
+def dumps(obj, default=None, **kwargs):
+    """
+    Serialize obj, which may contain PMaps, PVectors, PSets, PLists and PDeques, to a JSON
+    formatted string. All keyword arguments of json.dumps are supported, default is called
+    for objects that are not persistent structures and can not be encoded otherwise.
+
+    >>> from pyrsistent import m, s
+    >>> dumps(m(a=s(1)), sort_keys=True)
+    '{"a": [1]}'
+    """
+    return _json.dumps(obj, default=lambda o: _default(default, o), **kwargs)
+
+
+def dump(obj, fp, default=None, **kwargs):
+    """
+    Serialize obj as a JSON formatted stream to fp. The output is written in chunks
+    without building the whole string in memory. See dumps() for details.
+    """
+    _json.dump(obj, fp, default=lambda o: _default(default, o), **kwargs)
+
+
+def _pvector_from_array(items):
+    # Lists are only found directly inside other lists since objects are converted as soon
+    # as they have been parsed, see _pmap_from_object.
+    for i, item in enumerate(items):
+        if type(item) is list:
+            items[i] = _pvector_from_array(item)
+
+    result = pvector(items)
+    result._deep_frozen = True
+    return result
+
+
+def _pmap_from_object(pairs):
+    for i, (key, value) in enumerate(pairs):
+        if type(value) is list:
+            pairs[i] = (key, _pvector_from_array(value))
+
+    result = pmap(pairs)
+    result._deep_frozen = True
+    return result
+
+
+def loads(s, **kwargs):
+    """
+    Deserialize s, a str, bytes or bytearray containing a JSON document, into persistent
+    structures. Objects are turned into PMaps and arrays into PVectors. All keyword arguments
+    of json.loads except object_hook and object_pairs_hook are supported.
+
+    The parser has no hook for arrays, they are converted to PVectors as soon as the object
+    containing them has been parsed. Each object is built directly from the key value pairs
+    produced by the parser.
+
+    >>> loads('[1, [2, {"a": 3}]]')
+    pvector([1, pvector([2, pmap({'a': 3})])])
+    """
+    result = _json.loads(s, object_pairs_hook=_pmap_from_object, **kwargs)
+    if type(result) is list:
+        return _pvector_from_array(result)
+
+    return result
+
+
+def load(fp, **kwargs):
+    """
+    Deserialize the JSON document read from fp into persistent structures. See loads() for details.
+    """
+    return loads(fp.read(), **kwargs)
@@ -0,0 +1,10 @@
+from typing import IO
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None, **kwargs: Any) -> str: ...
+def dump(obj: Any, fp: IO[str], default: Optional[Callable[[Any], Any]] = None, **kwargs: Any) -> None: ...
+def loads(s: Union[str, bytes, bytearray], **kwargs: Any) -> Any: ...
+def load(fp: IO[Any], **kwargs: Any) -> Any: ...
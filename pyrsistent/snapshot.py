@@ -0,0 +1,512 @@
+"""Binary snapshots of pyrsistent structures that preserve structural sharing.
+
+Regular pickling turns every structure into a plain dict or list. Pickling many versions
+of a structure therefore writes every version in full and unpickling rebuilds each of them
+from scratch. A snapshot instead writes the internal nodes of the structures, each node only
+once, so substructure shared between versions is stored once and is shared again when the
+snapshot is loaded.
+
+    >>> from pyrsistent import snapshot, m
+    >>> m1 = m(a=1, b=2)
+    >>> versions = [m1, m1.set('c', 3)]
+    >>> snapshot.loads(snapshot.dumps(versions)) == versions
+    True
+
+Snapshots are pickles underneath. All objects that can be pickled can be part of a snapshot
+and, as with pickle, snapshots must only be loaded from trusted sources.
+
+Vectors of fixed width values can also be written in a raw format with dump_vector() and be
+opened with map_vector() without reading them into memory. The file is memory mapped and
+shared between all processes that open it.
+"""
+import io
+import mmap
+import pickle
+import re
+import struct
+import sys
+from array import array
+from functools import partial
+from itertools import chain, islice
+from pyrsistent import _fingertree
+from pyrsistent._checked_types import CheckedPMap, CheckedPSet, CheckedPVector
+from pyrsistent._field_common import (
+    _pmap_field_types, _restore_pmap_field_pickle, _restore_seq_field_pickle, _seq_field_types
+)
+from pyrsistent._pbag import PBag
+from pyrsistent._pdeque import PDeque, _IndexedPDeque
+from pyrsistent._plist import PList, _CountedPList, _drop
+from pyrsistent._pmap import PMap, pmap, _iter_entries, _BITS, _HEADER_SIZE
+from pyrsistent._pset import PSet
+from pyrsistent._pvector import PythonPVector, pvector, SHIFT, BRANCH_FACTOR
+
+__all__ = ('dumps', 'dump', 'loads', 'load', 'dump_vector', 'map_vector')
+
+_HEADER = b'PYRSNAP\x01'
+
+_PVECTOR_TYPE = type(pvector())
+if _PVECTOR_TYPE is PythonPVector:
+    _export_tree = _import_tree = None
+else:
+    from pvectorc import export_tree as _export_tree, import_tree as _import_tree
+
+
+def _ignore():
+    return None
+
+
+def _empty_tree():
+    return _fingertree.EMPTY_TREE
+
+
+def _plist_drop(head, count):
+    return _drop(head, count)
+
+
+def _restore_plist(rest, elements, _):
+    return rest.mcons(reversed(elements))
+
+
+def _valid_trie(node, shift, prefix, checked):
+    # The hashes of str and bytes, and of objects hashed by identity, are not the same in
+    # all processes. The slot of every key is checked against its current hash before the
+    # trie is used. Nodes shared between maps are only checked once.
+    entry = checked.get(id(node))
+    if entry is not None:
+        return entry[1] == shift and entry[2] == prefix
+
+    if type(node) is tuple:
+        h = node[0]
+        if h & ((1 << shift) - 1) != prefix or any(hash(k) != h for k in node[1::2]):
+            return False
+    else:
+        mask = (1 << (shift + _BITS)) - 1
+        datamap, nodemap = node[0], node[1]
+        i, j = _HEADER_SIZE, -1
+        for slot in range(1 << _BITS):
+            bit = 1 << slot
+            if datamap & bit:
+                if hash(node[i]) & mask != prefix | (slot << shift):
+                    return False
+                i += 2
+            elif nodemap & bit:
+                if not _valid_trie(node[j], shift + _BITS, prefix | (slot << shift), checked):
+                    return False
+                j -= 1
+
+    checked[id(node)] = (node, shift, prefix)
+    return True
+
+
+def _restore_pmap(checked, size, root):
+    if _valid_trie(root, 0, 0, checked):
+        return PMap(size, root)
+
+    return pmap(_iter_entries(root))
+
+
+def _move_last_leaf(shift, root):
+    # The Python implementation leaves the tail empty when the last leaf is full while the
+    # C implementation always keeps the last leaf in the tail
+    path = []
+    for _ in range(shift // SHIFT):
+        path.append(root)
+        root = root[-1]
+
+    tail = root
+    last = None
+    for node in reversed(path):
+        node = node[:-1] if last is None else node[:-1] + [last]
+        last = node or None
+
+    root = last or []
+    while shift > SHIFT and len(root) == 1:
+        root = root[0]
+        shift -= SHIFT
+
+    return shift, root, tail
+
+
+def _restore_pvector(nodes, count, shift, root, tail):
+    if _import_tree is None:
+        return PythonPVector(count, shift, root, tail)
+
+    if count and not tail:
+        shift, root, tail = _move_last_leaf(shift, root)
+
+    return _import_tree(count, shift, root, tail, nodes)
+
+
+def _checked_class_ref(cls):
+    # The classes generated for pmap_field, pvector_field and pset_field can not be pickled
+    # by name, they are looked up through the same functions as when pickled regularly
+    if cls.__reduce__ in (CheckedPMap.__reduce__, CheckedPVector.__reduce__, CheckedPSet.__reduce__):
+        return cls
+
+    if issubclass(cls, CheckedPMap):
+        if _pmap_field_types.get((cls.__key_type__, cls.__value_type__)) is cls:
+            return _restore_pmap_field_pickle, (cls.__key_type__, cls.__value_type__), {}
+    elif _seq_field_types.get((cls.__bases__[0], cls.__type__)) is cls:
+        return _restore_seq_field_pickle, (cls.__bases__[0], cls.__type__), []
+
+    return None
+
+
+def _checked_class(ref):
+    if isinstance(ref, type):
+        return ref
+
+    restore, args, empty = ref
+    return type(restore(*args, empty))
+
+
+def _restore_checked_pmap(ref, m):
+    return PMap.__new__(_checked_class(ref), m._size, m._root)
+
+
+def _restore_checked_pset(ref, m):
+    return PSet.__new__(_checked_class(ref), m)
+
+
+def _restore_checked_pvector(ref, count, shift, root, tail):
+    return PythonPVector.__new__(_checked_class(ref), count, shift, root, tail)
+
+
+class _MappedValues(object):
+    """
+    The values of a vector in a memory mapped file, see map_vector().
+    """
+    __slots__ = ('_view', '_width')
+
+    def __init__(self, view, width):
+        # Numeric values are read through a typed view, width is None for those
+        self._view = view
+        self._width = width
+
+    def get(self, index):
+        if self._width is None:
+            return self._view[index]
+
+        return self._view[index * self._width:(index + 1) * self._width].tobytes()
+
+    def get_range(self, start, stop):
+        if self._width is None:
+            return self._view[start:stop].tolist()
+
+        return [self.get(i) for i in range(start, stop)]
+
+
+class _MappedNode(object):
+    """
+    Node of a vector over a memory mapped file. Nodes are laid out like the list nodes of
+    PythonPVector and are created on demand, only the values that are looked up are read
+    from the file. The vector operations copy the nodes on the path to an updated element
+    into lists as usual, all other nodes keep reading from the file.
+    """
+    __slots__ = ('_values', '_level', '_start', '_size')
+
+    def __init__(self, values, level, start, size):
+        self._values = values
+        self._level = level
+        self._start = start
+        self._size = size
+
+    def __len__(self):
+        return ((self._size - 1) >> self._level) + 1 if self._level else self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        level = self._level
+        offset = index << level
+        if not 0 <= offset < self._size:
+            raise IndexError("Node index out of range: %s" % (index,))
+
+        if not level:
+            return self._values.get(self._start + index)
+
+        return _MappedNode(self._values, level - SHIFT, self._start + offset, min(1 << level, self._size - offset))
+
+    def __iter__(self):
+        if not self._level:
+            return iter(self._values.get_range(self._start, self._start + self._size))
+
+        values, level, step, stop = self._values, self._level - SHIFT, 1 << self._level, self._start + self._size
+        return (_MappedNode(values, level, start, min(step, stop - start))
+                for start in range(self._start, stop, step))
+
+
+class _MappedPVector(PythonPVector):
+    """
+    Vector returned by map_vector(). Lookups and iteration read the values in the file
+    directly instead of going through the nodes.
+    """
+    __slots__ = ('_values',)
+
+    def __new__(cls, count, shift, root, tail, values):
+        self = super(_MappedPVector, cls).__new__(cls, count, shift, root, tail)
+        self._values = values
+        return self
+
+    def __getitem__(self, index):
+        if type(index) is int:
+            if index < 0:
+                index += self._count
+
+            if 0 <= index < self._tail_offset:
+                return self._values.get(index)
+
+        return super(_MappedPVector, self).__getitem__(index)
+
+    def __iter__(self):
+        tree_size = self._tail_offset
+        chunks = (self._values.get_range(start, min(start + _READ_CHUNK_SIZE, tree_size))
+                  for start in range(0, tree_size, _READ_CHUNK_SIZE))
+        return chain(chain.from_iterable(chunks), self._tail)
+
+    def tolist(self):
+        return self._values.get_range(0, self._tail_offset) + self._tail
+
+
+class _PListCells(object):
+    """
+    Written after the elements of a list. From then on the cells of the list can be
+    referred to as a number of elements dropped from the head of the list.
+    """
+    __slots__ = ('head', 'cells')
+
+    def __init__(self, head, cells):
+        self.head = head
+        self.cells = cells
+
+
+class _SnapshotPickler(pickle.Pickler):
+    def __init__(self, file):
+        super(_SnapshotPickler, self).__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._vector_nodes = {}
+        self._plist_cells = {}
+
+    def reducer_override(self, obj):
+        # Nodes built from lists and tuples are shared through the memo of the pickler,
+        # only the structures wrapping them need to be reduced
+        reducer = _REDUCERS.get(type(obj))
+        if reducer is not None:
+            return reducer(self, obj)
+
+        if isinstance(obj, (CheckedPMap, CheckedPSet, CheckedPVector)):
+            ref = _checked_class_ref(type(obj))
+            if ref is not None:
+                if isinstance(obj, CheckedPMap):
+                    return _restore_checked_pmap, (ref, PMap(obj._size, obj._root))
+                if isinstance(obj, CheckedPSet):
+                    return _restore_checked_pset, (ref, obj._map)
+                return _restore_checked_pvector, (ref, obj._count, obj._shift, obj._root, obj._tail)
+
+        return NotImplemented
+
+    def _reduce_c_pvector(self, vector):
+        return _restore_pvector, _export_tree(vector, self._vector_nodes)
+
+    def _reduce_plist(self, head):
+        cells = self._plist_cells
+        entry = cells.get(id(head))
+        if entry is not None:
+            _, first_head, offset = entry
+            return _plist_drop, (first_head, offset)
+
+        # Only the cells up to the first one that has already been written are new
+        segment = []
+        node = head
+        while type(node) is type(head) and id(node) not in cells:
+            segment.append(node)
+            node = node.rest
+
+        return _restore_plist, (node, tuple(cell.first for cell in segment), _PListCells(head, segment))
+
+    def _register_plist_cells(self, marker):
+        for offset, cell in enumerate(marker.cells):
+            self._plist_cells[id(cell)] = (cell, marker.head, offset)
+
+        return _ignore, ()
+
+
+_REDUCERS = {
+    PMap: lambda pickler, m: (_restore_pmap, (m._size, m._root)),
+    PSet: lambda pickler, s: (PSet, (s._map,)),
+    PBag: lambda pickler, b: (PBag, (b._counts, b._size)),
+    PythonPVector: lambda pickler, v: (_restore_pvector, (v._count, v._shift, v._root, v._tail)),
+    _MappedPVector: lambda pickler, v: (_restore_pvector, (v._count, v._shift, v._root, v._tail)),
+    PList: _SnapshotPickler._reduce_plist,
+    _CountedPList: _SnapshotPickler._reduce_plist,
+    _PListCells: _SnapshotPickler._register_plist_cells,
+    PDeque: lambda pickler, d: (PDeque, (d._left_list, d._right_list, d._length, d._maxlen)),
+    _IndexedPDeque: lambda pickler, d: (_IndexedPDeque, (d._tree, d._reversed, d._maxlen)),
+    _fingertree._Empty: lambda pickler, tree: (_empty_tree, ()),
+    _fingertree._Single: lambda pickler, tree: (_fingertree._Single, (tree.size, tree.item)),
+    _fingertree._Deep: lambda pickler, tree: (_fingertree._Deep, (tree.size, tree.prefix, tree.middle, tree.suffix)),
+    _fingertree._Node: lambda pickler, node: (_fingertree._Node, (node.size, node.items)),
+    _MappedNode: lambda pickler, node: (list, (list(node),)),
+}
+
+if _export_tree is not None:
+    _REDUCERS[_PVECTOR_TYPE] = _SnapshotPickler._reduce_c_pvector
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file):
+        super(_SnapshotUnpickler, self).__init__(file)
+
+        # Restored nodes are tracked for the whole snapshot
+        self._restore_functions = {
+            '_restore_pmap': partial(_restore_pmap, {}),
+            '_restore_pvector': partial(_restore_pvector, {}),
+        }
+
+    def find_class(self, module, name):
+        if module == __name__ and name in self._restore_functions:
+            return self._restore_functions[name]
+
+        return super(_SnapshotUnpickler, self).find_class(module, name)
+
+
+def dump(obj, file):
+    """
+    Write a snapshot of obj to file, which must be opened in binary mode. Nodes shared
+    between structures anywhere in obj are written once.
+    """
+    file.write(_HEADER)
+    _SnapshotPickler(file).dump(obj)
+
+
+def dumps(obj):
+    """
+    Return a snapshot of obj as bytes. Save many versions of a structure by taking a
+    snapshot of a collection holding all of them.
+
+    >>> from pyrsistent import v
+    >>> v1 = v(1, 2, 3)
+    >>> len(dumps([v1, v1.append(4)])) < len(dumps(v1)) + len(dumps(v1.append(4)))
+    True
+    """
+    buffer = io.BytesIO()
+    dump(obj, buffer)
+    return buffer.getvalue()
+
+
+def load(file):
+    """
+    Read a snapshot written by dump() from file. Structures that shared nodes when the
+    snapshot was taken share them again.
+    """
+    if file.read(len(_HEADER)) != _HEADER:
+        raise ValueError('Not a pyrsistent snapshot')
+
+    return _SnapshotUnpickler(file).load()
+
+
+def loads(data):
+    """
+    Restore the objects in a snapshot created by dumps().
+
+    >>> from pyrsistent import s
+    >>> loads(dumps(s(1, 2)))
+    pset([1, 2])
+    """
+    return load(io.BytesIO(data))
+
+
+_VECTOR_HEADER = struct.Struct('<8s8sQQ')
+_VECTOR_MAGIC = b'PYRSVEC\x01'
+_NUMERIC_FORMATS = 'bBhHiIlLqQfd'
+_BYTES_FORMAT = re.compile('[1-9][0-9]{0,5}s$')
+_BYTE_ORDER = '<' if sys.byteorder == 'little' else '>'
+_WRITE_CHUNK_SIZE = 1 << 16
+_READ_CHUNK_SIZE = 1 << 10
+
+
+def _format_width(fmt):
+    if len(fmt) == 1 and fmt in _NUMERIC_FORMATS:
+        return array(fmt).itemsize
+
+    if _BYTES_FORMAT.match(fmt):
+        return int(fmt[:-1])
+
+    raise ValueError('Unsupported value format {0!r}'.format(fmt))
+
+
+def dump_vector(vector, file, fmt):
+    """
+    Write a vector of fixed width values to file, which must be opened in binary mode, so that
+    it can be opened with map_vector(). fmt is the struct format of the values, one of the
+    numeric formats 'bBhHiIlLqQfd', or 'Ns' for bytes values of exactly N bytes. Values are
+    stored with the native byte order and sizes.
+
+    >>> from pyrsistent import v
+    >>> f = io.BytesIO()
+    >>> dump_vector(v(1, 2, 3), f, 'q')
+    >>> len(f.getvalue())
+    56
+    """
+    width = _format_width(fmt)
+    file.write(_VECTOR_HEADER.pack(_VECTOR_MAGIC, (_BYTE_ORDER + fmt).encode('ascii'), len(vector), width))
+
+    values = iter(vector)
+    while True:
+        chunk = list(islice(values, _WRITE_CHUNK_SIZE))
+        if not chunk:
+            break
+
+        if fmt in _NUMERIC_FORMATS:
+            file.write(array(fmt, chunk).tobytes())
+        else:
+            for value in chunk:
+                if type(value) is not bytes or len(value) != width:
+                    raise ValueError('Expected bytes of length {0}, got {1!r}'.format(width, value))
+
+            file.write(b''.join(chunk))
+
+
+def map_vector(file):
+    """
+    Return a read only view of a vector written by dump_vector() as a PVector. file must be
+    opened for reading in binary mode, it may be closed once the vector has been created.
+
+    The values are read from the memory mapped file when they are accessed. Updating the
+    vector creates a new vector in memory that keeps reading the elements that were not
+    updated from the file. The file must not be modified while any vector over it is in use.
+    """
+    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < _VECTOR_HEADER.size:
+        raise ValueError('Not a pyrsistent vector file')
+
+    magic, fmt, count, width = _VECTOR_HEADER.unpack_from(mapped)
+    fmt = fmt.rstrip(b'\0').decode('ascii', 'replace')
+    if magic != _VECTOR_MAGIC:
+        raise ValueError('Not a pyrsistent vector file')
+
+    if fmt[:1] != _BYTE_ORDER:
+        raise ValueError('Vector file written with a different byte order')
+
+    fmt = fmt[1:]
+    if _format_width(fmt) != width:
+        raise ValueError('Vector file written with a different size of {0!r} values'.format(fmt))
+
+    end = _VECTOR_HEADER.size + count * width
+    if len(mapped) < end:
+        raise ValueError('Truncated vector file')
+
+    view = memoryview(mapped)[_VECTOR_HEADER.size:end]
+    values = _MappedValues(view.cast(fmt), None) if fmt in _NUMERIC_FORMATS else _MappedValues(view, width)
+
+    # Same layout as the vectors built by appending, the last leaf is kept in the tail
+    tree_size = ((count - 1) >> SHIFT) << SHIFT if count > BRANCH_FACTOR else 0
+    shift = SHIFT
+    while tree_size > (1 << (shift + SHIFT)):
+        shift += SHIFT
+
+    root = _MappedNode(values, shift, 0, tree_size) if tree_size else []
+    return _MappedPVector(count, shift, root, values.get_range(tree_size, count), values)
@@ -0,0 +1,10 @@
+from typing import IO
+from typing import Any
+from pyrsistent.typing import PVector
+
+def dumps(obj: Any) -> bytes: ...
+def dump(obj: Any, file: IO[bytes]) -> None: ...
+def loads(data: bytes) -> Any: ...
+def load(file: IO[bytes]) -> Any: ...
+def dump_vector(vector: PVector[Any], file: IO[bytes], fmt: str) -> None: ...
+def map_vector(file: IO[bytes]) -> PVector[Any]: ...
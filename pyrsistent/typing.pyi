@@ -35,6 +35,7 @@ class PMap(Mapping[KT, VT], Hashable):
     def __iter__(self) -> Iterator[KT]: ...
     def __len__(self) -> int: ...
     def copy(self) -> PMap[KT, VT]: ...
+    def diff(self, other: Mapping[KT, VT]) -> Tuple[PMap[KT, VT], PMap[KT, VT], PMap[KT, Tuple[VT, VT]]]: ...
     def discard(self, key: KT) -> PMap[KT, VT]: ...
     def evolver(self) -> PMapEvolver[KT, VT]: ...
     def iteritems(self) -> Iterable[Tuple[KT, VT]]: ...
@@ -69,8 +70,10 @@ class PVector(Sequence[T], Hashable):
     def __mul__(self, other: PVector[T]) -> PVector[T]: ...
     def append(self, val: T) -> PVector[T]: ...
     def delete(self, index: int, stop: Optional[int] = None) -> PVector[T]: ...
+    def diff(self, other: Iterable[T]) -> PVector[Tuple[int, int, PVector[T]]]: ...
     def evolver(self) -> PVectorEvolver[T]: ...
     def extend(self, obj: Iterable[T]) -> PVector[T]: ...
+    def insert(self, index: int, val: T) -> PVector[T]: ...
     def tolist(self) -> List[T]: ...
     def mset(self, *args: Iterable[Union[T, int]]) -> PVector[T]: ...
     def remove(self, value: T) -> PVector[T]: ...
@@ -136,6 +139,7 @@ class PBag(Generic[T], Sized, Hashable):
     def count(self, elem: T) -> int: ...
     def remove(self, elem: T) -> PBag[T]: ...
     def update(self, iterable: Iterable[T]) -> PBag[T]: ...
+    def update_counts(self, counts: Mapping[T, int]) -> PBag[T]: ...
 
 
 class PDeque(Sequence[T], Hashable):
@@ -16,7 +16,9 @@ else:
 
 extensions = []
 if platform.python_implementation() == 'CPython' and os.getenv("PYRSISTENT_SKIP_EXTENSION") is None:
-    extensions = [Extension('pvectorc', sources=['pvectorcmodule.c'])]
+    extensions = [Extension('pvectorc', sources=['pvectorcmodule.c']),
+                  Extension('pmapc', sources=['pmapcmodule.c']),
+                  Extension('plistc', sources=['plistcmodule.c'])]
 
 
 class custom_build_ext(build_ext):
@@ -76,6 +78,6 @@ setup(
     ext_modules=extensions,
     cmdclass={'build_ext': custom_build_ext},
     packages=['pyrsistent'],
-    package_data={'pyrsistent': ['py.typed', '__init__.pyi', 'typing.pyi']},
+    package_data={'pyrsistent': ['py.typed', '__init__.pyi', 'typing.pyi', 'json.pyi', 'snapshot.pyi']},
     python_requires='>=3.10',
 )
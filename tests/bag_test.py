@@ -114,6 +114,37 @@ def test_and():
     assert b(1, 2, 2, 3, 3, 3) & b(2, 3, 3, 4) == b(2, 3, 3)
 
 
+def test_length_is_maintained_by_all_operations():
+    import operator
+    import random
+    rnd = random.Random(3)
+    bags = [pbag(rnd.choice('abcdef') for _ in range(rnd.randrange(1, 20))) for _ in range(10)]
+    for bag1 in bags:
+        for bag2 in bags:
+            for op in (operator.add, operator.sub, operator.or_, operator.and_):
+                result = op(bag1, bag2)
+                assert len(result) == len(list(result))
+
+        element = rnd.choice('abcdef')
+        for result in (bag1.add(element), bag1.update(['a', 'b', 'a']), bag1.remove(next(iter(bag1)))):
+            assert len(result) == len(list(result))
+
+
+def test_hash_is_maintained_in_derived_bags():
+    bag = pbag(range(1000))
+    hash(bag)
+
+    for derived in (bag.add(1), bag.remove(1), bag.update([1, 2000]), bag + b(1), bag - b(1), bag | b(1, 1)):
+        assert hash(derived) == hash(pbag(list(derived)))
+        assert hasattr(derived._counts, '_entries_hash')
+
+
+def test_pickling_keeps_length():
+    import pickle
+    bag = b(1, 1, 2)
+    assert len(pickle.loads(pickle.dumps(bag, -1))) == 3
+
+
 def test_pbag_is_unorderable():
     with pytest.raises(TypeError):
         _ = b(1) < b(2)  # type: ignore
@@ -142,6 +173,38 @@ def test_update_no_elements():
     assert b.update([]) is b
 
 
+def test_update_counts():
+    assert pbag([1, 2]).update_counts({2: 2, 3: 1}) == pbag([1, 2, 2, 2, 3])
+    assert len(b().update_counts({'a': 3, 'b': 0})) == 3
+
+
+def test_update_counts_no_elements():
+    bag = pbag([1, 2])
+    assert bag.update_counts({}) is bag
+    assert bag.update_counts({3: 0}) is bag
+
+
+def test_update_counts_rejects_negative_counts():
+    with pytest.raises(ValueError):
+        b(1).update_counts({1: -1})
+
+
+def test_operations_match_counter():
+    from collections import Counter
+    import random
+    rnd = random.Random(5)
+    elements = [[rnd.randrange(50) for _ in range(rnd.randrange(200))] for _ in range(6)]
+    for elements1 in elements:
+        for elements2 in elements:
+            bag1, bag2 = pbag(elements1), pbag(elements2)
+            counter1, counter2 = Counter(elements1), Counter(elements2)
+            assert bag1.update(elements2) == pbag((counter1 + counter2).elements())
+            assert bag1 + bag2 == pbag((counter1 + counter2).elements())
+            assert bag1 - bag2 == pbag((counter1 - counter2).elements())
+            assert bag1 | bag2 == pbag((counter1 | counter2).elements())
+            assert bag1 & bag2 == pbag((counter1 & counter2).elements())
+
+
 def test_iterable():
     """
     PBags can be created from iterables even though they can't be len() hinted.
@@ -2,6 +2,7 @@ import datetime
 import pickle
 import pytest
 from pyrsistent import CheckedPVector, InvariantException, optional, CheckedValueTypeError, PVector
+from pyrsistent._pvector import python_pvector
 
 
 class Naturals(CheckedPVector):
@@ -36,6 +37,28 @@ def test_set():
     assert list(x2) == [1, 3]
     assert isinstance(x2, Naturals)
 
+def test_insert():
+    x = Naturals([1, 2])
+    x2 = x.insert(1, 3)
+
+    assert list(x2) == [1, 3, 2]
+    assert isinstance(x2, Naturals)
+
+    with pytest.raises(TypeError):
+        x.insert(1, 2.0)
+
+    with pytest.raises(InvariantException):
+        x.insert(1, -1)
+
+
+def test_extending_empty_python_pvector_with_checked_vector_gives_plain_vector():
+    x = Naturals([1])
+    empty = python_pvector()
+
+    for result in (python_pvector(x), empty + x, empty.extend(x)):
+        assert type(result) is type(empty)
+        assert list(result.append('a')) == [1, 'a']
+
 
 def test_invalid_type():
     try:
@@ -369,6 +369,36 @@ def test_supports_weakref_with_multi_level_inheritance():
     weakref.ref(PPoint(x=1, y=2))
 
 
+def test_hash_is_cached():
+    class HashCounting(object):
+        count = 0
+
+        def __hash__(self):
+            HashCounting.count += 1
+            return 1
+
+    class MyClass(PClass):
+        a = field()
+
+    c = MyClass(a=HashCounting())
+    assert hash(c) == hash(c)
+    assert HashCounting.count == 1
+    assert hash(c.set(a=HashCounting())) == hash(c)
+
+
+def test_sub_class_only_adds_slots_for_new_fields():
+    import struct
+    import sys
+
+    class PPoint(Point):
+        x = field(type=int)
+        a = field()
+
+    assert PPoint.__slots__ == ('a',)
+    assert not hasattr(PPoint(x=1), '__dict__')
+    assert sys.getsizeof(PPoint(x=1)) == sys.getsizeof(Point(x=1)) + struct.calcsize('P')
+
+
 def test_supports_lazy_initial_value_for_field():
     class MyClass(PClass):
         a = field(int, initial=lambda: 2)
@@ -472,3 +502,57 @@ def test_value_can_be_overridden_in_subclass_new():
     a = X(y=[])
     b = a.set(y=None)
     assert a == b
+
+
+def test_sub_class_with_own_new_constructs_all_fields():
+    class PPoint(Point):
+        a = field(type=int)
+
+        def __new__(cls, **kwargs):
+            kwargs.setdefault('a', 5)
+            return super(PPoint, cls).__new__(cls, **kwargs)
+
+    p = PPoint(x=1)
+    assert (p.x, p.a) == (1, 5)
+
+    with pytest.raises(InvariantException):
+        PPoint(x=-1)
+
+
+
+def test_set_only_checks_updated_fields():
+    checked = []
+
+    class Checked(PClass):
+        x = field(type=int, invariant=lambda v: (checked.append('x') or v > 0, 'x negative'))
+        y = field(type=int, invariant=lambda v: (checked.append('y') or v > 0, 'y negative'))
+
+        __invariant__ = lambda self: (checked.append('global') or self.x != self.y, 'x equal to y')
+
+    c = Checked(x=1, y=2)
+    del checked[:]
+
+    c2 = c.set(y=3)
+    assert (c2.x, c2.y) == (1, 3)
+    assert checked == ['y', 'global']
+
+    with pytest.raises(InvariantException) as error:
+        c.set(y=-1)
+    assert error.value.invariant_errors == ('y negative',)
+
+    with pytest.raises(InvariantException) as error:
+        c.set(y=1)
+    assert error.value.invariant_errors == ('x equal to y',)
+
+    with pytest.raises(TypeError):
+        c.set(x='a')
+
+
+def test_set_keeps_unset_optional_fields_unset():
+    class Optional(PClass):
+        x = field()
+        y = field()
+
+    o = Optional(x=1).set(x=2)
+    assert not hasattr(o, 'y')
+    assert o == Optional(x=2)
@@ -291,3 +291,79 @@ def test_iterable():
     """
 
     assert pdeque(iter("a")) == pdeque(iter("a"))
+
+
+def test_indexed_deque_operations_match_list_backed_deque():
+    import random
+    rnd = random.Random(7)
+    for maxlen in (None, 0, 1, 10):
+        elements = [rnd.randrange(10) for _ in range(30)]
+        d = pdeque(elements, maxlen=maxlen)
+        x = pdeque(elements, maxlen=maxlen, indexed=True)
+        for _ in range(200):
+            e = rnd.randrange(10)
+            k = rnd.randrange(-3, 4)
+            op = rnd.choice([
+                lambda q: q.append(e), lambda q: q.appendleft(e), lambda q: q.pop(k), lambda q: q.popleft(k),
+                lambda q: q.extend([e, k]), lambda q: q.extendleft([e, k]), lambda q: q.rotate(k)])
+            d, x = op(d), op(x)
+
+            assert list(x) == list(d)
+            assert x == d
+            assert x.maxlen == maxlen
+
+            if rnd.randrange(10) == 0:
+                d, x = pdeque(reversed(d), maxlen=maxlen), x.reverse()
+
+
+def test_indexed_deque_indexing_and_slicing():
+    elements = list(range(1000))
+    x = pdeque(elements, indexed=True)
+    r = x.reverse()
+    for i in range(-1000, 1000, 37):
+        assert x[i] == elements[i]
+        assert r[i] == elements[::-1][i]
+
+    for start, stop in ((0, 1000), (10, 20), (-20, -10), (500, 100), (None, 3), (997, None)):
+        assert list(x[start:stop]) == elements[start:stop]
+        assert list(r[start:stop]) == elements[::-1][start:stop]
+
+    assert list(x[::3]) == elements[::3]
+
+    with pytest.raises(IndexError):
+        x[1000]
+
+
+def test_indexed_deque_remove():
+    x = pdeque([1, 2, 3, 3, 4, 5, 4, 6], indexed=True)
+    assert x.remove(4) == pdeque([1, 2, 3, 3, 5, 4, 6])
+    assert x.reverse().remove(4) == pdeque([6, 5, 4, 3, 3, 2, 1])
+
+    with pytest.raises(ValueError):
+        x.remove(7)
+
+
+def test_indexed_deque_extend_with_indexed_deque():
+    x = pdeque(range(100), indexed=True)
+    assert list(x.extend(x)) == list(range(100)) * 2
+    assert list(x.extend(x.reverse())) == list(range(100)) + list(range(99, -1, -1))
+    assert list(x.extendleft(x)) == list(range(99, -1, -1)) + list(range(100))
+    assert list(pdeque([], maxlen=150, indexed=True).extend(x).extend(x)) == list(range(50, 100)) + list(range(100))
+
+
+def test_indexed_deque_str_and_pickling():
+    x = pdeque([1, 2], maxlen=4, indexed=True)
+    assert str(x) == 'pdeque([1, 2], maxlen=4, indexed=True)'
+    assert str(pdeque(indexed=True)) == 'pdeque([], indexed=True)'
+
+    output = pickle.loads(pickle.dumps(x, -1))
+    assert output == x
+    assert output.maxlen == 4
+    assert str(output) == str(x)
+
+
+def test_indexed_deque_is_pdeque():
+    from pyrsistent import PDeque
+    assert isinstance(pdeque([1], indexed=True), PDeque)
+    assert pdeque([1, 2], indexed=True) == pdeque([1, 2])
+    assert hash(pdeque([1, 2], indexed=True)) == hash(pdeque([1, 2]))
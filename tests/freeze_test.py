@@ -1,5 +1,8 @@
 """Tests for freeze and thaw."""
 import collections
+import pickle
+import sys
+import pytest
 from pyrsistent import v, m, s, freeze, thaw, PRecord, field, mutant
 
 
@@ -172,3 +175,168 @@ def test_mutant_decorator():
     assert pv == v(1, 2, 3)
     assert pm == m(a=3)
     assert isinstance(pm, type(m()))
+
+
+## Shared and deep structures
+
+def test_freeze_shared_substructures_are_frozen_once():
+    shared = {'a': [1, 2]}
+    result = freeze([shared, {'b': shared}, shared])
+    assert result == v(m(a=v(1, 2)), m(b=m(a=v(1, 2))), m(a=v(1, 2)))
+    assert result[0] is result[1]['b'] is result[2]
+
+def test_freeze_and_thaw_deep_structures():
+    depth = 10 * sys.getrecursionlimit()
+    deep = []
+    for _ in range(depth):
+        deep = [deep, {'x': 1}]
+
+    frozen = freeze(deep)
+    thawed = thaw(frozen)
+    for _ in range(depth):
+        assert type(frozen) is type(v())
+        assert type(thawed) is list
+        frozen = frozen[0]
+        thawed = thawed[0]
+
+def test_thaw_does_not_share_results_for_shared_substructures():
+    shared = v(1)
+    result = thaw(v(shared, shared))
+    assert result == [[1], [1]]
+    assert result[0] is not result[1]
+
+def test_freeze_and_thaw_cyclic_structures_raise_value_error():
+    cyclic = [1]
+    cyclic.append({'a': cyclic})
+    with pytest.raises(ValueError):
+        freeze(cyclic)
+
+    with pytest.raises(ValueError):
+        thaw(cyclic)
+
+
+## Freeze (lazy)
+
+def test_freeze_lazy_freezes_nested_containers_on_access():
+    source = {'a': [1, {'b': 2}], 'c': {3, 4}, 'd': (1, [2])}
+    result = freeze(source, lazy=True)
+
+    assert len(result) == 3
+    assert 'a' in result
+    assert result['c'] == s(3, 4)
+    assert result['d'] == (1, v(2))
+    assert result['a'][1]['b'] == 2
+    assert result['a'][-1] == m(b=2)
+    assert result['a'] is result['a']
+    assert list(result['a'][1:]) == [m(b=2)]
+
+def test_freeze_lazy_materialize():
+    result = freeze({'a': [1, {'b': 2}]}, lazy=True)
+    frozen = result.materialize()
+    assert frozen == m(a=v(1, m(b=2)))
+    assert type(frozen['a']) is type(v())
+    assert freeze(result) is frozen
+    assert result == frozen
+    assert hash(result) == hash(frozen)
+
+def test_freeze_lazy_materialize_shares_accessed_children():
+    for strict in (True, False):
+        result = freeze({'a': [1, {'b': 2}], 'c': {3}, 'd': {'e': [4]}}, strict=strict, lazy=True)
+        a, c = result['a'], result['c']
+        nested = result['a'][1]
+        frozen = result.materialize()
+
+        assert frozen == m(a=v(1, m(b=2)), c=s(3), d=m(e=v(4)))
+        assert a.materialize() is frozen['a']
+        assert nested.materialize() is frozen['a'][1]
+        assert c is frozen['c']
+        assert result['d']['e'].materialize() is frozen['d']['e']
+
+def test_freeze_lazy_does_not_modify_defaultdict_source():
+    source = collections.defaultdict(list, a=[1])
+    result = freeze(source, lazy=True)
+
+    assert result.get('missing') is None
+    with pytest.raises(KeyError):
+        result['missing']
+
+    assert 'missing' not in source
+    assert len(result) == 1
+    assert result.materialize() == m(a=v(1))
+
+def test_freeze_lazy_non_containers_are_frozen_eagerly():
+    assert freeze({1, 2}, lazy=True) == s(1, 2)
+    assert freeze(1, lazy=True) == 1
+
+def test_freeze_lazy_sequence_out_of_range():
+    with pytest.raises(IndexError):
+        freeze([1], lazy=True)[1]
+
+def test_thaw_lazy():
+    source = {'a': [1, {'b': 2}]}
+    lazy = freeze(source, lazy=True)
+    result = thaw(lazy)
+    assert result == source
+    assert result['a'] is not source['a']
+
+    result = thaw(lazy, strict=False)
+    assert result == source
+    assert type(result['a'][1]) is dict
+
+def test_pickle_lazy():
+    lazy = freeze({'a': [1]}, lazy=True)
+    assert pickle.loads(pickle.dumps(lazy)) == m(a=v(1))
+
+
+## Already converted structures
+
+def test_freeze_returns_persistent_structures_without_anything_to_freeze_as_is():
+    frozen = m(a=v(1, m(b=2)), c=(1, 's'))
+    assert freeze(frozen) is frozen
+    assert freeze(frozen['a']) is frozen['a']
+
+    updated = frozen.set('d', 3)
+    assert freeze(updated) is updated
+
+def test_freeze_rebuilds_persistent_structures_with_elements_to_freeze():
+    result = freeze(m(a=m(b=[1]), c=v(2)))
+    assert result == m(a=m(b=v(1)), c=v(2))
+    assert type(result['a']['b']) is type(v())
+
+def test_freeze_result_is_not_frozen_again():
+    frozen = freeze({'a': [1, {'b': 2}], 'c': ({'d': 3},)})
+    assert freeze(frozen) is frozen
+
+    updated = frozen.transform(['a', 1, 'b'], {'e': 1})
+    result = freeze(updated)
+    assert result['c'] is frozen['c']
+    assert result['a'][1]['b'] == m(e=1)
+
+def test_freeze_strict_after_non_strict_freezes_remaining_values():
+    non_strict = freeze({'a': m(b=[1]), 'c': [v([2])]}, strict=False)
+    assert type(non_strict['a']['b']) is list
+
+    result = freeze(non_strict)
+    assert type(result['a']['b']) is type(v())
+    assert type(result['c'][0][0]) is type(v())
+
+def test_freeze_converts_pmap_subclasses_to_pmap():
+    class R(PRecord):
+        x = field()
+
+    result = freeze(R(x=1))
+    assert result == m(x=1)
+    assert type(result) is type(m())
+
+def test_thaw_returns_plain_structures_without_anything_to_thaw_as_is():
+    plain = [1, {'a': [2, (3, 'x')]}]
+    assert thaw(plain) is plain
+
+    result = thaw([plain, v(1)])
+    assert result[0] is plain
+    assert result[1] == [1]
+
+def test_thaw_non_strict_does_not_descend_into_plain_structures():
+    plain = {'a': v(1)}
+    result = thaw(m(b=plain), strict=False)
+    assert result['b'] is plain
@@ -0,0 +1,83 @@
+import io
+import pytest
+from pyrsistent import json, m, v, s, b, l, dq, freeze, thaw, PRecord, field
+
+
+def test_dumps_persistent_structures():
+    assert json.loads(json.dumps(m(a=v(1, 2.5, None, True), b=s('x'), c=l(1, 2), d=dq(3)))) == \
+        m(a=v(1, 2.5, None, True), b=v('x'), c=v(1, 2), d=v(3))
+
+
+def test_dumps_mixed_plain_and_persistent_structures():
+    assert json.dumps([m(a=[v(1)]), {'b': (m(),)}]) == '[{"a": [[1]]}, {"b": [{}]}]'
+
+
+def test_dumps_supports_json_keyword_arguments():
+    assert json.dumps(m(b=1, a=v(2)), sort_keys=True, separators=(',', ':')) == '{"a":[2],"b":1}'
+
+
+def test_dumps_precord():
+    class R(PRecord):
+        x = field()
+
+    assert json.dumps(R(x=v(1))) == '{"x": [1]}'
+
+
+def test_dumps_calls_default_for_unknown_types():
+    class Unknown(object):
+        pass
+
+    assert json.dumps(m(a=Unknown()), default=lambda o: 'unknown') == '{"a": "unknown"}'
+
+    with pytest.raises(TypeError):
+        json.dumps(m(a=Unknown()))
+
+    with pytest.raises(TypeError):
+        json.dumps(b(1))
+
+
+def test_dumps_lazy_freeze_view():
+    assert json.dumps(freeze({'a': [1]}, lazy=True)) == '{"a": [1]}'
+
+
+def test_dump_to_file():
+    f = io.StringIO()
+    json.dump(m(a=v(1)), f)
+    assert f.getvalue() == '{"a": [1]}'
+
+
+def test_loads_builds_persistent_structures():
+    result = json.loads('{"a": [1, [2, [3, {"b": []}]]], "c": {"d": {}}, "e": "f"}')
+    assert result == freeze({'a': [1, [2, [3, {'b': []}]]], 'c': {'d': {}}, 'e': 'f'})
+    assert type(result) is type(m())
+    assert type(result['a'][1][1]) is type(v())
+    assert type(result['a'][1][1][1]['b']) is type(v())
+    assert type(result['c']['d']) is type(m())
+
+
+def test_loads_result_does_not_need_freezing():
+    result = json.loads('{"a": [1, {"b": 2}]}')
+    assert freeze(result) is result
+
+
+def test_loads_top_level_values():
+    assert json.loads('[[1], 2]') == v(v(1), 2)
+    assert json.loads('"a"') == 'a'
+    assert json.loads(b'3') == 3
+
+
+def test_loads_duplicate_keys_last_one_wins():
+    assert json.loads('{"a": 1, "a": 2}') == m(a=2)
+
+
+def test_loads_supports_json_keyword_arguments():
+    assert json.loads('{"a": 1.5}', parse_float=str) == m(a='1.5')
+
+
+def test_load_from_file():
+    assert json.load(io.StringIO('{"a": [1]}')) == m(a=v(1))
+
+
+def test_round_trip():
+    data = {'a': [1, {'b': [None, True, 'x']}], 'c': 1.5}
+    assert thaw(json.loads(json.dumps(freeze(data)))) == data
@@ -207,3 +207,98 @@ def test_iterable():
     """
 
     assert plist(iter("a")) == plist(iter("a"))
+
+
+def test_counted_list_length_is_maintained():
+    x = plist([1, 2, 3], counted=True)
+    assert len(x) == 3
+    assert len(x.cons(0)) == 4
+    assert len(x.rest) == 2
+    assert len(x.mcons([4, 5])) == 5
+    assert len(x.reverse()) == 3
+    assert len(x.remove(2)) == 2
+    assert [len(part) for part in x.split(1)] == [1, 2]
+    assert len(x[::2]) == 2
+    assert len(plist(counted=True).cons(1)) == 1
+
+
+def test_counted_list_behaves_like_plist():
+    elements = [1, 2, 3, 2, 1]
+    x = plist(elements, counted=True)
+    y = plist(elements)
+    assert x == y
+    assert hash(x) == hash(y)
+    assert x.split(2) == y.split(2)
+    assert x.remove(2) == y.remove(2)
+    assert x[-2] == y[-2]
+    assert x[1:] == y[1:]
+    assert x != plist(elements[:-1], counted=True)
+
+
+def test_counted_list_bounds_check():
+    x = plist([1, 2], counted=True)
+    with pytest.raises(IndexError):
+        x[2]
+
+    with pytest.raises(IndexError):
+        x[-3]
+
+
+def test_counted_list_caches_hash():
+    class HashCounting(object):
+        count = 0
+
+        def __hash__(self):
+            HashCounting.count += 1
+            return 1
+
+    x = plist([HashCounting(), HashCounting()], counted=True)
+    assert hash(x) == hash(x)
+    assert HashCounting.count == 2
+
+    y = x.cons(HashCounting())
+    assert hash(y) == hash(plist(list(y)))
+    assert HashCounting.count == 6
+
+
+def test_hashing_long_counted_list():
+    x = plist(range(100000), counted=True)
+    assert hash(x) == hash(plist(range(100000)))
+    assert hash(x.cons(1).cons(2)) == hash(plist([2, 1] + list(range(100000))))
+
+
+def test_pickling_counted_list():
+    x = plist([1, 2, 3], counted=True)
+    y = pickle.loads(pickle.dumps(x, -1))
+    assert y == x
+    assert len(y.cons(0)) == 4
+
+
+def test_long_list_is_released_without_recursion():
+    x = plist(range(1000000))
+    assert len(x) == 1000000
+    del x
+
+
+def test_mcons_propagates_errors_from_iterable():
+    def elements():
+        yield 1
+        raise KeyError('boom')
+
+    with pytest.raises(KeyError):
+        plist([2]).mcons(elements())
+
+
+def test_reference_cycles_through_list_are_collected():
+    import gc
+    import weakref
+
+    class Holder(object):
+        pass
+
+    holder = Holder()
+    holder.list = l(holder, 1)
+    ref = weakref.ref(holder)
+    del holder
+    gc.collect()
+    assert ref() is None
@@ -1,4 +1,5 @@
 from collections import namedtuple
+import os
 from collections.abc import Mapping, Hashable
 from operator import add
 import pytest
@@ -503,7 +504,7 @@ def test_supports_weakref():
 
 
 def test_insert_and_get_many_elements():
-    # This test case triggers reallocation of the underlying bucket structure.
+    # This test case triggers growth of the underlying trie.
     a_map = m()
     for x in range(1000):
         a_map = a_map.set(str(x), x)
@@ -549,3 +550,337 @@ def test_pmap_removal_with_broken_classes_deriving_from_namedtuple():
     assert BrokenPerson('X') not in s
     assert BrokenItem('X') in s
     assert len(s) == 1
+
+
+@pytest.fixture(params=['python', 'pmapc'])
+def trie_impl(request, monkeypatch):
+    import pyrsistent._pmap as pmap_module
+    if request.param == 'pmapc':
+        if os.environ.get('PYRSISTENT_NO_C_EXTENSION'):
+            pytest.skip('Configured to not run tests for C extension')
+
+        impl = pytest.importorskip('pmapc')
+        lookup, assoc, dissoc, assoc_all = impl.lookup, impl.assoc, impl.dissoc, impl.assoc_all
+    else:
+        lookup, assoc, dissoc, assoc_all = (pmap_module._python_lookup, pmap_module._python_assoc,
+                                            pmap_module._python_dissoc, pmap_module._python_assoc_all)
+
+    monkeypatch.setattr(pmap_module, '_lookup', lookup)
+    monkeypatch.setattr(pmap_module, '_assoc', assoc)
+    monkeypatch.setattr(pmap_module, '_dissoc', dissoc)
+    monkeypatch.setattr(pmap_module, '_assoc_all', assoc_all)
+    return request.param
+
+
+class FixedHash(object):
+    def __init__(self, name, hash_value):
+        self.name = name
+        self.hash_value = hash_value
+
+    def __hash__(self):
+        return self.hash_value
+
+    def __eq__(self, other):
+        return isinstance(other, FixedHash) and self.name == other.name
+
+    def __repr__(self):
+        return 'FixedHash({0!r}, {1!r})'.format(self.name, self.hash_value)
+
+
+def _random_keys(rnd, count):
+    # Few distinct hashes with shared low bits to exercise deep paths and collision nodes
+    hashes = [rnd.choice([0, 1, 32, 1024, -1, -33, 2 ** 40, -2 ** 62]) + rnd.randrange(4) for _ in range(count)]
+    return [FixedHash(i, h) for i, h in enumerate(hashes)] + list(range(count)) + [str(i) for i in range(count)]
+
+
+def _trie_shape(node):
+    if type(node) is tuple:
+        return ('collision', node[0], frozenset(zip(node[1::2], node[2::2])))
+
+    data_end = 3 + 2 * bin(node[0]).count('1')
+    return (node[0], node[1],
+            frozenset(zip(node[3:data_end:2], node[4:data_end:2])),
+            tuple(_trie_shape(n) for n in node[data_end:]))
+
+
+def test_random_updates_match_dict(trie_impl):
+    import random
+    rnd = random.Random(17)
+    keys = _random_keys(rnd, 200)
+    reference = {}
+    the_map = pmap()
+    for _ in range(3000):
+        key = rnd.choice(keys)
+        if rnd.random() < 0.6:
+            value = rnd.randrange(10)
+            reference[key] = value
+            the_map = the_map.set(key, value)
+        else:
+            reference.pop(key, None)
+            the_map = the_map.discard(key)
+
+        assert len(the_map) == len(reference)
+
+    assert dict(the_map) == reference
+    for key in keys:
+        assert the_map.get(key, 'missing') == reference.get(key, 'missing')
+
+
+def test_trie_shape_is_independent_of_history(trie_impl):
+    import random
+    rnd = random.Random(42)
+    keys = _random_keys(rnd, 100)
+    for _ in range(20):
+        rnd.shuffle(keys)
+        kept = keys[:rnd.randrange(len(keys))]
+        grown = pmap(dict.fromkeys(keys, 1))
+        for key in keys[len(kept):]:
+            grown = grown.remove(key)
+
+        assert grown == pmap(dict.fromkeys(kept, 1))
+        assert _trie_shape(grown._root) == _trie_shape(pmap(dict.fromkeys(kept, 1))._root)
+
+
+def test_collision_node_updates(trie_impl):
+    a, b, c = FixedHash('a', 5), FixedHash('b', 5), FixedHash('c', 5)
+    map1 = pmap({a: 1, b: 2})
+    map2 = map1.set(c, 3).set(a, 11)
+
+    assert map1 == {a: 1, b: 2}
+    assert map2 == {a: 11, b: 2, c: 3}
+    assert map2.remove(a).remove(b) == {c: 3}
+    assert map2.remove(FixedHash('b', 5)).set(FixedHash('d', 37), 4) == {a: 11, c: 3, FixedHash('d', 5 + 32): 4}
+
+
+def test_evolver_does_not_mutate_shared_nodes(trie_impl):
+    original = pmap({str(x): x for x in range(2000)})
+    shape = _trie_shape(original._root)
+
+    e = original.evolver()
+    for x in range(0, 2000, 3):
+        e[str(x)] = -x
+    for x in range(1, 2000, 3):
+        del e[str(x)]
+    first = e.persistent()
+
+    e[str(2)] = 'changed'
+    del e[str(5)]
+    second = e.persistent()
+
+    assert _trie_shape(original._root) == shape
+    assert first[str(2)] == 2 and str(5) in first
+    assert second[str(2)] == 'changed' and str(5) not in second
+    assert len(first) == len(second) + 1
+
+
+def test_evolver_set_and_remove_same_key(trie_impl):
+    e = pmap({'a': 1}).evolver()
+    e['b'] = 2
+    del e['b']
+    del e['a']
+
+    assert e.persistent() == pmap()
+    assert len(e) == 0
+
+
+def _trie_nodes(node):
+    yield node
+    if type(node) is list:
+        data_end = 3 + 2 * bin(node[0]).count('1')
+        for sub_node in node[data_end:]:
+            yield from _trie_nodes(sub_node)
+
+
+def test_growth_shares_all_but_the_updated_path(trie_impl):
+    the_map = pmap({x: x for x in range(5000)})
+    for x in range(5000, 5500):
+        grown = the_map.set(x, x)
+        old_ids = set(id(n) for n in _trie_nodes(the_map._root))
+        new_nodes = [n for n in _trie_nodes(grown._root) if id(n) not in old_ids]
+
+        # Only the path from the root down to the new entry is copied
+        assert 1 <= len(new_nodes) <= 5
+        the_map = grown
+
+    assert the_map == dict((x, x) for x in range(5500))
+
+
+def test_pre_size_has_no_effect():
+    assert _trie_shape(pmap({'a': 1}, pre_size=1000)._root) == _trie_shape(pmap({'a': 1})._root)
+
+
+def test_create_from_pairs_with_duplicate_keys(trie_impl):
+    the_map = pmap(iter([('a', 1), ('b', 2), ('a', 3)]))
+
+    assert the_map == {'a': 3, 'b': 2}
+    assert len(the_map) == 2
+
+
+@pytest.mark.parametrize('initial', [
+    dict((str(x), x) for x in range(1000)),
+    [(str(x), x) for x in range(1000)],
+    [[str(x), x] for x in range(1000)],
+    pmap(dict((str(x), x) for x in range(1000))).items(),
+])
+def test_create_from_different_sources(trie_impl, initial):
+    the_map = pmap(initial)
+
+    assert the_map == dict((str(x), x) for x in range(1000))
+    assert len(the_map) == 1000
+
+
+def test_create_from_pmap_returns_the_argument():
+    the_map = pmap({'a': 1})
+    assert pmap(the_map) is the_map
+
+
+@pytest.mark.parametrize('initial', [[1], [(1, 2, 3)], [({}, 1)]])
+def test_create_from_invalid_pairs(trie_impl, initial):
+    with pytest.raises((TypeError, ValueError)):
+        pmap(initial)
+
+
+def test_create_from_hashed_triples(trie_impl):
+    from pyrsistent import pmap_from_hashed
+    keys = [FixedHash(x, x % 7) for x in range(100)] + list(range(100))
+    the_map = pmap_from_hashed((hash(k), k, i) for i, k in enumerate(keys))
+
+    assert the_map == dict((k, i) for i, k in enumerate(keys))
+    assert pmap_from_hashed([]) is pmap()
+
+
+def test_bulk_loaded_trie_has_the_same_shape_as_incrementally_built_trie():
+    if os.environ.get('PYRSISTENT_NO_C_EXTENSION'):
+        pytest.skip('Configured to not run tests for C extension')
+
+    import random
+    from pyrsistent._pmap import _python_assoc_all, _EMPTY_NODE
+    pmapc = pytest.importorskip('pmapc')
+    rnd = random.Random(3)
+    for size in (1, 2, 5, 100, 3000):
+        keys = _random_keys(rnd, size) + [FixedHash(x, h) for x, h in enumerate([-2 ** 63, 2 ** 63 - 1, -2, 7])]
+        pairs = [(rnd.choice(keys), rnd.randrange(5)) for _ in range(2 * size)]
+
+        root, added = pmapc.assoc_all(_EMPTY_NODE, pairs, object(), False)
+        expected_root, expected_added = _python_assoc_all(_EMPTY_NODE, pairs, object(), False)
+
+        assert added == expected_added == len(dict(pairs))
+        assert _trie_shape(root) == _trie_shape(expected_root)
+
+
+def test_c_trie_functions_check_argument_count():
+    if os.environ.get('PYRSISTENT_NO_C_EXTENSION'):
+        pytest.skip('Configured to not run tests for C extension')
+
+    pmapc = pytest.importorskip('pmapc')
+    for fn in (pmapc.lookup, pmapc.assoc, pmapc.dissoc, pmapc.assoc_all):
+        with pytest.raises(TypeError):
+            fn()
+
+
+class ComparisonCounting(object):
+    comparisons = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __eq__(self, other):
+        ComparisonCounting.comparisons += 1
+        return isinstance(other, ComparisonCounting) and self.value == other.value
+
+
+def test_equality_skips_shared_subtries(trie_impl):
+    original = pmap({ComparisonCounting(x): x for x in range(5000)})
+    key = ComparisonCounting(17)
+    map1, map2, map3 = original.set(key, -1), original.set(key, -1), original.set(key, -1).set(key, 17)
+
+    ComparisonCounting.comparisons = 0
+    assert map1 == map2
+    assert map1 != original
+    assert map3 == original
+    assert ComparisonCounting.comparisons <= 3
+
+
+def test_equality_of_collision_nodes_independent_of_insertion_order(trie_impl):
+    a, b, c = FixedHash('a', 5), FixedHash('b', 5), FixedHash('c', 5)
+
+    assert pmap().set(a, 1).set(b, 2).set(c, 3) == pmap().set(c, 3).set(b, 2).set(a, 1)
+    assert pmap().set(a, 1).set(b, 2).set(c, 3) != pmap().set(c, 3).set(b, 2).set(a, 2)
+    assert pmap().set(a, 1).set(b, 2) != pmap().set(a, 1).set(FixedHash('d', 5 + 32), 2)
+
+
+def test_hash_is_maintained_when_deriving_from_hashed_map(trie_impl):
+    original = pmap({x: str(x) for x in range(1000)})
+    hash(original)
+
+    e = original.evolver()
+    e[5] = 'five'
+    e[1001] = 'new'
+    del e[10]
+    derived = [original.set(0, 'zero'), original.remove(1), original.update({2: 'x', 2000: 'y'}),
+               original.discard(3), e.persistent()]
+
+    for the_map in derived:
+        assert hasattr(the_map, '_entries_hash')
+        assert hash(the_map) == hash(pmap(dict(the_map)))
+
+
+def test_hash_of_map_derived_with_unhashable_value(trie_impl):
+    original = pmap({'a': 1, 'b': 2})
+    hash(original)
+
+    unhashable = original.set('a', [])
+    with pytest.raises(TypeError):
+        hash(unhashable)
+
+    assert hash(unhashable.set('a', 1)) == hash(original)
+
+
+def test_diff(trie_impl):
+    original = pmap({'a': 1, 'b': 2, 'c': 3})
+
+    assert original.diff(original) == (pmap(), pmap(), pmap())
+    assert original.diff(original.set('a', 4).remove('b').set('d', 5)) == (pmap({'d': 5}), pmap({'b': 2}),
+                                                                         pmap({'a': (1, 4)}))
+    assert original.diff({'a': 1}) == (pmap(), pmap({'b': 2, 'c': 3}), pmap())
+    assert pmap().diff(original) == (original, pmap(), pmap())
+
+
+def test_diff_of_random_updates(trie_impl):
+    import random
+    rnd = random.Random(11)
+    keys = _random_keys(rnd, 300)
+    original = pmap({key: rnd.randrange(3) for key in keys[::2]})
+    for _ in range(50):
+        updated = original
+        for _ in range(rnd.randrange(20)):
+            key = rnd.choice(keys)
+            updated = updated.set(key, rnd.randrange(3)) if rnd.random() < 0.6 else updated.discard(key)
+
+        added, removed, changed = original.diff(updated)
+        assert added == {k: v for k, v in updated.items() if k not in original}
+        assert removed == {k: v for k, v in original.items() if k not in updated}
+        assert changed == {k: (v, updated[k]) for k, v in original.items() if k in updated and updated[k] != v}
+
+
+def test_diff_skips_shared_subtries(trie_impl):
+    original = pmap({ComparisonCounting(x): x for x in range(5000)})
+    updated = original.set(ComparisonCounting(17), -1).remove(ComparisonCounting(18))
+
+    ComparisonCounting.comparisons = 0
+    assert original.diff(updated) == (pmap(), pmap({ComparisonCounting(18): 18}), pmap({ComparisonCounting(17): (17, -1)}))
+    assert ComparisonCounting.comparisons <= 10
+
+
+def test_persistent_insert_does_not_over_allocate_nodes(trie_impl):
+    import sys
+    the_map = pmap()
+    for x in range(1000):
+        the_map = the_map.set(x, x)
+
+    for node in _trie_nodes(the_map._root):
+        if type(node) is list:
+            assert sys.getsizeof(node) == sys.getsizeof(node[:])
@@ -283,6 +283,15 @@ def test_factory():
     assert BRecord(x=2.5) == {'x': 2}
 
 
+def test_factory_only_applied_to_factory_fields():
+    class BRecord(PRecord):
+        x = field(factory=lambda x: x * 2)
+        z = field(factory=lambda z: z * 2)
+
+    assert BRecord.create({'x': 2, 'z': 3}, _factory_fields={'z'}) == {'x': 2, 'z': 6}
+    assert BRecord.create({'x': 2, 'z': 3}) == {'x': 4, 'z': 6}
+
+
 def test_factory_must_be_callable():
     with pytest.raises(TypeError):
         class BRecord(PRecord):
@@ -876,3 +885,28 @@ def test_pickle_with_one_way_factory():
     """
     thing = UniqueThing(id='25544626-86da-4bce-b6b6-9186c0804d64')
     assert thing == pickle.loads(pickle.dumps(thing))
+
+
+def test_invariant_errors_from_field_factories_are_collected():
+    class Inner(PRecord):
+        a = field(mandatory=True)
+        b = field(invariant=lambda v: (v > 0, 'b negative'))
+
+    class Outer(PRecord):
+        inner = field(type=Inner)
+        c = field(invariant=lambda v: (v > 0, 'c negative'))
+
+    with pytest.raises(InvariantException) as error:
+        Outer.create({'inner': {'b': -1}, 'c': -1})
+
+    assert error.value.invariant_errors == ('b negative', 'c negative')
+    assert error.value.missing_fields == ('Inner.a',)
+
+
+def test_evolver_set_runs_field_checks():
+    e = ARecord(x=1).evolver()
+    with pytest.raises(PTypeError):
+        e.set('x', 'foo')
+
+    with pytest.raises(AttributeError):
+        e.set('z', 1)
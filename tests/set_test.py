@@ -80,6 +80,70 @@ def test_supports_set_operations():
     assert s1.symmetric_difference(s2) == s1 ^ s2
 
 
+@pytest.mark.parametrize('shared', [True, False])
+def test_set_operations_match_builtin_set(shared):
+    import operator
+    import random
+    rnd = random.Random(shared)
+    for _ in range(20):
+        elements1 = set(rnd.sample(range(1500), rnd.randrange(1000)))
+        s1 = pset(elements1)
+        if shared:
+            elements2, s2 = set(elements1), s1
+            for x in rnd.sample(range(1700), rnd.randrange(50)):
+                elements2 ^= {x}
+                s2 = s2.discard(x) if x in s2 else s2.add(x)
+        else:
+            elements2 = set(rnd.sample(range(1500), rnd.randrange(1000)))
+            s2 = pset(elements2)
+
+        for op in (operator.or_, operator.and_, operator.sub, operator.xor):
+            assert op(s1, s2) == op(elements1, elements2)
+            assert op(s2, s1) == op(elements2, elements1)
+            assert op(s1, frozenset(elements2)) == op(elements1, elements2)
+
+
+def test_set_operations_with_iterables():
+    assert s(1, 2, 3).union([3, 4, 4]) == s(1, 2, 3, 4)
+    assert s(1, 2, 3).intersection([3, 4, 4]) == s(3)
+    assert s(1, 2, 3).difference([3, 3, 4]) == s(1, 2)
+    assert s(1, 2, 3).symmetric_difference([3, 4, 4]) == s(1, 2, 4)
+
+
+class HashCountingElement(object):
+    hash_count = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        HashCountingElement.hash_count += 1
+        return hash(self.value)
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def test_difference_with_larger_set_iterates_smaller_set():
+    small = pset(HashCountingElement(i) for i in range(3))
+    large = pset(HashCountingElement(i) for i in range(2, 1000))
+
+    HashCountingElement.hash_count = 0
+    result = small - large
+    hash_count = HashCountingElement.hash_count
+
+    assert result == pset(HashCountingElement(i) for i in range(2))
+    assert hash_count <= 2 * len(small)
+
+
+def test_union_of_small_set_shares_structure_with_large_set():
+    large = pset(range(10000))
+    result = s(-1, 5) | large
+
+    assert result == set(range(-1, 10000))
+    assert result._map._root[-1] is large._map._root[-1]
+
+
 def test_supports_set_comparisons():
     s1 = s(1, 2, 3)
     s3 = s(1, 2)
@@ -0,0 +1,242 @@
+import io
+import pickle
+import pytest
+from pyrsistent import (
+    snapshot, m, v, s, b, l, dq, pmap, pvector, plist, pdeque, pset, CheckedPMap, CheckedPVector,
+    PRecord, pmap_field, pvector_field, pset_field)
+from pyrsistent._pvector import python_pvector
+
+
+def roundtrip(obj):
+    return snapshot.loads(snapshot.dumps(obj))
+
+
+def test_roundtrip_persistent_structures():
+    structures = [m(a=v(1, 2), b=s(3)), b(1, 1, 2), l(1, 2, 3), plist([1, 2], counted=True),
+                  dq(1, 2, 3), pdeque([1, 2], maxlen=3, indexed=True), m(), v(), l(), dq()]
+
+    result = roundtrip(structures)
+
+    assert result == structures
+    assert [type(x) for x in result] == [type(x) for x in structures]
+    assert result[4].maxlen is None and result[5].maxlen == 3
+
+
+def test_roundtrip_plain_objects():
+    assert roundtrip({'a': [1, (2, 'x')], 'b': None}) == {'a': [1, (2, 'x')], 'b': None}
+
+
+@pytest.mark.parametrize('size', [0, 1, 31, 32, 33, 64, 1056, 1057, 40000])
+def test_roundtrip_pvector_of_size(size):
+    vector = roundtrip(pvector(range(size)))
+
+    assert vector == pvector(range(size))
+    assert vector.extend(range(40)).set(0, 'x').delete(1)[size + 38] == 39
+
+
+def test_pmap_versions_share_nodes():
+    m1 = pmap({i: i for i in range(5000)})
+    m2 = m1.set(1, 'x')
+
+    r1, r2 = roundtrip([m1, m2])
+
+    assert r2 == m2
+    # Only the sub node holding the updated key differs between the versions
+    sub_nodes1, sub_nodes2 = r1._root[3:], r2._root[3:]
+    assert sum(x is y for x, y in zip(sub_nodes1, sub_nodes2)) == len(sub_nodes1) - 1
+
+
+def test_pvector_versions_share_nodes():
+    v1 = pvector(range(5000))
+    versions = [v1.set(i, 'x') for i in range(0, 5000, 100)]
+
+    data = snapshot.dumps(versions)
+    r1, r2 = snapshot.loads(data)[:2]
+
+    assert len(data) < len(pickle.dumps(versions)) / 10
+    assert r1 == versions[0] and r2 == versions[1]
+
+
+def test_plist_versions_share_cells():
+    l1 = plist(range(10000))
+    l2 = l1.cons('a')
+    l3 = l1.rest.cons('b')
+
+    r1, r2, r3 = roundtrip([l1, l2, l3])
+
+    assert r2 == l2 and r3 == l3
+    assert r2.rest is r1
+    assert r3.rest is r1.rest
+
+
+def test_counted_plist_versions_share_cells():
+    l1 = plist(range(100), counted=True)
+
+    r1, r2 = roundtrip([l1, l1.cons(1)])
+
+    assert r2.rest is r1
+    assert len(r2) == 101
+
+
+def test_pdeque_versions_share_structure():
+    d1 = pdeque(range(1000), indexed=True)
+    d2 = d1.append(1)
+
+    r1, r2 = roundtrip([d1, d2])
+
+    assert r2 == d2
+    assert r2.appendleft(5).pop()[1000] == 999
+
+
+def test_pset_and_pbag_versions_share_nodes():
+    s1 = pset(range(1000))
+
+    r1, r2, r3 = roundtrip([s1, s1.add(-1), b(*range(1000))])
+
+    assert r2 == s1.add(-1) and r3 == b(*range(1000))
+    assert r1._map._root[-1] is r2._map._root[-1]
+
+
+class HashChangingKey(object):
+    salt = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return hash((self.value, HashChangingKey.salt))
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def test_pmap_rebuilt_when_hashes_have_changed():
+    original = pmap({HashChangingKey(i): i for i in range(100)})
+    data = snapshot.dumps(original)
+
+    HashChangingKey.salt = 1
+    try:
+        result = snapshot.loads(data)
+
+        assert len(result) == 100
+        assert all(result[HashChangingKey(i)] == i for i in range(100))
+    finally:
+        HashChangingKey.salt = 0
+
+
+class Ints(CheckedPVector):
+    __type__ = int
+
+
+class IntMap(CheckedPMap):
+    __key_type__ = int
+
+
+class Record(PRecord):
+    x = pmap_field(int, str)
+    y = pvector_field(int)
+    z = pset_field(int)
+
+
+def test_roundtrip_checked_types():
+    structures = [Ints([1, 2]), IntMap({1: 'a'}), Record(x={1: 'a'}, y=[1], z=[2])]
+
+    result = roundtrip(structures)
+
+    assert result == structures
+    assert [type(x) for x in result] == [type(x) for x in structures]
+    assert [type(x) for x in result[2].values()] == [type(x) for x in structures[2].values()]
+
+    with pytest.raises(TypeError):
+        result[0].append('a')
+
+
+def test_dump_and_load_file():
+    f = io.BytesIO()
+    snapshot.dump(m(a=1), f)
+    f.seek(0)
+
+    assert snapshot.load(f) == m(a=1)
+
+
+def test_load_rejects_other_data():
+    with pytest.raises(ValueError):
+        snapshot.loads(pickle.dumps(m(a=1)))
+
+
+def map_vector(tmp_path, vector, fmt):
+    path = tmp_path / 'vector'
+    with open(path, 'wb') as f:
+        snapshot.dump_vector(vector, f, fmt)
+
+    with open(path, 'rb') as f:
+        return snapshot.map_vector(f)
+
+
+@pytest.mark.parametrize('size', [0, 1, 32, 33, 1056, 1057, 40000])
+def test_map_vector_of_size(tmp_path, size):
+    vector = map_vector(tmp_path, pvector(range(size)), 'q')
+
+    assert len(vector) == size
+    assert list(vector) == list(range(size))
+    assert vector == pvector(range(size))
+    if size:
+        assert vector[0] == 0 and vector[-1] == size - 1
+        assert list(vector[1:size - 1]) == list(range(1, size - 1))
+
+
+def test_map_vector_of_floats_and_bytes(tmp_path):
+    assert map_vector(tmp_path, v(0.5, 1.5), 'd') == v(0.5, 1.5)
+    assert map_vector(tmp_path, v(b'ab', b'cd') * 100, '2s') == v(b'ab', b'cd') * 100
+
+
+def test_updated_mapped_vector_shares_mapped_nodes(tmp_path):
+    vector = map_vector(tmp_path, pvector(range(5000)), 'q')
+
+    updated = vector.set(0, 'a').append('b')
+    evolver = vector.evolver()
+    evolver[1] = 'c'
+
+    assert updated[0] == 'a' and updated[5000] == 'b' and list(updated[1:5000]) == list(range(1, 5000))
+    assert evolver.persistent()[1] == 'c'
+    assert vector.delete(10) == pvector(range(5000)).delete(10)
+    assert vector[0] == 0
+    assert type(updated._root[-1]) is type(vector._root[-1])
+
+
+def test_mapped_vector_hashes_like_pvector(tmp_path):
+    vector = map_vector(tmp_path, pvector(range(2000)), 'q')
+    evolver = vector.evolver()
+    evolver[1] = 'b'
+
+    for x in (vector, vector.set(0, 'a'), vector.append('a'), evolver.persistent()):
+        assert hash(x) == hash(pvector(list(x)))
+        assert x in {pvector(list(x))}
+
+    assert hash(vector) == hash(python_pvector(range(2000)))
+
+
+def test_mapped_vector_in_snapshot(tmp_path):
+    vector = map_vector(tmp_path, pvector(range(2000)), 'q')
+
+    assert roundtrip([vector, vector.set(5, 'a')]) == [vector, vector.set(5, 'a')]
+
+
+def test_dump_vector_rejects_values_not_matching_format(tmp_path):
+    with pytest.raises(ValueError):
+        map_vector(tmp_path, v(b'abc'), '2s')
+
+    with pytest.raises(TypeError):
+        map_vector(tmp_path, v('a'), 'q')
+
+    with pytest.raises(ValueError):
+        map_vector(tmp_path, v(1), 'x')
+
+
+def test_map_vector_rejects_other_files(tmp_path):
+    path = tmp_path / 'data'
+    path.write_bytes(snapshot.dumps(v(1, 2)))
+
+    with open(path, 'rb') as f:
+        with pytest.raises(ValueError):
+            snapshot.map_vector(f)
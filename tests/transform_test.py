@@ -1,4 +1,5 @@
-from pyrsistent import freeze, inc, discard, rex, ny, field, PClass, pmap
+import pytest
+from pyrsistent import freeze, inc, discard, rex, ny, field, PClass, pmap, compile_transform
 
 
 def test_callable_command():
@@ -120,3 +121,77 @@ def test_transform_insert_empty_pmap():
 def test_discard_does_not_insert_nodes():
     m = freeze({}).transform(['foo', 'bar'], discard)
     assert m == pmap({})
+
+
+def test_compiled_transform_can_be_reused():
+    increment = compile_transform(['foo', ny, 'baz'], inc)
+    assert increment(freeze({'foo': {'bar': {'baz': 1}}})) == {'foo': {'bar': {'baz': 2}}}
+    assert increment(freeze({'foo': [{'baz': 1}, {'baz': 2}]})) == {'foo': [{'baz': 2}, {'baz': 3}]}
+
+
+def test_compiled_transform_multiple_transformations():
+    t = compile_transform(['foo'], discard, ['bar', lambda k, v: v > 1], 0)
+    assert t(freeze({'foo': 1, 'bar': {'a': 1, 'b': 2}})) == {'bar': {'a': 1, 'b': 0}}
+
+
+def test_compiled_transform_returns_same_structure_when_nothing_changes():
+    m = freeze({'foo': {'bar': 1}})
+    assert compile_transform(['foo', 'baz'], discard)(m) is m
+    assert compile_transform(['foo', rex('^x')], inc)(m) is m
+
+
+def test_compile_transform_checks_predicate_arity_once():
+    calls = []
+
+    def predicate(k):
+        calls.append(k)
+        return True
+
+    t = compile_transform([predicate], inc)
+    assert t(freeze([1, 2])) == freeze([2, 3])
+    assert calls == [0, 1]
+
+    with pytest.raises(ValueError):
+        compile_transform([lambda: True], inc)
+
+
+def _transform_one_at_a_time(structure, *transformations):
+    for i in range(0, len(transformations), 2):
+        structure = structure.transform(transformations[i], transformations[i + 1])
+    return structure
+
+
+def test_transformations_with_shared_prefix_give_same_result_as_one_at_a_time():
+    m = freeze({'a': {'b': {'c': 1, 'd': 2}, 'e': [1, 2]}, 'f': 3})
+    transformations = (['a', 'b', 'c'], inc,
+                       ['a', 'e', 2], 3,
+                       ['a', 'b', 'd'], discard,
+                       ['a', 'x', 'y'], discard,
+                       ['a', 'b', 'd'], 5,
+                       ['f'], discard,
+                       ['a', 'e', ny], inc,
+                       ['a', 'e', -1], 10,
+                       ['g', 'h'], discard,
+                       ['g', 'h', 'i'], 1,
+                       ['g', 'h', 'j'], discard)
+
+    expected = _transform_one_at_a_time(m, *transformations)
+    assert m.transform(*transformations) == expected
+    assert compile_transform(*transformations)(m) == expected
+    assert expected == {'a': {'b': {'c': 2, 'd': 5}, 'e': [2, 3, 10]}, 'g': {'h': {'i': 1}}}
+
+
+def test_transformations_with_shared_prefix_evolve_each_node_once():
+    class CountingEvolvers(PClass):
+        evolvers = []
+        x = field()
+        y = field()
+
+        def evolver(self):
+            CountingEvolvers.evolvers.append(self)
+            return super(CountingEvolvers, self).evolver()
+
+    m = freeze({'a': {'b': CountingEvolvers(x=1, y=2)}})
+    result = m.transform(['a', 'b', 'x'], inc, ['a', 'b', 'y'], inc)
+    assert result['a']['b'] == CountingEvolvers(x=2, y=3)
+    assert len(CountingEvolvers.evolvers) == 1
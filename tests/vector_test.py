@@ -294,6 +294,124 @@ def test_addition(pvector):
     assert list(v) == [1, 2, 3, 4]
 
 
+def test_addition_of_large_vectors(pvector):
+    # Sizes are looped over rather than parametrized, memory_profiling.py calls tests with pvector only
+    for left_size in [0, 1, 31, 32, 33, 1056, 1057]:
+        for right_size in [0, 1, 32, 1024, 1057]:
+            left, right = list(range(left_size)), list(range(-right_size, 0))
+            result = pvector(left) + pvector(right)
+
+            assert result.tolist() == left + right
+            assert result.append('x').tolist() == left + right + ['x']
+            assert result.insert(left_size, 'x').tolist() == left + ['x'] + right
+
+
+def test_slicing_and_deleting_ranges_of_large_vector(pvector):
+    import random
+    for size in [1, 32, 33, 1056, 1057, 33 * 32 * 32 + 5]:
+        rnd = random.Random(size)
+        l = list(range(size))
+        seq = pvector(l)
+        for _ in range(50):
+            start, stop = rnd.randrange(-5, size + 5), rnd.randrange(-5, size + 5)
+            assert seq[:stop].tolist() == l[:stop]
+            assert seq[start:stop].tolist() == l[start:stop]
+            assert seq[start:stop].extend(range(40)).tolist() == l[start:stop] + list(range(40))
+
+            expected = list(l)
+            del expected[start:stop]
+            assert seq.delete(start, stop).tolist() == expected
+
+
+def test_python_vector_concatenation_shares_leaves_that_line_up():
+    from pyrsistent._pvector import _leaves
+    left, right = python_pvector(range(33 * 32)), python_pvector(range(40000))
+    right_leaves = set(map(id, _leaves(right._root, right._shift)))
+
+    aligned = left + right
+    assert aligned.tolist() == left.tolist() + right.tolist()
+    assert sum(id(leaf) in right_leaves for leaf in _leaves(aligned._root, aligned._shift)) == len(right_leaves)
+
+    unaligned = left.append('x') + right
+    assert unaligned.tolist() == left.tolist() + ['x'] + right.tolist()
+    assert not any(id(leaf) in right_leaves for leaf in _leaves(unaligned._root, unaligned._shift))
+
+    for result in (aligned, unaligned):
+        assert result.append('y')[-1] == 'y'
+        assert result.set(30000, 'y')[30000] == 'y'
+
+
+def test_insert(pvector):
+    seq = pvector([1, 2, 3])
+
+    assert seq.insert(0, 0) == pvector([0, 1, 2, 3])
+    assert seq.insert(2, 0) == pvector([1, 2, 0, 3])
+    assert seq.insert(3, 0) == pvector([1, 2, 3, 0])
+    assert seq.insert(10, 0) == pvector([1, 2, 3, 0])
+    assert seq.insert(-1, 0) == pvector([1, 2, 0, 3])
+    assert seq.insert(-10, 0) == pvector([0, 1, 2, 3])
+    assert pvector().insert(0, 1) == pvector([1])
+    assert seq == pvector([1, 2, 3])
+
+
+def test_insert_into_large_vector(pvector):
+    l = list(range(2000))
+    seq = pvector(l)
+    for index in (0, 31, 32, 33, 1024, 1056, 1999, 2000):
+        expected = list(l)
+        expected.insert(index, 'x')
+        assert seq.insert(index, 'x').tolist() == expected
+
+
+def _apply_splices(l, splices):
+    l = list(l)
+    for start, stop, values in reversed(splices):
+        l[start:stop] = values
+
+    return l
+
+
+def test_diff(pvector):
+    seq = pvector(range(5))
+
+    assert seq.diff(seq) == pvector()
+    assert seq.diff(seq.set(1, 'a').set(2, 'b').set(4, 'c')) == pvector([(1, 3, pvector(['a', 'b'])),
+                                                                          (4, 5, pvector(['c']))])
+    assert seq.diff(seq.append(5)) == pvector([(5, 5, pvector([5]))])
+    assert seq.diff(seq.delete(1, 5)) == pvector([(1, 5, pvector())])
+    assert seq.diff([0, 1, 'x']) == pvector([(2, 3, pvector(['x'])), (3, 5, pvector())])
+    assert pvector().diff(seq) == pvector([(0, 0, seq)])
+
+
+def test_diff_of_updated_vectors(pvector):
+    import random
+    for size in [0, 31, 32, 33, 1056, 1057, 33 * 32 * 32 + 5]:
+        rnd = random.Random(size)
+        seq = pvector(range(size))
+        for _ in range(20):
+            other = seq
+            for _ in range(rnd.randrange(5)):
+                if other and rnd.random() < 0.5:
+                    other = other.set(rnd.randrange(len(other)), 'x')
+                elif other and rnd.random() < 0.5:
+                    other = other.delete(rnd.randrange(len(other)), len(other))
+                else:
+                    other = other.extend(range(rnd.randrange(1100)))
+
+            splices = seq.diff(other)
+            assert _apply_splices(seq, splices) == other.tolist()
+            assert other.diff(seq).tolist() == other.diff(seq.tolist()).tolist()
+
+
+def test_diff_skips_shared_nodes(pvector):
+    elements = [CountingHash(x) for x in range(5000)]
+    seq = pvector(elements)
+    other = seq.set(2000, CountingHash(-1)).append(CountingHash(-2))
+
+    assert seq.diff(other) == pvector([(2000, 2001, pvector([CountingHash(-1)])), (5000, 5000, pvector([CountingHash(-2)]))])
+    assert sum(element.eq_count for element in elements) == 1
+
+
 def test_sorted(pvector):
     seq = pvector([5, 2, 3, 1])
     assert [1, 2, 3, 5] == sorted(seq)
@@ -365,6 +483,53 @@ def test_refuses_to_hash_when_members_are_unhashable(pvector):
         hash(v)
 
 
+class CountingHash(object):
+    def __init__(self, value):
+        self.value = value
+        self.hash_count = 0
+        self.eq_count = 0
+
+    def __hash__(self):
+        self.hash_count += 1
+        return hash(self.value)
+
+    def __eq__(self, other):
+        self.eq_count += 1
+        return isinstance(other, CountingHash) and self.value == other.value
+
+
+def test_hash_is_only_calculated_once(pvector):
+    element = CountingHash(1)
+    v = pvector([element, 2])
+
+    assert hash(v) == hash(v)
+    assert element.hash_count == 1
+
+    # Derived vectors calculate their own hash
+    hash(v.append(3))
+    assert element.hash_count == 2
+
+
+def test_vectors_with_different_cached_hashes_are_not_compared_element_wise(pvector):
+    element = CountingHash(1)
+    v1 = pvector([element, 2])
+    v2 = pvector([CountingHash(1), 3])
+    hash(v1)
+    hash(v2)
+
+    assert v1 != v2
+    assert not (v1 == v2)
+    assert element.eq_count == 0
+
+
+def test_failed_hash_is_not_cached(pvector):
+    v = pvector([1, [2]])
+
+    for _ in range(2):
+        with pytest.raises(TypeError):
+            hash(v)
+
+
 def test_compare_same_vectors(pvector):
     v = pvector([1, 2])
     assert v == v
@@ -861,6 +1026,45 @@ def test_evolver_set_followed_by_delete(pvector):
     assert evolver.persistent() == pvector([3])
 
 
+def test_evolver_mixed_updates_match_list(pvector):
+    import random
+    for size in [0, 5, 32, 33, 1056, 1057, 33 * 32 * 32 + 5]:
+        rnd = random.Random(size)
+        original = pvector(range(size))
+        evolver = original.evolver()
+        expected = list(range(size))
+        snapshots = []
+        for _ in range(3000):
+            operation = rnd.random()
+            if operation < 0.45:
+                evolver.append(operation)
+                expected.append(operation)
+            elif operation < 0.5:
+                extension = list(range(rnd.randrange(100)))
+                evolver.extend(extension)
+                expected.extend(extension)
+            elif operation < 0.75 and expected:
+                index = rnd.randrange(-len(expected), len(expected))
+                evolver[index] = operation
+                expected[index] = operation
+            elif operation < 0.9 and expected:
+                del evolver[-1]
+                expected.pop()
+            elif operation < 0.92 and expected:
+                index = rnd.randrange(len(expected))
+                del evolver[index]
+                del expected[index]
+            elif len(snapshots) < 10:
+                snapshots.append((evolver.persistent(), list(expected)))
+
+            assert len(evolver) == len(expected)
+
+        assert evolver.persistent().tolist() == expected
+        assert original.tolist() == list(range(size))
+        for snapshot, snapshot_expected in snapshots:
+            assert snapshot.tolist() == snapshot_expected
+
+
 def test_compare_with_list(pvector):
     v = pvector([1, 2, 3])
 